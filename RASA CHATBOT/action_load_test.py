@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Action Load Test
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Async Action Throughput
+
+Runs the appointment and handover actions for many simulated conversations
+against the in-process scheduling backend with an artificial round-trip
+latency, and reports how throughput scales with the number of concurrent
+conversations. Because the actions await the backend, throughput should grow
+close to linearly with concurrency until the event loop itself saturates.
+
+With ``--store sqlite`` appointment records are written to a throwaway SQLite
+database through the pooled store instead of an in-memory dict.
+
+Usage:
+    python action_load_test.py --latency 0.02 --conversations 200
+    python action_load_test.py --latency 0 --store sqlite
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Text
+
+from rasa_sdk import Tracker
+from rasa_sdk.executor import CollectingDispatcher
+
+from actions.actions import (
+    ActionBookAppointment,
+    ActionCancelAppointment,
+    ActionCheckAppointment,
+    ActionInitiateHandover,
+    ActionModifyAppointment,
+)
+from actions.backend import LocalSchedulingBackend, set_backend
+from actions.store import InMemoryAppointmentStore, create_appointment_store
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def make_tracker(sender_id: Text, slots: Dict[Text, Any]) -> Tracker:
+    """Build a minimal tracker carrying the given slots"""
+    return Tracker(
+        sender_id=sender_id,
+        slots=slots,
+        latest_message={"intent": {"name": "book_appointment"}, "entities": []},
+        events=[],
+        paused=False,
+        followup_action=None,
+        active_loop={},
+        latest_action_name="action_listen",
+    )
+
+
+async def run_conversation(sender_id: Text) -> int:
+    """Book, check, reschedule, cancel and hand over; returns actions run"""
+    slots: Dict[Text, Any] = {"triage_priority": "high", "last_symptoms": "fever"}
+    steps = [
+        ActionBookAppointment(),
+        ActionCheckAppointment(),
+        ActionModifyAppointment(),
+        ActionCancelAppointment(),
+        ActionInitiateHandover(),
+    ]
+
+    for action in steps:
+        events = await action.run(CollectingDispatcher(), make_tracker(sender_id, slots), {})
+        for event in events:
+            if event.get("event") == "slot":
+                slots[event["name"]] = event["value"]
+    return len(steps)
+
+
+async def run_level(concurrency: int, conversations: int) -> Dict[Text, float]:
+    """Run all conversations with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int) -> int:
+        async with semaphore:
+            return await run_conversation(f"load-{concurrency}-{index}")
+
+    start = time.perf_counter()
+    counts: List[int] = await asyncio.gather(*(bounded(i) for i in range(conversations)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "actions": sum(counts),
+        "seconds": elapsed,
+        "throughput": sum(counts) / elapsed,
+    }
+
+
+async def main(latency: float, conversations: int, store_type: Text) -> None:
+    if store_type == "sqlite":
+        db_path = os.path.join(tempfile.mkdtemp(), "appointments.db")
+        store = create_appointment_store({"type": "sql", "dialect": "sqlite", "db": db_path})
+    else:
+        store = InMemoryAppointmentStore()
+    set_backend(LocalSchedulingBackend(latency=latency, store=store))
+
+    print("🏥 Healthcare Chatbot Action Load Test")
+    print(f"Backend latency: {latency * 1000:.0f} ms | Store: {store_type} | "
+          f"Conversations per level: {conversations}")
+    print("=" * 60)
+    print(f"{'Concurrency':>12} {'Actions':>10} {'Seconds':>10} {'Actions/s':>12} {'Speedup':>10}")
+
+    baseline = None
+    for concurrency in CONCURRENCY_LEVELS:
+        result = await run_level(concurrency, conversations)
+        baseline = baseline or result["throughput"]
+        print(
+            f"{result['concurrency']:>12} {result['actions']:>10} "
+            f"{result['seconds']:>10.2f} {result['throughput']:>12.1f} "
+            f"{result['throughput'] / baseline:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the async custom actions")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Simulated backend round trip in seconds")
+    parser.add_argument("--conversations", type=int, default=128,
+                        help="Conversations to run at each concurrency level")
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory",
+                        help="Where appointment records are kept")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.latency, args.conversations, args.store))
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Production Action Server
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Multi-Worker Custom Actions
+
+Runs the custom actions in N worker processes behind one port, instead of a
+single ``rasa run actions --debug`` process:
+
+1. The parent imports the actions package once (triage rules, lexicon,
+   templates and the scheduling backend included) and freezes the garbage
+   collector, then forks the workers, so the loaded state is shared
+   copy-on-write rather than rebuilt and duplicated per process.
+2. Each worker serves the rasa_sdk webhook app on its own ``SO_REUSEPORT``
+   socket, so the kernel spreads connections across workers (``--shared-socket``
+   falls back to one socket bound by the parent and accepted by every worker).
+3. Every worker gets a distinct ``ACTION_WORKER_ID`` (appointment references
+   stay unique) and serves its own metrics on ``ACTION_METRICS_PORT`` plus its
+   worker id, bound to ``--metrics-host`` (loopback by default). Appointments
+   are booked through the shared appointment store, which rejects a slot
+   another worker already booked (see actions/backend.py); several workers
+   therefore need a shared store, not ``type: in_memory``.
+4. ``SIGHUP`` reloads the triage rules and message templates in the parent,
+   forks a fresh set of workers from it and asks the old ones to stop; old
+   workers finish in-flight requests for up to ``--graceful-timeout`` seconds.
+   The parent also watches triage_rules.yml and restarts the workers the same
+   way when it changes; workers never reload rules on their own, so they all
+   apply one version. ``SIGTERM``/``SIGINT`` drain and stop every worker.
+   Workers that exit unexpectedly are replaced.
+
+Idle connections from the Rasa server are kept open for ``--keep-alive-timeout``
+seconds, so its pooled action endpoint client (components/action_client.py)
+can reuse them.
+
+Worker ids alternate between two ranges on every reload, so old and new
+workers that overlap while draining never share an id or a metrics port.
+
+Usage:
+    python action_server.py                       # one worker per core on port 5055
+    python action_server.py --workers 8 --port 5055
+    kill -HUP <pid>                               # rolling restart with fresh data
+"""
+
+import argparse
+import gc
+import inspect
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional, Text, Tuple
+
+DEFAULT_PORT = 5055
+DEFAULT_METRICS_PORT = 9105
+DEFAULT_METRICS_HOST = "127.0.0.1"
+ACTIONS_PACKAGE = "actions"
+
+# Seconds a replaced worker waits before it is started again after crashing
+RESPAWN_DELAY = 1.0
+
+logger = logging.getLogger("action_server")
+
+
+def bind_socket(host: Text, port: int, reuse_port: bool, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload(package: Text) -> None:
+    """Import every module of the actions package in the parent process"""
+    from rasa_sdk.executor import ActionExecutor
+
+    ActionExecutor().register_package(package)
+    # The package loads its data files on first use; load them here instead,
+    # once, so every worker inherits them
+    reload_shared_data()
+
+    from actions.triage_knowledge import TRIAGE_KNOWLEDGE
+
+    # Rules changes reach the workers through rolling restarts only
+    TRIAGE_KNOWLEDGE.hold()
+
+
+def triage_rules_changed() -> bool:
+    """Reload the triage rules in the parent; True if they changed"""
+    from actions.triage_knowledge import TRIAGE_KNOWLEDGE
+
+    return TRIAGE_KNOWLEDGE.reload()
+
+
+def shared_store_configured() -> bool:
+    """Whether the appointment store is shared between processes"""
+    from actions.store import load_store_config
+
+    return (load_store_config() or {}).get("type", "sql") != "in_memory"
+
+
+def reload_shared_data() -> None:
+    """Re-read data files the workers would otherwise inherit stale"""
+    from actions.templates import TEMPLATES
+    from actions.triage_knowledge import TRIAGE_KNOWLEDGE
+    from actions.triage_scoring import scorer_for
+
+    TEMPLATES.reload()
+    TRIAGE_KNOWLEDGE.reload()
+    # Compiles the scoring matrix, importing NumPy, once for every worker
+    scorer_for(TRIAGE_KNOWLEDGE.latest().lexicon)
+
+
+def create_action_app(package: Text) -> object:
+    """The rasa_sdk webhook app, across rasa_sdk versions"""
+    from rasa_sdk import endpoint
+    from rasa_sdk.executor import ActionExecutor
+
+    if "action_executor" in inspect.signature(endpoint.create_app).parameters:
+        executor = ActionExecutor()
+        executor.register_package(package)
+        return endpoint.create_app(executor)
+    return endpoint.create_app(package)
+
+
+def serve_worker(args: argparse.Namespace, listener: Optional[socket.socket]) -> None:
+    """Body of a forked worker process; never returns"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    gc.unfreeze()
+    code = 0
+    try:
+        sock = listener or bind_socket(args.host, args.port, True, args.backlog)
+        app = create_action_app(ACTIONS_PACKAGE)
+        app.config.GRACEFUL_SHUTDOWN_TIMEOUT = args.graceful_timeout
+        app.config.KEEP_ALIVE_TIMEOUT = args.keep_alive_timeout
+        options = {"sock": sock, "workers": 1, "access_log": False}
+        run_parameters = inspect.signature(app.run).parameters
+        if "single_process" in run_parameters:
+            # Sanic 22.9+ would otherwise start its own worker manager
+            options["single_process"] = True
+        if "motd" in run_parameters:
+            options["motd"] = False
+        app.run(**options)
+    except Exception:
+        logger.exception(f"Action worker {os.environ.get('ACTION_WORKER_ID')} failed")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+class WorkerPool:
+    """Forks, supervises and replaces the worker processes"""
+
+    def __init__(self, args: argparse.Namespace, listener: Optional[socket.socket]) -> None:
+        self.args = args
+        self.listener = listener
+        self.generation = 0
+        # pid -> (slot, generation)
+        self.workers: Dict[int, Tuple[int, int]] = {}
+        self.draining: Dict[int, float] = {}
+
+    def worker_id(self, slot: int) -> int:
+        return slot + (self.generation % 2) * self.args.workers
+
+    def spawn(self, slot: int) -> int:
+        worker_id = self.worker_id(slot)
+        # Set before fork: the at-fork hooks in the actions package read them in the child
+        os.environ["ACTION_WORKER_ID"] = str(worker_id)
+        os.environ["ACTION_METRICS_PORT"] = (
+            str(self.args.metrics_port + worker_id) if self.args.metrics_port else "0"
+        )
+        os.environ["ACTION_METRICS_HOST"] = self.args.metrics_host
+        # Unflushed output would otherwise be written again by the child
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            serve_worker(self.args, self.listener)
+        self.workers[pid] = (slot, self.generation)
+        return pid
+
+    def spawn_all(self) -> None:
+        for slot in range(self.args.workers):
+            self.spawn(slot)
+
+    def rolling_restart(self) -> None:
+        """Start a new generation, then drain the old one"""
+        reload_shared_data()
+        old = list(self.workers)
+        self.generation += 1
+        gc.collect()
+        gc.freeze()
+        self.spawn_all()
+        for pid in old:
+            self.stop(pid)
+        print(f"🔄 Generation {self.generation}: {self.args.workers} workers started, "
+              f"{len(old)} draining")
+
+    def stop(self, pid: int) -> None:
+        self.workers.pop(pid, None)
+        self.draining[pid] = time.monotonic() + self.args.graceful_timeout + 5
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.draining.pop(pid, None)
+
+    def reap(self, respawn: bool) -> None:
+        """Collect exited workers and replace the ones that were not asked to stop"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.draining.clear()
+                return
+            if pid == 0:
+                break
+            if self.draining.pop(pid, None) is not None:
+                continue
+            slot_generation = self.workers.pop(pid, None)
+            if slot_generation is None:
+                continue
+            slot, generation = slot_generation
+            print(f"⚠️  Worker {pid} (slot {slot}) exited with status {status}")
+            if respawn and generation == self.generation:
+                time.sleep(RESPAWN_DELAY)
+                self.spawn(slot)
+
+        # Workers that outlive their drain deadline are killed
+        now = time.monotonic()
+        for pid, deadline in list(self.draining.items()):
+            if now > deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    self.draining.pop(pid, None)
+
+    def shutdown(self) -> None:
+        for pid in list(self.workers):
+            self.stop(pid)
+        while self.draining:
+            self.reap(respawn=False)
+            time.sleep(0.1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve the custom actions from several worker processes")
+    parser.add_argument("--host", default=os.environ.get("SANIC_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per core)")
+    parser.add_argument("--shared-socket", action="store_true",
+                        help="Accept on one inherited socket instead of one SO_REUSEPORT socket per worker")
+    parser.add_argument("--backlog", type=int, default=1024)
+    parser.add_argument("--graceful-timeout", type=float, default=15.0,
+                        help="Seconds a stopping worker may spend finishing requests")
+    parser.add_argument("--keep-alive-timeout", type=float, default=75.0,
+                        help="Seconds an idle client connection is kept open; keep it above "
+                             "keepalive_timeout of the action endpoint in endpoints.yml")
+    parser.add_argument("--metrics-port", type=int,
+                        default=int(os.environ.get("ACTION_METRICS_PORT", str(DEFAULT_METRICS_PORT))),
+                        help="Base metrics port; worker n serves base + n (0 disables)")
+    parser.add_argument("--metrics-host",
+                        default=os.environ.get("ACTION_METRICS_HOST", DEFAULT_METRICS_HOST),
+                        help="Address the metrics endpoints bind to (default: loopback only)")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(),
+                        format="%(asctime)s %(process)d %(levelname)s %(name)s - %(message)s")
+    if not hasattr(os, "fork"):
+        print("❌ The multi-worker action server needs os.fork (Linux or macOS); use `rasa run actions`")
+        return 1
+    args.workers = args.workers or os.cpu_count() or 1
+    from actions.references import MAX_WORKER_ID
+
+    # Two generations of ids, slot and slot + workers, must fit the reference's worker field
+    max_workers = (MAX_WORKER_ID + 1) // 2
+    if args.workers > max_workers:
+        print(f"❌ At most {max_workers} workers are supported (appointment reference worker ids)")
+        return 1
+    reuse_port = hasattr(socket, "SO_REUSEPORT") and not args.shared_socket
+
+    print("🏥 Healthcare Chatbot Action Server")
+    start = time.perf_counter()
+    try:
+        preload(ACTIONS_PACKAGE)
+        if args.workers > 1 and not shared_store_configured():
+            # Each worker would keep its own appointments and book the same slots
+            print("❌ An in-memory appointment store cannot be shared by several workers; "
+                  "configure a SQL appointment_store in endpoints.yml or use --workers 1")
+            return 1
+        # Probe the port now so a conflict fails here, not in every worker
+        listener = bind_socket(args.host, args.port, reuse_port, args.backlog)
+    except (ImportError, OSError) as e:
+        print(f"❌ {e}")
+        return 1
+    if reuse_port:
+        listener.close()
+        listener = None
+    print(f"Actions imported in {time.perf_counter() - start:.2f}s; "
+          f"{args.workers} workers on {args.host}:{args.port} "
+          f"({'SO_REUSEPORT' if reuse_port else 'shared socket'})")
+    if args.metrics_port:
+        print(f"Metrics: ports {args.metrics_port}-{args.metrics_port + 2 * args.workers - 1}")
+
+    requests = {"reload": False, "stop": False}
+    signal.signal(signal.SIGHUP, lambda *_: requests.update(reload=True))
+    signal.signal(signal.SIGTERM, lambda *_: requests.update(stop=True))
+    signal.signal(signal.SIGINT, lambda *_: requests.update(stop=True))
+
+    # Objects allocated so far are never collected, so forked workers keep sharing their pages
+    gc.collect()
+    gc.freeze()
+    pool = WorkerPool(args, listener)
+    pool.spawn_all()
+    print(f"✅ Serving (pid {os.getpid()}); SIGHUP reloads, SIGTERM stops")
+
+    from actions.triage_knowledge import TRIAGE_KNOWLEDGE
+
+    next_rules_check = time.monotonic() + TRIAGE_KNOWLEDGE.poll_interval
+    while not requests["stop"]:
+        if time.monotonic() >= next_rules_check:
+            next_rules_check = time.monotonic() + TRIAGE_KNOWLEDGE.poll_interval
+            if triage_rules_changed():
+                print(f"📋 {TRIAGE_KNOWLEDGE.path} changed")
+                requests["reload"] = True
+        if requests["reload"]:
+            requests["reload"] = False
+            pool.rolling_restart()
+        pool.reap(respawn=True)
+        time.sleep(0.2)
+
+    print("🛑 Draining workers...")
+    pool.shutdown()
+    if listener is not None:
+        listener.close()
+    print("✅ Action server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,12 +12,24 @@ __version__ = "1.0.0-simple"
 __author__ = "Healthcare Chatbot Team"
 __description__ = "Simple Healthcare Chatbot Actions"
 
-# Import only the actions that exist in our simplified version
-from .actions import (
-    ActionPerformTriage,
-    ActionBookAppointment,
-    ActionEmergencyProtocol
-)
+import importlib
+
+# Resolved on first access (PEP 562) so that importing the package, as the
+# action server does before walking its modules, does not import them all
+_LAZY_EXPORTS = {
+    "ActionPerformTriage": ".actions",
+    "ActionBookAppointment": ".actions",
+    "ActionEmergencyProtocol": ".actions",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "ActionPerformTriage",
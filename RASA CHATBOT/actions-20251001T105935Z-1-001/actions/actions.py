@@ -3,72 +3,72 @@ from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
 import random
-import datetime
 
+from .backend import get_backend
+from .dependencies import reads_tracker
+from .instrumentation import instrument_action
+from .scheduling import NoAvailableSlotError
+from .templates import TEMPLATES
+from .triage_knowledge import TRIAGE_KNOWLEDGE
+from .triage_memo import get_triage_memo, memo_key, symptom_set
+from .triage_scoring import case_from_message, rationale, scorer_for
+
+@instrument_action
+@reads_tracker()
 class ActionPerformTriage(Action):
     def name(self) -> Text:
         return "action_perform_triage"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         # Get the reported symptoms
-        symptoms = tracker.get_latest_entity_values("symptom")
+        symptoms = list(tracker.get_latest_entity_values("symptom"))
         body_parts = tracker.get_latest_entity_values("body_part")
         
-        # Emergency symptoms that require immediate attention
-        emergency_symptoms = [
-            "chest pain", "difficulty breathing", "shortness of breath", 
-            "severe bleeding", "unconscious", "heart attack", "stroke",
-            "severe head injury", "poisoning", "severe allergic reaction"
-        ]
-        
-        # High priority symptoms
-        high_priority = [
-            "fever", "severe headache", "persistent vomiting", 
-            "severe abdominal pain", "difficulty swallowing"
-        ]
-        
-        # Medium priority symptoms  
-        medium_priority = [
-            "headache", "nausea", "fatigue", "joint pain", "muscle aches",
-            "sore throat", "cough", "dizziness"
-        ]
+        symptom_text = " ".join(symptoms) if symptoms else "your symptoms"
         
-        # Low priority symptoms
-        low_priority = [
-            "minor cuts", "bruises", "mild headache", "runny nose",
-            "minor rash", "mild indigestion"
-        ]
+        # Score every symptom, severity, duration and body part of the turn
+        # against the current rules snapshot
+        snapshot = TRIAGE_KNOWLEDGE.current()
+        scorer = scorer_for(snapshot.lexicon)
+        features = scorer.extract(case_from_message(tracker.latest_message))
+
+        # A repeated or reworded complaint gets the same answer as last time
+        memo = await get_triage_memo()
+        normalized = symptom_set(symptoms)
+        key = (memo_key(tracker.sender_id, normalized | scorer.feature_names(features), snapshot.digest)
+               if normalized else None)
+        remembered = await memo.get(key) if key else None
+        if remembered is not None:
+            dispatcher.utter_message(text=remembered["response"])
+            return [SlotSet("triage_priority", remembered["priority"]), SlotSet("last_symptoms", symptom_text)]
+
+        result = scorer.score_extracted([features])[0]
+        priority = result.priority
         
-        symptom_text = " ".join(symptoms) if symptoms else "your symptoms"
+        if priority == "emergency":
+            dispatcher.utter_message(
+                text=f"⚠️ Your symptoms ({symptom_text}) indicate a potential medical emergency. "
+                     f"Please seek immediate medical attention or call 911."
+            )
+            return [SlotSet("triage_priority", "emergency")]
         
-        # Check for emergency symptoms
-        for symptom in symptoms:
-            if any(emergency in symptom.lower() for emergency in emergency_symptoms):
-                dispatcher.utter_message(
-                    text=f"⚠️ Your symptoms ({symptom_text}) indicate a potential medical emergency. "
-                         f"Please seek immediate medical attention or call 911."
-                )
-                return [SlotSet("triage_priority", "emergency")]
-        
-        # Check symptom severity and provide appropriate response
-        if any(symptom.lower() in high_priority for symptom in symptoms):
+        # Provide a response appropriate to the symptom severity
+        if priority == "high":
             responses = [
                 f"Based on your symptoms ({symptom_text}), I recommend scheduling an appointment with a healthcare provider within 24-48 hours.",
                 f"Your symptoms ({symptom_text}) suggest you should see a doctor soon. Would you like me to help you book an appointment?",
                 f"Given your symptoms ({symptom_text}), it's important to get medical evaluation. I can help you schedule a visit."
             ]
-            priority = "high"
             
-        elif any(symptom.lower() in medium_priority for symptom in symptoms):
+        elif priority == "medium":
             responses = [
                 f"For your symptoms ({symptom_text}), I recommend monitoring them and consider seeing a healthcare provider if they persist or worsen.",
                 f"Your symptoms ({symptom_text}) are concerning. If they don't improve in 2-3 days, please schedule an appointment.",
                 f"Based on your symptoms ({symptom_text}), rest and self-care may help, but consult a doctor if symptoms persist."
             ]
-            priority = "medium"
             
         else:
             responses = [
@@ -76,44 +76,83 @@ class ActionPerformTriage(Action):
                 f"For your symptoms ({symptom_text}), try rest and basic self-care. Contact us if you have concerns.",
                 f"Based on your symptoms ({symptom_text}), this seems manageable with home care, but don't hesitate to seek help if needed."
             ]
-            priority = "low"
         
         # Add explanation for triage decision (Explainable AI feature)
-        explanation = f"\n\n💡 **Triage Rationale**: I've assessed your symptoms as {priority} priority based on medical triage guidelines. This helps ensure appropriate care timing."
+        explanation = f"\n\n💡 **Triage Rationale**: I've assessed your symptoms as {priority} priority based on medical triage guidelines. Main factors: {rationale(result)}. This helps ensure appropriate care timing."
         
         selected_response = random.choice(responses) + explanation
+        if key:
+            await memo.put(key, {"priority": priority, "response": selected_response})
         dispatcher.utter_message(text=selected_response)
         
         return [SlotSet("triage_priority", priority), SlotSet("last_symptoms", symptom_text)]
 
-class ActionBookAppointment(Action):
+@instrument_action
+@reads_tracker(slots=["triage_priority", "last_symptoms"])
+class ActionExplainTriage(Action):
     def name(self) -> Text:
-        return "action_book_appointment"
+        return "action_explain_triage"
 
     def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
+        priority = tracker.get_slot("triage_priority")
+        symptoms = tracker.get_slot("last_symptoms") or "your symptoms"
+        
+        if not priority:
+            dispatcher.utter_message(
+                text="💡 I haven't assessed any symptoms yet. Tell me how you're feeling and I'll explain my recommendation."
+            )
+            return []
+        
+        meanings = {
+            "emergency": "they match warning signs that need immediate care, so I advised emergency services",
+            "high": "they suggest a condition a doctor should evaluate within 24-48 hours",
+            "medium": "they usually settle with self-care but should be checked if they persist or worsen",
+            "low": "they are usually mild and manageable with home care",
+        }
+        meaning = meanings.get(priority, "of the symptoms, severity and duration you described")
+        dispatcher.utter_message(
+            text=f"💡 **Triage Rationale**: I assessed {symptoms} as {priority} priority because {meaning}. "
+                 f"Triage follows medical guidelines and is not a diagnosis - please seek care if anything changes."
+        )
+        return []
+
+@instrument_action
+@reads_tracker(slots=["triage_priority", "last_symptoms"])
+class ActionBookAppointment(Action):
+    def name(self) -> Text:
+        return "action_book_appointment"
+
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        
         # Get user's triage priority if available
         priority = tracker.get_slot("triage_priority")
         symptoms = tracker.get_slot("last_symptoms")
         
-        # Generate appointment reference number
-        ref_number = f"HC{random.randint(1000, 9999)}"
+        # Book through the scheduling backend, which assigns the reference and time
+        backend = await get_backend()
+        try:
+            appointment = await backend.book_appointment(tracker.sender_id, priority, symptoms)
+        except NoAvailableSlotError:
+            dispatcher.utter_message(
+                text="📅 I'm sorry, there are no open appointment slots right now. "
+                     "Please call us at (555) 123-CARE and our team will fit you in."
+            )
+            return []
+        ref_number = appointment["reference"]
+        suggested_time = appointment["time"]
         
-        # Calculate suggested appointment time based on priority
-        now = datetime.datetime.now()
         if priority == "emergency":
-            suggested_time = "immediately"
             message = f"🚨 Given the urgent nature of your condition, please go to the emergency room immediately. Reference: {ref_number}"
         elif priority == "high":
-            suggested_time = (now + datetime.timedelta(days=1)).strftime("%B %d at 2:00 PM")
             message = f"✅ I've prioritized your appointment for {suggested_time} due to your symptoms. Reference: {ref_number}"
         elif priority == "medium":
-            suggested_time = (now + datetime.timedelta(days=3)).strftime("%B %d at 10:00 AM")
             message = f"✅ Your appointment is scheduled for {suggested_time}. Reference: {ref_number}"
         else:
-            suggested_time = (now + datetime.timedelta(days=7)).strftime("%B %d at 3:00 PM")
             message = f"✅ Your routine appointment is scheduled for {suggested_time}. Reference: {ref_number}"
         
         # Add personalized follow-up
@@ -130,6 +169,8 @@ class ActionBookAppointment(Action):
             SlotSet("appointment_booked", True)
         ]
 
+@instrument_action
+@reads_tracker()
 class ActionEmergencyProtocol(Action):
     def name(self) -> Text:
         return "action_emergency_protocol"
@@ -138,28 +179,14 @@ class ActionEmergencyProtocol(Action):
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
-        emergency_message = (
-            "🚨 **MEDICAL EMERGENCY DETECTED** 🚨\n\n"
-            "**IMMEDIATE ACTIONS:**\n"
-            "1. 📞 Call 911 NOW if in the US\n"
-            "2. 🏥 Go to nearest Emergency Room\n"
-            "3. 👥 Don't drive yourself - call ambulance or have someone drive you\n\n"
-            "**WHILE WAITING FOR HELP:**\n"
-            "• Stay calm and breathe slowly\n"
-            "• Don't eat or drink anything\n"
-            "• Gather your medications/medical info\n"
-            "• Have someone stay with you if possible\n\n"
-            "**EMERGENCY CONTACTS:**\n"
-            "• Emergency Services: 911\n"
-            "• Poison Control: 1-800-222-1222\n"
-            "• Crisis Hotline: 988\n\n"
-            "⚠️ This chat cannot replace emergency medical care. Seek immediate professional help."
-        )
+        emergency_message = TEMPLATES.render("emergency_protocol")
         
         dispatcher.utter_message(text=emergency_message)
         
         return [SlotSet("emergency_triggered", True)]
 
+@instrument_action
+@reads_tracker(slots=["last_symptoms"])
 class ActionProvideHealthAdvice(Action):
     def name(self) -> Text:
         return "action_provide_health_advice"
@@ -170,84 +197,90 @@ class ActionProvideHealthAdvice(Action):
         
         symptoms = tracker.get_slot("last_symptoms")
         
-        general_advice = [
-            "🏥 **General Health Recommendations:**\n"
-            "• Stay hydrated - drink plenty of water\n"
-            "• Get adequate rest (7-9 hours sleep)\n"
-            "• Eat nutritious meals regularly\n"
-            "• Take medications as prescribed\n"
-            "• Monitor your symptoms and keep a health diary\n\n"
-            "⚠️ **Important**: This is general guidance only. Always consult healthcare professionals for medical decisions.",
-            
-            "💊 **Self-Care Guidelines:**\n"
-            "• Apply ice for swelling, heat for muscle tension\n"
-            "• Practice stress management techniques\n"
-            "• Avoid alcohol and smoking\n"
-            "• Maintain good hygiene\n"
-            "• Follow up with your healthcare provider\n\n"
-            "📋 **When to seek immediate care**: Severe pain, difficulty breathing, chest pain, or rapidly worsening symptoms."
-        ]
+        general_advice = TEMPLATES.render_random("health_advice")
         
         if symptoms:
-            advice_message = f"For your reported symptoms ({symptoms}), here's some guidance:\n\n" + random.choice(general_advice)
+            advice_message = TEMPLATES.render(
+                "health_advice_for_symptoms", symptoms=symptoms, advice=general_advice
+            )
         else:
-            advice_message = random.choice(general_advice)
+            advice_message = general_advice
             
         dispatcher.utter_message(text=advice_message)
         return []
 
+@instrument_action
+@reads_tracker(slots=["appointment_reference"])
 class ActionCheckAppointment(Action):
     def name(self) -> Text:
         return "action_check_appointment"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         appointment_ref = tracker.get_slot("appointment_reference")
-        appointment_time = tracker.get_slot("appointment_time")
         
-        if appointment_ref and appointment_time:
+        # The backend's record is the truth; the slots may be stale
+        backend = await get_backend()
+        appointment = await backend.get_appointment(appointment_ref) if appointment_ref else None
+        
+        if appointment and appointment["status"] != "cancelled":
+            status = "Confirmed ✅" if appointment["status"] == "confirmed" else appointment["status"].capitalize()
             message = (
                 f"📅 **Your Appointment Details:**\n"
                 f"• Reference: {appointment_ref}\n"
-                f"• Scheduled: {appointment_time}\n"
-                f"• Status: Confirmed ✅\n"
+                f"• Scheduled: {appointment['time']}\n"
+                f"• Status: {status}\n"
                 f"• Location: Main Clinic, 123 Health Street\n\n"
                 f"📞 Need to make changes? Just let me know!"
             )
-        else:
-            message = (
+            dispatcher.utter_message(text=message)
+            return [SlotSet("appointment_time", appointment["time"])]
+        
+        if not appointment_ref:
+            dispatcher.utter_message(text=(
                 "🔍 I don't see any appointments in our system for you. "
                 "Would you like to schedule one? I can help you book an appointment that fits your needs."
-            )
-        
-        dispatcher.utter_message(text=message)
-        return []
+            ))
+            return []
+        
+        state = "was cancelled" if appointment else "could not be found"
+        dispatcher.utter_message(text=(
+            f"🔍 You have no active appointment: {appointment_ref} {state}. "
+            "Would you like to schedule a new one? I can help you book an appointment that fits your needs."
+        ))
+        # Forget the stale appointment
+        return [
+            SlotSet("appointment_reference", None),
+            SlotSet("appointment_time", None),
+            SlotSet("appointment_booked", False)
+        ]
 
+@instrument_action
+@reads_tracker(slots=["appointment_reference"])
 class ActionModifyAppointment(Action):
     def name(self) -> Text:
         return "action_modify_appointment"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         appointment_ref = tracker.get_slot("appointment_reference")
         
         if appointment_ref:
-            # Generate new time options
-            now = datetime.datetime.now()
-            option1 = (now + datetime.timedelta(days=2)).strftime("%B %d at 9:00 AM")
-            option2 = (now + datetime.timedelta(days=4)).strftime("%B %d at 2:00 PM")
-            option3 = (now + datetime.timedelta(days=6)).strftime("%B %d at 11:00 AM")
+            # Ask the backend for the next free slots on different days
+            backend = await get_backend()
+            options = await backend.propose_slots(appointment_ref, 3)
+            option_lines = "".join(
+                f"{number} {option}\n" for number, option in zip(["1️⃣", "2️⃣", "3️⃣"], options)
+            )
             
             message = (
                 f"📅 **Reschedule Appointment {appointment_ref}**\n\n"
                 f"Available time slots:\n"
-                f"1️⃣ {option1}\n"
-                f"2️⃣ {option2}\n"
-                f"3️⃣ {option3}\n\n"
+                f"{option_lines}\n"
                 f"Would any of these work for you? Or let me know your preferred time."
             )
         else:
@@ -259,17 +292,23 @@ class ActionModifyAppointment(Action):
         dispatcher.utter_message(text=message)
         return []
 
+@instrument_action
+@reads_tracker(slots=["appointment_reference"])
 class ActionCancelAppointment(Action):
     def name(self) -> Text:
         return "action_cancel_appointment"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         appointment_ref = tracker.get_slot("appointment_reference")
         
         if appointment_ref:
+            # Release the slot in the scheduling system
+            backend = await get_backend()
+            await backend.cancel_appointment(appointment_ref)
+            
             message = (
                 f"❌ **Appointment Cancellation**\n\n"
                 f"Your appointment {appointment_ref} has been cancelled.\n\n"
@@ -289,36 +328,34 @@ class ActionCancelAppointment(Action):
             SlotSet("appointment_booked", False)
         ]
 
+@instrument_action
+@reads_tracker(slots=["last_symptoms"])
 class ActionInitiateHandover(Action):
     def name(self) -> Text:
         return "action_initiate_handover"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         symptoms = tracker.get_slot("last_symptoms")
         
-        handover_message = (
-            "👥 **Human Support Request**\n\n"
-            "I'm connecting you with a healthcare professional who can provide personalized assistance.\n\n"
-            "📋 **What I'll share with them:**\n"
-        )
+        # Queue the conversation for the next available professional
+        backend = await get_backend()
+        ticket = await backend.request_handover(tracker.sender_id, symptoms)
         
         if symptoms:
-            handover_message += f"• Your reported symptoms: {symptoms}\n"
-        
-        handover_message += (
-            "• Our conversation history\n"
-            "• Any appointments or references\n\n"
-            "⏱️ **Expected wait time**: 2-5 minutes\n"
-            "📞 **Alternative**: Call us directly at (555) 123-CARE\n\n"
-            "Please stay online while I connect you..."
-        )
+            handover_message = TEMPLATES.render(
+                "handover_with_symptoms", symptoms=symptoms, estimated_wait=ticket["estimated_wait"]
+            )
+        else:
+            handover_message = TEMPLATES.render("handover", estimated_wait=ticket["estimated_wait"])
         
         dispatcher.utter_message(text=handover_message)
         return [SlotSet("human_handover_requested", True)]
 
+@instrument_action
+@reads_tracker()
 class ActionCollectFeedback(Action):
     def name(self) -> Text:
         return "action_collect_feedback"
@@ -327,18 +364,7 @@ class ActionCollectFeedback(Action):
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
-        feedback_message = (
-            "📝 **We Value Your Feedback!**\n\n"
-            "Thank you for taking the time to share your experience with our healthcare assistant.\n\n"
-            "📊 **Your feedback helps us:**\n"
-            "• Improve our AI responses\n"
-            "• Enhance patient care\n"
-            "• Train our healthcare team\n"
-            "• Develop better health services\n\n"
-            "🏆 **Rate our service** (1-5 stars): ⭐⭐⭐⭐⭐\n"
-            "💬 **Additional comments**: Feel free to share any specific suggestions or concerns.\n\n"
-            "Your feedback is confidential and helps us serve you better!"
-        )
+        feedback_message = TEMPLATES.render("collect_feedback")
         
         dispatcher.utter_message(text=feedback_message)
         return [SlotSet("feedback_collected", True)]
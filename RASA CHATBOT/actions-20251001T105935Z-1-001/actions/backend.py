@@ -0,0 +1,266 @@
+# Healthcare Chatbot Scheduling Backend
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Async Backend Client
+
+"""
+Async client interface between the custom actions and the clinic's
+scheduling / handover systems.
+
+Actions ``await`` these calls, so while one conversation waits on the
+backend the action server keeps serving others. :class:`LocalSchedulingBackend`
+is the default until a real scheduling system is connected: it books from an
+in-process slot calendar and persists appointment records through an
+:class:`~actions.store.AppointmentStore` (SQLite unless ``endpoints.yml``
+configures an ``appointment_store``). With an in-memory store it doubles as
+the fake used by the load test (``action_load_test.py``), where ``latency``
+simulates network round trips.
+
+The calendar only proposes slots; the store decides. When several
+action-server processes share one store, a slot another process booked in the
+meantime is rejected by the store (``SlotTakenError``) and the next free slot
+is tried. Every ``resync_interval`` seconds the calendar is rebuilt from the
+store's confirmed appointments, so slots freed by cancellations in other
+processes are offered again. A reference the store already holds means two
+processes share a worker id; the booking is retried with a new reference and
+the collision is logged.
+"""
+
+import asyncio
+import datetime
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Text
+
+from .references import ReferenceGenerator, decode_reference, worker_id_configured
+from .scheduling import NoAvailableSlotError, SlotCalendar
+from .store import (
+    AppointmentStore,
+    InMemoryAppointmentStore,
+    ReferenceTakenError,
+    SlotTakenError,
+    create_appointment_store,
+    load_store_config,
+)
+
+logger = logging.getLogger(__name__)
+
+# Estimated wait quoted to patients waiting for a human
+HANDOVER_WAIT = "2-5 minutes"
+
+# Slots tried per booking when other processes keep taking them first
+MAX_BOOKING_ATTEMPTS = 5
+
+# Seconds between rebuilds of the calendar from the store
+DEFAULT_RESYNC_INTERVAL = 60.0
+
+
+class SchedulingBackend(ABC):
+    """Async operations the appointment and handover actions depend on"""
+
+    @abstractmethod
+    async def book_appointment(self, sender_id: Text, priority: Optional[Text],
+                               symptoms: Optional[Text]) -> Dict[Text, Any]:
+        """Book an appointment and return its record
+
+        Raises NoAvailableSlotError when the calendar is full.
+        """
+
+    @abstractmethod
+    async def get_appointment(self, reference: Text) -> Optional[Dict[Text, Any]]:
+        """Return the appointment record for a reference, if any"""
+
+    @abstractmethod
+    async def propose_slots(self, reference: Text, count: int = 3) -> List[Text]:
+        """Return alternative times for rescheduling an appointment"""
+
+    @abstractmethod
+    async def cancel_appointment(self, reference: Text) -> bool:
+        """Cancel an appointment; returns False if it was not found"""
+
+    @abstractmethod
+    async def request_handover(self, sender_id: Text,
+                               symptoms: Optional[Text]) -> Dict[Text, Any]:
+        """Queue the conversation for a human and return the ticket"""
+
+
+class LocalSchedulingBackend(SchedulingBackend):
+    """Slot calendar plus persistent appointment records, with optional simulated latency"""
+
+    def __init__(self, latency: float = 0.0,
+                 calendar: Optional[SlotCalendar] = None,
+                 references: Optional[ReferenceGenerator] = None,
+                 store: Optional[AppointmentStore] = None,
+                 resync_interval: float = DEFAULT_RESYNC_INTERVAL) -> None:
+        self.latency = latency
+        self.calendar = calendar or SlotCalendar()
+        self.references = references or ReferenceGenerator()
+        self.store = store or InMemoryAppointmentStore()
+        self.resync_interval = resync_interval
+        self.handovers: List[Dict[Text, Any]] = []
+        self._restore: Optional[asyncio.Future] = None
+        self._resync: Optional[asyncio.Future] = None
+        self._next_sync = 0.0
+
+    async def _round_trip(self) -> None:
+        # Yield to the event loop the way a network call would
+        await asyncio.sleep(self.latency)
+
+        # Every request waits for the one-off calendar restore
+        if self._restore is None:
+            self._restore = asyncio.ensure_future(self._restore_calendar())
+        try:
+            await asyncio.shield(self._restore)
+        except Exception:
+            self._restore = None
+            raise
+
+        # Later rebuilds run in the background on the current calendar
+        due = self.resync_interval and asyncio.get_running_loop().time() >= self._next_sync
+        if due and (self._resync is None or self._resync.done()):
+            self._resync = asyncio.ensure_future(self._resync_calendar())
+
+    async def _restore_calendar(self) -> None:
+        # Slots booked before a restart or by other processes must not be offered
+        self._next_sync = asyncio.get_running_loop().time() + self.resync_interval
+        for record in await self.store.active_since(datetime.datetime.now()):
+            self.calendar.claim(record["slot"])
+
+    async def _resync_calendar(self) -> None:
+        # A fresh calendar, so slots other processes released are free again;
+        # a slot booked while it is built is caught by the store on save
+        self._next_sync = asyncio.get_running_loop().time() + self.resync_interval
+        try:
+            records = await self.store.active_since(datetime.datetime.now())
+        except Exception as e:
+            logger.warning(f"Keeping the current slot calendar: {e}")
+            return
+        calendar = self.calendar.empty_copy()
+        for record in records:
+            calendar.claim(record["slot"])
+        self.calendar = calendar
+
+    async def book_appointment(self, sender_id: Text, priority: Optional[Text],
+                               symptoms: Optional[Text]) -> Dict[Text, Any]:
+        await self._round_trip()
+
+        for _ in range(MAX_BOOKING_ATTEMPTS):
+            # Unique, time-ordered appointment reference
+            reference = self.references.next()
+
+            # Emergencies go to the ER; everyone else gets a calendar slot
+            if priority == "emergency":
+                slot = None
+                time = "immediately"
+            else:
+                slot = self.calendar.reserve(priority)
+                time = slot.describe()
+
+            record = {
+                "reference": reference,
+                "sender_id": sender_id,
+                "priority": priority,
+                "symptoms": symptoms,
+                "time": time,
+                "slot": slot,
+                "status": "confirmed",
+            }
+            try:
+                await self.store.save(record)
+            except SlotTakenError:
+                # Booked by another process: leave it out of the calendar, take the next one
+                logger.info(f"Slot {time} was taken elsewhere; trying the next one")
+                continue
+            except ReferenceTakenError:
+                # Another process generates references with our worker id
+                logger.error(f"Appointment reference {reference} already exists: worker id "
+                             f"{decode_reference(reference)[1]} is shared by several processes; "
+                             f"give each one a distinct ACTION_WORKER_ID")
+                if slot is not None:
+                    self.calendar.release(slot)
+                continue
+            except Exception:
+                if slot is not None:
+                    self.calendar.release(slot)
+                raise
+            return record
+        raise NoAvailableSlotError(
+            f"No free slots for {priority or 'routine'} care could be booked"
+        )
+
+    async def get_appointment(self, reference: Text) -> Optional[Dict[Text, Any]]:
+        await self._round_trip()
+        return await self.store.get(reference)
+
+    async def propose_slots(self, reference: Text, count: int = 3) -> List[Text]:
+        await self._round_trip()
+        record = await self.store.get(reference)
+        priority = record["priority"] if record else None
+        return [slot.describe() for slot in self.calendar.peek(priority, count)]
+
+    async def cancel_appointment(self, reference: Text) -> bool:
+        await self._round_trip()
+        record = await self.store.get(reference)
+        if record is None or record["status"] == "cancelled":
+            return False
+        await self.store.set_status(reference, "cancelled")
+        if record["slot"] is not None:
+            self.calendar.release(record["slot"])
+        return True
+
+    async def request_handover(self, sender_id: Text,
+                               symptoms: Optional[Text]) -> Dict[Text, Any]:
+        await self._round_trip()
+        ticket = {
+            "sender_id": sender_id,
+            "symptoms": symptoms,
+            "position": len(self.handovers) + 1,
+            "estimated_wait": HANDOVER_WAIT,
+        }
+        self.handovers.append(ticket)
+        return ticket
+
+
+# Created on first use, so importing the actions never reads endpoints.yml
+# or sets up the appointment store
+_backend: Optional[SchedulingBackend] = None
+_creating: Optional["asyncio.Future[SchedulingBackend]"] = None
+
+
+def create_backend() -> SchedulingBackend:
+    """The backend described by endpoints.yml; reads the file, so call it off the event loop"""
+    config = load_store_config() or {}
+    shared = config.get("type", "sql") == "sql" and config.get("dialect", "sqlite") != "sqlite"
+    if shared and not worker_id_configured():
+        # Servers on other hosts or containers may hash to the same worker id
+        logger.warning("ACTION_WORKER_ID is not set: give every action server sharing the "
+                       "appointment database a distinct one")
+    return LocalSchedulingBackend(store=create_appointment_store(config))
+
+
+async def get_backend() -> SchedulingBackend:
+    """Return the backend client used by the actions
+
+    The first call creates it in a worker thread, so reading endpoints.yml
+    and setting up the store never block the event loop; concurrent first
+    calls share that one creation.
+    """
+    global _backend, _creating
+    if _backend is None:
+        if _creating is None:
+            loop = asyncio.get_running_loop()
+            _creating = asyncio.ensure_future(loop.run_in_executor(None, create_backend))
+        creating = _creating
+        try:
+            created = await asyncio.shield(creating)
+        finally:
+            if _creating is creating and creating.done():
+                _creating = None
+        if _backend is None:
+            _backend = created
+    return _backend
+
+
+def set_backend(backend: SchedulingBackend) -> None:
+    """Replace the backend client (real integration, tests, load tests)"""
+    global _backend
+    _backend = backend
@@ -0,0 +1,125 @@
+# Healthcare Chatbot Action Tracker Dependencies
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Slim Action Server Requests
+
+"""
+Declarations of the parts of the tracker each custom action reads.
+
+Rasa sends the whole tracker with every action call, including the full
+event history, which only grows over a patient's lifetime
+(``carry_over_slots_to_new_session``). An action decorated with
+:func:`reads_tracker` declares the slots and the number of most recent events
+it needs, and whether it uses the domain:
+
+    @reads_tracker(slots=["triage_priority", "last_symptoms"])
+    class ActionBookAppointment(Action):
+        ...
+
+The Rasa server (``rasa_server.py``, see ``components/slim_action_calls.py``)
+then sends only those, plus ``sender_id`` and ``latest_message``, so the size
+of a request no longer depends on the length of the conversation. Actions
+without a declaration still get the full tracker. A slot that is not
+declared reads as None, so a declaration must list every slot ``run`` reads.
+
+This module does not import rasa_sdk; the Rasa server imports it too. It
+reads the declarations from the source of the actions modules rather than
+importing them, so the Rasa server never loads the actions or their
+dependencies. Declarations must therefore use literal arguments.
+"""
+
+import ast
+import importlib.util
+from typing import (
+    Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Text, Tuple, Type,
+)
+
+ACTIONS_MODULES = ("actions.actions",)
+
+
+class TrackerDependencies(NamedTuple):
+    """What an action reads from the tracker besides sender_id and latest_message"""
+
+    slots: Tuple[Text, ...] = ()
+    # Most recent tracker events
+    events: int = 0
+    domain: bool = False
+
+
+def reads_tracker(slots: Iterable[Text] = (), events: int = 0,
+                  domain: bool = False) -> Callable[[Type[Any]], Type[Any]]:
+    """Class decorator declaring the tracker dependencies of an Action"""
+    declared = TrackerDependencies(tuple(slots), events, domain)
+
+    def declare(cls: Type[Any]) -> Type[Any]:
+        cls.tracker_dependencies = declared
+        return cls
+
+    return declare
+
+
+def _action_name(node: ast.ClassDef) -> Optional[Text]:
+    # The constant returned by the class's name() method
+    for item in node.body:
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name == "name":
+            for statement in ast.walk(item):
+                if (isinstance(statement, ast.Return)
+                        and isinstance(statement.value, ast.Constant)
+                        and isinstance(statement.value.value, str)):
+                    return statement.value.value
+    return None
+
+
+def _declaration(node: ast.ClassDef) -> Optional[TrackerDependencies]:
+    # The arguments of the class's @reads_tracker(...) decorator
+    for decorator in node.decorator_list:
+        if not isinstance(decorator, ast.Call):
+            continue
+        function = decorator.func
+        name = function.id if isinstance(function, ast.Name) else getattr(function, "attr", None)
+        if name != reads_tracker.__name__:
+            continue
+        arguments = [ast.literal_eval(argument) for argument in decorator.args]
+        keywords = {keyword.arg: ast.literal_eval(keyword.value) for keyword in decorator.keywords}
+        bound = dict(zip(("slots", "events", "domain"), arguments), **keywords)
+        return TrackerDependencies(
+            tuple(bound.get("slots", ())),
+            int(bound.get("events", 0)),
+            bool(bound.get("domain", False)),
+        )
+    return None
+
+
+def declared_dependencies(
+        modules: Sequence[Text] = ACTIONS_MODULES) -> Dict[Text, TrackerDependencies]:
+    """Declarations of the actions defined in the given modules, by action name
+
+    Raises ImportError if a module cannot be found and ValueError if a
+    declaration is not made of literals.
+    """
+    found: Dict[Text, TrackerDependencies] = {}
+    for module_name in modules:
+        spec = importlib.util.find_spec(module_name)
+        if spec is None or not spec.origin:
+            raise ImportError(f"No module named '{module_name}'")
+        with open(spec.origin, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=spec.origin)
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            declared = _declaration(node)
+            name = _action_name(node)
+            if declared is not None and name is not None:
+                found[name] = declared
+    return found
+
+
+def slim_tracker_state(state: Dict[Text, Any], declared: TrackerDependencies,
+                       events: Optional[List[Dict[Text, Any]]] = None) -> Dict[Text, Any]:
+    """Copy of a tracker state keeping only the declared slots and recent events"""
+    slim = dict(state)
+    slots = state.get("slots") or {}
+    slim["slots"] = {name: slots.get(name) for name in declared.slots}
+    if events is None:
+        events = state.get("events") or []
+    slim["events"] = list(events[-declared.events:]) if declared.events else []
+    return slim
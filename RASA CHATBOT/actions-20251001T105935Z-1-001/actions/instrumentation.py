@@ -0,0 +1,300 @@
+# Healthcare Chatbot Action Instrumentation
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Per-Action Latency Metrics
+
+"""
+Latency, call, error and payload metrics for every custom action.
+
+Decorating an action class with :func:`instrument_action` wraps its ``run``
+(sync or async) so each call is timed into an HDR-style log-linear histogram:
+values are bucketed by power of two with 16 linear sub-buckets, giving about
+6% relative precision at any scale with O(1) recording and no allocation.
+The size of the events each action returns is tracked the same way, on one
+call in ``ACTION_METRICS_PAYLOAD_SAMPLE`` (default 16; 1 measures every call,
+0 none), since measuring it means serializing the events once more.
+
+Metrics are served in Prometheus text format at ``/metrics`` and as JSON at
+``/metrics.json`` on ``ACTION_METRICS_HOST`` (default 127.0.0.1, loopback
+only) and ``ACTION_METRICS_PORT`` (default 9105; set it to 0 to disable the
+endpoint), started by the first instrumented call. A forked worker starts
+with empty metrics and re-reads both, so each worker of a multi-process
+server can serve its own port.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Text, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_PORT = int(os.environ.get("ACTION_METRICS_PORT", "9105"))
+DEFAULT_METRICS_HOST = os.environ.get("ACTION_METRICS_HOST", "127.0.0.1")
+
+# Payload size is measured on the first call of each action and every Nth after it
+PAYLOAD_SAMPLE_RATE = int(os.environ.get("ACTION_METRICS_PAYLOAD_SAMPLE", "16"))
+
+# 16 linear sub-buckets per power of two
+SUB_BUCKET_BITS = 4
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_LINEAR_LIMIT = _SUB_BUCKETS * 2
+
+# Prometheus bucket bounds: latency in seconds, payload size in bytes
+LATENCY_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PAYLOAD_BOUNDS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LogLinearHistogram:
+    """HDR-style histogram of non-negative integer values"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (_LINEAR_LIMIT + 48 * _SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def index_of(value: int) -> int:
+        if value < _LINEAR_LIMIT:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        return _SUB_BUCKETS * shift + (value >> shift)
+
+    @staticmethod
+    def upper_bound(index: int) -> int:
+        """Largest value that falls into a bucket"""
+        if index < _LINEAR_LIMIT:
+            return index
+        shift = index // _SUB_BUCKETS - 1
+        return (((index % _SUB_BUCKETS) + _SUB_BUCKETS + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        index = self.index_of(value)
+        if index >= len(self.counts):
+            index = len(self.counts) - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> int:
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0
+        target = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                return min(self.upper_bound(index), self.max)
+        return self.max
+
+    def cumulative(self, bounds: Tuple[float, ...], scale: float) -> List[Tuple[float, int]]:
+        """Cumulative counts at each bound (bound * scale in recorded units)"""
+        result = []
+        index, seen = 0, 0
+        for bound in bounds:
+            limit = bound * scale
+            while index < len(self.counts) and self.upper_bound(index) <= limit:
+                seen += self.counts[index]
+                index += 1
+            result.append((bound, seen))
+        return result
+
+
+class ActionStats:
+    """Metrics for one action"""
+
+    __slots__ = ("calls", "errors", "latency_us", "payload_bytes")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.latency_us = LogLinearHistogram()
+        self.payload_bytes = LogLinearHistogram()
+
+    def as_dict(self) -> Dict[Text, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": {
+                "mean": self.latency_us.total / self.latency_us.count / 1000
+                if self.latency_us.count else 0.0,
+                "max": self.latency_us.max / 1000,
+                **{f"p{int(q * 100)}": self.latency_us.quantile(q) / 1000 for q in QUANTILES},
+            },
+            "payload_bytes": {
+                "mean": self.payload_bytes.total / self.payload_bytes.count
+                if self.payload_bytes.count else 0.0,
+                "max": self.payload_bytes.max,
+                "sampled": self.payload_bytes.count,
+            },
+        }
+
+
+class ActionMetrics:
+    """Registry of per-action statistics for this process"""
+
+    def __init__(self) -> None:
+        self.actions: Dict[Text, ActionStats] = {}
+        self.port = DEFAULT_METRICS_PORT
+        self.host = DEFAULT_METRICS_HOST
+        self._server: Optional[Any] = None
+        self._server_lock = threading.Lock()
+        self._server_requested = False
+
+    def reset_after_fork(self) -> None:
+        """Forget the parent's metrics and server; pick up this worker's host and port"""
+        self.actions = {}
+        self.port = int(os.environ.get("ACTION_METRICS_PORT", str(DEFAULT_METRICS_PORT)))
+        self.host = os.environ.get("ACTION_METRICS_HOST", DEFAULT_METRICS_HOST)
+        self._server = None
+        self._server_lock = threading.Lock()
+        self._server_requested = False
+
+    def stats_for(self, action_name: Text) -> ActionStats:
+        stats = self.actions.get(action_name)
+        if stats is None:
+            stats = self.actions.setdefault(action_name, ActionStats())
+        return stats
+
+    def record(self, action_name: Text, elapsed_s: float,
+               events: Optional[List[Dict[Text, Any]]], failed: bool) -> None:
+        if not self._server_requested:
+            # Started on first use so importing the actions has no side effects
+            self._server_requested = True
+            self.start_server(self.port, self.host)
+        stats = self.stats_for(action_name)
+        stats.calls += 1
+        stats.latency_us.record(int(elapsed_s * 1e6))
+        if failed:
+            stats.errors += 1
+        elif PAYLOAD_SAMPLE_RATE and (stats.calls - 1) % PAYLOAD_SAMPLE_RATE == 0:
+            stats.payload_bytes.record(len(json.dumps(events or [], default=str)))
+
+    def to_json(self) -> Dict[Text, Any]:
+        return {name: stats.as_dict() for name, stats in sorted(self.actions.items())}
+
+    def to_prometheus(self) -> Text:
+        lines = [
+            "# HELP action_calls_total Custom action invocations",
+            "# TYPE action_calls_total counter",
+        ]
+        for name, stats in sorted(self.actions.items()):
+            lines.append(f'action_calls_total{{action="{name}"}} {stats.calls}')
+
+        lines += [
+            "# HELP action_errors_total Custom action invocations that raised",
+            "# TYPE action_errors_total counter",
+        ]
+        for name, stats in sorted(self.actions.items()):
+            lines.append(f'action_errors_total{{action="{name}"}} {stats.errors}')
+
+        for metric, attribute, bounds, scale, unit_scale, help_text in (
+            ("action_latency_seconds", "latency_us", LATENCY_BOUNDS, 1e6, 1e-6,
+             "Custom action run time"),
+            ("action_payload_bytes", "payload_bytes", PAYLOAD_BOUNDS, 1, 1,
+             "Serialized size of the events returned by an action (sampled calls)"),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for name, stats in sorted(self.actions.items()):
+                histogram: LogLinearHistogram = getattr(stats, attribute)
+                for bound, cumulative in histogram.cumulative(bounds, scale):
+                    lines.append(f'{metric}_bucket{{action="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{action="{name}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{action="{name}"}} {histogram.total * unit_scale}')
+                lines.append(f'{metric}_count{{action="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Text) -> None:
+        """Write the JSON view of the metrics to a file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def start_server(self, port: int = DEFAULT_METRICS_PORT,
+                     host: Text = DEFAULT_METRICS_HOST) -> None:
+        """Serve /metrics and /metrics.json from a background thread"""
+        if not port:
+            return
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        with self._server_lock:
+            if self._server is not None:
+                return
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self) -> None:
+                    if self.path == "/metrics":
+                        body = metrics.to_prometheus().encode("utf-8")
+                        content_type = "text/plain; version=0.0.4"
+                    elif self.path == "/metrics.json":
+                        body = json.dumps(metrics.to_json()).encode("utf-8")
+                        content_type = "application/json"
+                    else:
+                        self.send_error(404)
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format: Text, *args: Any) -> None:
+                    pass
+
+            try:
+                self._server = ThreadingHTTPServer((host, port), Handler)
+            except OSError as e:
+                logger.warning(f"Action metrics endpoint disabled: {e}")
+                return
+            threading.Thread(
+                target=self._server.serve_forever, name="action-metrics", daemon=True
+            ).start()
+            logger.info(f"Serving action metrics on {host}:{port}")
+
+
+METRICS = ActionMetrics()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=METRICS.reset_after_fork)
+
+
+def instrument_action(cls: Type[Any]) -> Type[Any]:
+    """Class decorator timing an Action's run method into METRICS"""
+    run: Callable[..., Any] = cls.run
+
+    if inspect.iscoroutinefunction(run):
+        @functools.wraps(run)
+        async def timed_run(self: Any, dispatcher: Any, tracker: Any, domain: Any) -> Any:
+            start = time.perf_counter()
+            events, failed = None, True
+            try:
+                events = await run(self, dispatcher, tracker, domain)
+                failed = False
+                return events
+            finally:
+                METRICS.record(self.name(), time.perf_counter() - start, events, failed)
+    else:
+        @functools.wraps(run)
+        def timed_run(self: Any, dispatcher: Any, tracker: Any, domain: Any) -> Any:
+            start = time.perf_counter()
+            events, failed = None, True
+            try:
+                events = run(self, dispatcher, tracker, domain)
+                failed = False
+                return events
+            finally:
+                METRICS.record(self.name(), time.perf_counter() - start, events, failed)
+
+    cls.run = timed_run
+    return cls
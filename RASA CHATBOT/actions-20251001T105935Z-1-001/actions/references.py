@@ -0,0 +1,168 @@
+# Healthcare Chatbot Appointment References
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Unique Reference Generator
+
+"""
+Unique, time-ordered appointment references.
+
+Each reference packs a millisecond timestamp, the action-server worker id
+and a per-millisecond sequence number into 63 bits, encoded as 13 Crockford
+base32 characters after the ``HC`` prefix (e.g. ``HC01JB2Q8K3M7XZ``).
+Because every worker owns its worker id, processes never coordinate with
+each other, and fixed-width encoding makes references sort by creation time.
+
+Workers take their id from ``ACTION_WORKER_ID``, and ``action_server.py``
+gives each of its workers a distinct one. Without it the id is hashed from
+the host name and process id, which is not guaranteed to be unique: only
+1024 ids exist, and containers often run the server under the same process
+id. Processes that share an appointment store should therefore be given
+distinct ids; an id collision that slips through is caught by the store,
+which rejects the second appointment with an existing reference
+(:class:`~actions.store.ReferenceTakenError`) so the backend can retry with
+a new one. Generators that were not given an explicit id take a fresh one
+in every forked child.
+"""
+
+import os
+import socket
+import threading
+import zlib
+import time
+import weakref
+from typing import Optional, Text, Tuple
+
+PREFIX = "HC"
+
+# Crockford base32: no I, L, O or U, so references are easy to read out
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+
+# 2024-01-01T00:00:00Z in milliseconds; 41 bits of time last ~69 years
+EPOCH_MS = 1704067200000
+
+TIMESTAMP_BITS = 41
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+ENCODED_LENGTH = 13
+
+
+def _encode(value: int) -> Text:
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def worker_id_configured() -> bool:
+    """Whether this process was given its worker id through ACTION_WORKER_ID"""
+    return os.environ.get("ACTION_WORKER_ID") is not None
+
+
+def default_worker_id() -> int:
+    """Worker id from ACTION_WORKER_ID, falling back to a hash of host name and process id
+
+    Raises ValueError if ACTION_WORKER_ID is not an integer from 0 to MAX_WORKER_ID.
+    """
+    configured = os.environ.get("ACTION_WORKER_ID")
+    if configured is not None:
+        try:
+            worker_id = int(configured)
+        except ValueError:
+            raise ValueError(f"ACTION_WORKER_ID must be an integer, not '{configured}'") from None
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(
+                f"ACTION_WORKER_ID must be between 0 and {MAX_WORKER_ID}, not {worker_id}"
+            )
+        return worker_id
+    return zlib.crc32(f"{socket.gethostname()}:{os.getpid()}".encode("utf-8")) & MAX_WORKER_ID
+
+
+class ReferenceGenerator:
+    """Generates references for a single worker process"""
+
+    def __init__(self, worker_id: Optional[int] = None) -> None:
+        if worker_id is None:
+            _DEFAULT_ID_GENERATORS.add(self)
+            worker_id = default_worker_id()
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Worker id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def reset_after_fork(self) -> None:
+        """Take this process's worker id and a fresh lock"""
+        self.worker_id = default_worker_id()
+        self._lock = threading.Lock()
+
+    def _next_ms(self) -> int:
+        # Never step backwards, even if the wall clock does
+        return max(int(time.time() * 1000) - EPOCH_MS, self._last_ms)
+
+    def next(self) -> Text:
+        """Return a new reference, unique across all workers"""
+        with self._lock:
+            now = self._next_ms()
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond: wait for the next one
+                    while now <= self._last_ms:
+                        time.sleep(0.0001)
+                        now = int(time.time() * 1000) - EPOCH_MS
+            else:
+                self._sequence = 0
+            self._last_ms = now
+
+            value = (
+                (now << (WORKER_BITS + SEQUENCE_BITS))
+                | (self.worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+        return PREFIX + _encode(value)
+
+
+# Generators whose worker id comes from the environment
+_DEFAULT_ID_GENERATORS: "weakref.WeakSet[ReferenceGenerator]" = weakref.WeakSet()
+
+
+def _reset_generators_after_fork() -> None:
+    for generator in list(_DEFAULT_ID_GENERATORS):
+        generator.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_generators_after_fork)
+
+
+def decode_reference(reference: Text) -> Tuple[float, int, int]:
+    """Split a reference into (unix timestamp, worker id, sequence)"""
+    body = reference.upper()
+    if not body.startswith(PREFIX) or len(body) != len(PREFIX) + ENCODED_LENGTH:
+        raise ValueError(f"Not an appointment reference: {reference}")
+
+    value = 0
+    for char in body[len(PREFIX):]:
+        if char not in _DECODE:
+            raise ValueError(f"Not an appointment reference: {reference}")
+        value = (value << 5) | _DECODE[char]
+
+    sequence = value & MAX_SEQUENCE
+    worker_id = (value >> SEQUENCE_BITS) & MAX_WORKER_ID
+    timestamp_ms = (value >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+    return timestamp_ms / 1000.0, worker_id, sequence
+
+
+def is_reference(text: Text) -> bool:
+    """True if text is a well-formed appointment reference"""
+    try:
+        decode_reference(text)
+    except ValueError:
+        return False
+    return True
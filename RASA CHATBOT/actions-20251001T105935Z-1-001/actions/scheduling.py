@@ -0,0 +1,220 @@
+# Healthcare Chatbot Scheduling Engine
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Indexed Slot Calendar
+
+"""
+Clinician slot calendar with indexed availability search.
+
+Free slots are kept in one sorted array per slot class (``urgent`` slots are
+held back for high-priority patients, everything else is ``routine``).
+Finding the next free slot after a point in time is a binary search per
+class, and a reservation removes the slot from its array under a lock, so
+two conversations can never be booked into the same slot.
+
+The triage priority selects both the search window (how soon the patient
+should be seen) and which slot classes may be used.
+"""
+
+import datetime
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Text, Tuple
+
+# Opening hours per weekday (Monday=0), matching utter_clinic_hours
+CLINIC_HOURS: Dict[int, Tuple[int, int]] = {
+    0: (8, 18), 1: (8, 18), 2: (8, 18), 3: (8, 18), 4: (8, 18),
+    5: (9, 14),
+}
+
+DEFAULT_CLINICIANS: Tuple[Text, ...] = ("Dr. Patel", "Dr. Nguyen", "Dr. Okafor")
+
+SLOT_LENGTH = datetime.timedelta(minutes=30)
+
+# Every Nth slot of a clinician's day is held for urgent (high priority) care
+URGENT_EVERY = 4
+
+# How far ahead of today the calendar may be opened
+MAX_HORIZON = datetime.timedelta(days=90)
+
+# (earliest, latest) offsets from now in which each priority should be seen
+SEARCH_WINDOWS: Dict[Text, Tuple[datetime.timedelta, datetime.timedelta]] = {
+    "high": (datetime.timedelta(hours=2), datetime.timedelta(days=2)),
+    "medium": (datetime.timedelta(days=1), datetime.timedelta(days=5)),
+    "low": (datetime.timedelta(days=3), datetime.timedelta(days=14)),
+}
+
+# Slot classes each priority may book into
+PRIORITY_CLASSES: Dict[Text, Tuple[Text, ...]] = {
+    "high": ("urgent", "routine"),
+    "medium": ("routine",),
+    "low": ("routine",),
+}
+
+_Entry = Tuple[datetime.datetime, Text]
+
+
+class NoAvailableSlotError(Exception):
+    """Raised when no free slot exists within the calendar horizon"""
+
+
+@dataclass(frozen=True)
+class Slot:
+    """A bookable appointment slot with one clinician"""
+
+    start: datetime.datetime
+    clinician: Text
+    slot_class: Text
+
+    def describe(self) -> Text:
+        """Human readable time, e.g. 'October 19 at 2:30 PM'"""
+        hour = self.start.hour % 12 or 12
+        return f"{self.start:%B %d} at {hour}:{self.start:%M %p}"
+
+
+def _priority_key(priority: Optional[Text]) -> Text:
+    return priority if priority in SEARCH_WINDOWS else "low"
+
+
+class SlotCalendar:
+    """Free-slot index for a set of clinicians"""
+
+    def __init__(self, clinicians: Sequence[Text] = DEFAULT_CLINICIANS,
+                 start: Optional[datetime.date] = None, days: int = 28) -> None:
+        # Sorted so entries sharing a start time stay in index order
+        self.clinicians = tuple(sorted(clinicians))
+        self._lock = threading.Lock()
+        self._free: Dict[Text, List[_Entry]] = {"urgent": [], "routine": []}
+        self._days = days
+        self._horizon = start or datetime.date.today()
+        self._ensure_horizon(self._horizon + datetime.timedelta(days=days))
+
+    def empty_copy(self) -> "SlotCalendar":
+        """A calendar of the same clinicians opened from today, with every slot free"""
+        return SlotCalendar(self.clinicians, days=self._days)
+
+    def _ensure_horizon(self, until: datetime.date) -> None:
+        # Days are opened in order, so appending keeps every index sorted.
+        # The limit moves with the date, so a long-running server keeps
+        # opening new days; days already past are never opened.
+        today = datetime.date.today()
+        limit = today + MAX_HORIZON
+        self._horizon = max(self._horizon, today)
+        while self._horizon < min(until, limit):
+            day = self._horizon
+            self._horizon += datetime.timedelta(days=1)
+            hours = CLINIC_HOURS.get(day.weekday())
+            if hours is None:
+                continue
+
+            opening = datetime.datetime.combine(day, datetime.time(hours[0]))
+            closing = datetime.datetime.combine(day, datetime.time(hours[1]))
+            index = 0
+            start = opening
+            while start < closing:
+                slot_class = "urgent" if index % URGENT_EVERY == URGENT_EVERY - 1 else "routine"
+                for clinician in self.clinicians:
+                    self._free[slot_class].append((start, clinician))
+                start += SLOT_LENGTH
+                index += 1
+
+    def _find(self, classes: Sequence[Text], after: datetime.datetime,
+              before: Optional[datetime.datetime]) -> Optional[Slot]:
+        best: Optional[Tuple[_Entry, Text]] = None
+        for slot_class in classes:
+            free = self._free[slot_class]
+            position = bisect_left(free, (after,))
+            if position < len(free) and (before is None or free[position][0] < before):
+                if best is None or free[position] < best[0]:
+                    best = (free[position], slot_class)
+        if best is None:
+            return None
+        (start, clinician), slot_class = best
+        return Slot(start, clinician, slot_class)
+
+    def _trim(self, before: datetime.datetime) -> None:
+        # Slots that have started can never be booked again
+        for free in self._free.values():
+            position = bisect_left(free, (before,))
+            if position:
+                del free[:position]
+
+    def _locate(self, priority: Optional[Text],
+                now: Optional[datetime.datetime]) -> Optional[Slot]:
+        key = _priority_key(priority)
+        now = now or datetime.datetime.now()
+        earliest, latest = SEARCH_WINDOWS[key]
+        window_start, window_end = now + earliest, now + latest
+
+        self._trim(datetime.datetime.combine(now.date(), datetime.time()))
+        self._ensure_horizon(window_end.date() + datetime.timedelta(days=1))
+        classes = PRIORITY_CLASSES[key]
+        slot = self._find(classes, window_start, window_end)
+        if slot is None:
+            # Window is full: fall back to the first opening after it
+            self._ensure_horizon(datetime.date.today() + MAX_HORIZON)
+            slot = self._find(classes, window_end, None)
+        return slot
+
+    def find_next_free(self, priority: Optional[Text],
+                       now: Optional[datetime.datetime] = None) -> Optional[Slot]:
+        """Earliest free slot for a priority, preferring its search window"""
+        with self._lock:
+            return self._locate(priority, now)
+
+    def reserve(self, priority: Optional[Text],
+                now: Optional[datetime.datetime] = None) -> Slot:
+        """Atomically find and remove the next free slot for a priority"""
+        with self._lock:
+            slot = self._locate(priority, now)
+            if slot is None:
+                raise NoAvailableSlotError(f"No free slots for {priority or 'routine'} care")
+            free = self._free[slot.slot_class]
+            del free[bisect_left(free, (slot.start, slot.clinician))]
+            return slot
+
+    def release(self, slot: Slot) -> None:
+        """Return a reserved slot to the free index"""
+        with self._lock:
+            free = self._free[slot.slot_class]
+            entry = (slot.start, slot.clinician)
+            position = bisect_left(free, entry)
+            if position == len(free) or free[position] != entry:
+                free.insert(position, entry)
+
+    def claim(self, slot: Slot) -> bool:
+        """Remove a specific slot from the free index; False if already taken"""
+        with self._lock:
+            self._ensure_horizon(slot.start.date() + datetime.timedelta(days=1))
+            free = self._free[slot.slot_class]
+            entry = (slot.start, slot.clinician)
+            position = bisect_left(free, entry)
+            if position == len(free) or free[position] != entry:
+                return False
+            del free[position]
+            return True
+
+    def peek(self, priority: Optional[Text], count: int = 3,
+             now: Optional[datetime.datetime] = None) -> List[Slot]:
+        """First free slot on each of the next `count` days, without reserving"""
+        key = _priority_key(priority)
+        now = now or datetime.datetime.now()
+        after = now + SEARCH_WINDOWS[key][0]
+
+        slots: List[Slot] = []
+        with self._lock:
+            while len(slots) < count:
+                self._ensure_horizon(after.date() + datetime.timedelta(days=7))
+                slot = self._find(PRIORITY_CLASSES[key], after, None)
+                if slot is None:
+                    break
+                slots.append(slot)
+                # Jump to the next day so each option is on a different date
+                after = datetime.datetime.combine(
+                    slot.start.date() + datetime.timedelta(days=1), datetime.time()
+                )
+        return slots
+
+    def free_count(self) -> int:
+        """Number of free slots currently opened in the calendar"""
+        return sum(len(free) for free in self._free.values())
@@ -0,0 +1,435 @@
+# Healthcare Chatbot Appointment Store
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Persistent Appointment Records
+
+"""
+Persistence layer for appointment records.
+
+:class:`SQLAppointmentStore` works with SQLite for local runs and with
+PostgreSQL (via ``psycopg2``) when configured like the ``tracker_store``
+section of ``endpoints.yml``:
+
+    appointment_store:
+      type: sql
+      dialect: "postgresql"
+      url: "localhost"
+      db: "rasa"
+      username: "rasa_user"
+      password: "rasa_password"
+      pool_size: 8
+
+Database calls run on a bounded pool of long-lived connections, each used
+from a worker thread so the event loop never blocks. Statements are fixed,
+parameterised SQL so drivers reuse their prepared form, and writes issued
+by concurrent conversations are grouped into a single transaction.
+
+The table is the authority on which slots are taken: a unique index over the
+slot of every confirmed appointment makes a second booking of the same slot
+fail with :class:`SlotTakenError`, however many action-server processes share
+the database. A second appointment under an existing reference, which only
+happens when two processes share a worker id (see ``references.py``), fails
+with :class:`ReferenceTakenError` instead of overwriting anything.
+"""
+
+import asyncio
+import datetime
+import logging
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Text, Tuple
+
+from .scheduling import Slot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINTS_PATH = os.environ.get("ACTION_ENDPOINTS", "endpoints.yml")
+DEFAULT_SQLITE_DB = "appointments.db"
+
+# Column order shared by every statement below
+COLUMNS = (
+    "reference", "sender_id", "priority", "symptoms", "time",
+    "slot_start", "clinician", "slot_class", "status",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS appointment (
+    reference VARCHAR(32) PRIMARY KEY,
+    sender_id VARCHAR(255) NOT NULL,
+    priority VARCHAR(16),
+    symptoms TEXT,
+    time VARCHAR(64) NOT NULL,
+    slot_start VARCHAR(32),
+    clinician VARCHAR(64),
+    slot_class VARCHAR(16),
+    status VARCHAR(16) NOT NULL
+)
+"""
+
+INSERT_SQL = (
+    f"INSERT INTO appointment ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join(['{p}'] * len(COLUMNS))})"
+)
+SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM appointment WHERE reference = {{p}}"
+SELECT_ACTIVE_SQL = (
+    f"SELECT {', '.join(COLUMNS)} FROM appointment "
+    f"WHERE status = 'confirmed' AND slot_start >= {{p}}"
+)
+UPDATE_STATUS_SQL = "UPDATE appointment SET status = {p} WHERE reference = {p}"
+
+# One confirmed appointment per clinician slot; cancelled ones free the slot
+SLOT_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS appointment_slot "
+    "ON appointment (slot_start, clinician) WHERE status = 'confirmed'"
+)
+
+
+class SlotTakenError(Exception):
+    """Raised when the slot of a new appointment is already booked"""
+
+
+class ReferenceTakenError(Exception):
+    """Raised when an appointment with the same reference already exists"""
+
+
+def _conflict(error: BaseException) -> Optional[Exception]:
+    """The booking conflict a failed insert reports, if it is one"""
+    # sqlite3 and psycopg2 both derive their errors from the DB-API IntegrityError
+    if not any(cls.__name__ == "IntegrityError" for cls in type(error).__mro__):
+        return None
+    message = str(error)
+    # SQLite names the columns (appointment.slot_start, appointment.reference),
+    # PostgreSQL the index (appointment_slot, appointment_pkey)
+    if "slot" in message:
+        return SlotTakenError(message)
+    if "reference" in message or "pkey" in message:
+        return ReferenceTakenError(message)
+    return None
+
+
+def record_to_row(record: Dict[Text, Any]) -> Tuple[Any, ...]:
+    """Flatten an appointment record into a table row"""
+    slot: Optional[Slot] = record.get("slot")
+    return (
+        record["reference"], record["sender_id"], record["priority"],
+        record["symptoms"], record["time"],
+        slot.start.isoformat() if slot else None,
+        slot.clinician if slot else None,
+        slot.slot_class if slot else None,
+        record["status"],
+    )
+
+
+def row_to_record(row: Tuple[Any, ...]) -> Dict[Text, Any]:
+    """Rebuild an appointment record from a table row"""
+    values = dict(zip(COLUMNS, row))
+    slot_start = values.pop("slot_start")
+    clinician = values.pop("clinician")
+    slot_class = values.pop("slot_class")
+    values["slot"] = (
+        Slot(datetime.datetime.fromisoformat(slot_start), clinician, slot_class)
+        if slot_start else None
+    )
+    return values
+
+
+class AppointmentStore(ABC):
+    """Async storage for appointment records keyed by reference"""
+
+    @abstractmethod
+    async def save(self, record: Dict[Text, Any]) -> None:
+        """Persist a new appointment record
+
+        Raises SlotTakenError when a confirmed appointment holds its slot and
+        ReferenceTakenError when an appointment has the same reference.
+        """
+
+    @abstractmethod
+    async def get(self, reference: Text) -> Optional[Dict[Text, Any]]:
+        """Return the record for a reference, if any"""
+
+    @abstractmethod
+    async def set_status(self, reference: Text, status: Text) -> None:
+        """Update the status of an appointment"""
+
+    @abstractmethod
+    async def active_since(self, since: datetime.datetime) -> List[Dict[Text, Any]]:
+        """Confirmed appointments whose slot starts at or after `since`"""
+
+
+class InMemoryAppointmentStore(AppointmentStore):
+    """Dict-backed store for tests and load tests"""
+
+    def __init__(self) -> None:
+        self.records: Dict[Text, Dict[Text, Any]] = {}
+        # Reference of the confirmed appointment holding each slot
+        self.slots: Dict[Tuple[datetime.datetime, Text], Text] = {}
+
+    async def save(self, record: Dict[Text, Any]) -> None:
+        if record["reference"] in self.records:
+            raise ReferenceTakenError(f"Appointment {record['reference']} already exists")
+        slot: Optional[Slot] = record.get("slot")
+        if slot is not None and record["status"] == "confirmed":
+            key = (slot.start, slot.clinician)
+            if key in self.slots:
+                raise SlotTakenError(f"{slot.describe()} with {slot.clinician} is already booked")
+            self.slots[key] = record["reference"]
+        self.records[record["reference"]] = dict(record)
+
+    async def get(self, reference: Text) -> Optional[Dict[Text, Any]]:
+        record = self.records.get(reference)
+        return dict(record) if record else None
+
+    async def set_status(self, reference: Text, status: Text) -> None:
+        record = self.records.get(reference)
+        if record is not None:
+            record["status"] = status
+            slot = record["slot"]
+            if slot is not None and status != "confirmed":
+                self.slots.pop((slot.start, slot.clinician), None)
+
+    async def active_since(self, since: datetime.datetime) -> List[Dict[Text, Any]]:
+        return [
+            dict(record) for record in self.records.values()
+            if record["status"] == "confirmed" and record["slot"] and record["slot"].start >= since
+        ]
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections driven from worker threads"""
+
+    def __init__(self, connect: Callable[[], Any], size: int = 5) -> None:
+        self._connect = connect
+        self.size = size
+        self._idle: List[Any] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="appointment-db")
+
+    def _call(self, connection: Any, fn: Callable[[Any], Any]) -> Tuple[Any, Any]:
+        if connection is None:
+            connection = self._connect()
+        try:
+            return connection, fn(connection)
+        except Exception:
+            connection.close()
+            raise
+
+    async def run(self, fn: Callable[[Any], Any]) -> Any:
+        """Run fn(connection) on a pooled connection without blocking the loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+
+        async with self._semaphore:
+            connection = self._idle.pop() if self._idle else None
+            loop = asyncio.get_running_loop()
+            connection, result = await loop.run_in_executor(
+                self._executor, self._call, connection, fn
+            )
+            self._idle.append(connection)
+            return result
+
+    def close(self) -> None:
+        """Close idle connections and stop the worker threads"""
+        for connection in self._idle:
+            connection.close()
+        self._idle.clear()
+        self._executor.shutdown(wait=True)
+
+
+class SQLAppointmentStore(AppointmentStore):
+    """SQL-backed store with pooled connections and batched writes"""
+
+    def __init__(self, connect: Callable[[], Any], placeholder: Text = "?",
+                 pool_size: int = 5, batch_size: int = 64,
+                 flush_interval: float = 0.002) -> None:
+        self.pool = ConnectionPool(connect, pool_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._insert = INSERT_SQL.format(p=placeholder)
+        self._select = SELECT_SQL.format(p=placeholder)
+        self._select_active = SELECT_ACTIVE_SQL.format(p=placeholder)
+        self._update_status = UPDATE_STATUS_SQL.format(p=placeholder)
+
+        self._schema_ready = False
+        self._pending: List[Tuple[Text, Tuple[Any, ...], asyncio.Future]] = []
+        self._batch_full: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Future] = None
+
+    async def _ensure_schema(self) -> None:
+        if not self._schema_ready:
+            def create(connection: Any) -> None:
+                cursor = connection.cursor()
+                cursor.execute(SCHEMA)
+                connection.commit()
+                try:
+                    cursor.execute(SLOT_INDEX)
+                    connection.commit()
+                except Exception as e:
+                    # E.g. a table that already holds two bookings of one slot
+                    connection.rollback()
+                    logger.error(f"Slot uniqueness is not enforced by the appointment table: {e}")
+            await self.pool.run(create)
+            self._schema_ready = True
+
+    async def _write(self, sql: Text, params: Tuple[Any, ...]) -> None:
+        await self._ensure_schema()
+        if self._batch_full is None:
+            self._batch_full = asyncio.Event()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((sql, params, future))
+        if len(self._pending) >= self.batch_size:
+            self._batch_full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush())
+        await future
+
+    async def _flush(self) -> None:
+        # Group commit: wait briefly for other conversations' writes, then
+        # apply everything queued in one transaction
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            batch, self._pending = self._pending, []
+
+            def apply(connection: Any) -> List[Optional[Exception]]:
+                cursor = connection.cursor()
+                try:
+                    grouped: Dict[Text, List[Tuple[Any, ...]]] = {}
+                    for sql, params, _ in batch:
+                        grouped.setdefault(sql, []).append(params)
+                    for sql, rows in grouped.items():
+                        cursor.executemany(sql, rows)
+                    connection.commit()
+                    return [None] * len(batch)
+                except Exception:
+                    connection.rollback()
+
+                # One change per transaction, so a conflicting booking fails
+                # on its own instead of failing the whole group
+                errors: List[Optional[Exception]] = []
+                for sql, params, _ in batch:
+                    try:
+                        cursor.execute(sql, params)
+                        connection.commit()
+                        errors.append(None)
+                    except Exception as e:
+                        connection.rollback()
+                        errors.append(e)
+                if all(errors) and not any(_conflict(e) for e in errors):
+                    # Most likely the connection itself: let the pool drop it
+                    raise errors[0]
+                return errors
+
+            try:
+                errors = await self.pool.run(apply)
+            except Exception as e:
+                errors = [e] * len(batch)
+            failures = [e for e in errors if e is not None and not _conflict(e)]
+            if failures:
+                logger.error(f"Failed to write {len(failures)} appointment changes: {failures[0]}")
+            for (_, _, future), error in zip(batch, errors):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(_conflict(error) or error)
+
+    async def _read(self, sql: Text, params: Tuple[Any, ...]) -> List[Tuple[Any, ...]]:
+        await self._ensure_schema()
+
+        def fetch(connection: Any) -> List[Tuple[Any, ...]]:
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            connection.commit()
+            return rows
+
+        return await self.pool.run(fetch)
+
+    async def save(self, record: Dict[Text, Any]) -> None:
+        await self._write(self._insert, record_to_row(record))
+
+    async def get(self, reference: Text) -> Optional[Dict[Text, Any]]:
+        rows = await self._read(self._select, (reference,))
+        return row_to_record(rows[0]) if rows else None
+
+    async def set_status(self, reference: Text, status: Text) -> None:
+        await self._write(self._update_status, (status, reference))
+
+    async def active_since(self, since: datetime.datetime) -> List[Dict[Text, Any]]:
+        rows = await self._read(self._select_active, (since.isoformat(),))
+        return [row_to_record(row) for row in rows]
+
+
+def _sqlite_connect(path: Text) -> Callable[[], Any]:
+    import sqlite3
+
+    def connect() -> sqlite3.Connection:
+        connection = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+    return connect
+
+
+def _postgres_connect(config: Dict[Text, Any]) -> Callable[[], Any]:
+    import psycopg2
+
+    url = config.get("url", "localhost")
+
+    def connect() -> Any:
+        if "://" in url:
+            return psycopg2.connect(url)
+        return psycopg2.connect(
+            host=url,
+            port=config.get("port", 5432),
+            dbname=config.get("db", "rasa"),
+            user=config.get("username"),
+            password=config.get("password"),
+        )
+    return connect
+
+
+def create_appointment_store(config: Optional[Dict[Text, Any]] = None) -> AppointmentStore:
+    """Build the store described by an `appointment_store` endpoint config"""
+    config = config or {}
+    store_type = config.get("type", "sql")
+    dialect = config.get("dialect", "sqlite")
+
+    if store_type == "in_memory":
+        return InMemoryAppointmentStore()
+    if store_type != "sql":
+        raise ValueError(f"Unknown appointment store type: {store_type}")
+
+    pool_size = int(config.get("pool_size", 5))
+    if dialect == "sqlite":
+        return SQLAppointmentStore(
+            _sqlite_connect(config.get("db", DEFAULT_SQLITE_DB)), "?", pool_size
+        )
+    if dialect == "postgresql":
+        return SQLAppointmentStore(_postgres_connect(config), "%s", pool_size)
+    raise ValueError(f"Unsupported appointment store dialect: {dialect}")
+
+
+def load_endpoint_config(section: Text,
+                         path: Text = DEFAULT_ENDPOINTS_PATH) -> Optional[Dict[Text, Any]]:
+    """Read one section of endpoints.yml, if present"""
+    import yaml
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            endpoints = yaml.safe_load(f) or {}
+    except OSError:
+        return None
+    return endpoints.get(section)
+
+
+def load_store_config(path: Text = DEFAULT_ENDPOINTS_PATH) -> Optional[Dict[Text, Any]]:
+    """Read the `appointment_store` section of endpoints.yml, if present"""
+    return load_endpoint_config("appointment_store", path)
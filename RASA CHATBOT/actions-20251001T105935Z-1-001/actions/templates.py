@@ -0,0 +1,123 @@
+# Healthcare Chatbot Message Templates
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Response Template Registry
+
+"""
+Registry of the long-form messages sent by the custom actions.
+
+Message bodies live in ``templates.yml`` beside this module and are parsed
+once into literal segments and placeholder names. Templates without
+placeholders are returned as the stored string; the rest are rendered with a
+single join and memoised in an LRU cache keyed on the placeholder values, so
+repeated turns with the same slots reuse the same string object. The file
+is not read at import: ``action_server.py`` loads it in its parent process
+at startup, before it forks the workers, and any other server reads it on
+the first render.
+"""
+
+import logging
+import os
+import random
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATES_PATH = os.environ.get(
+    "ACTION_TEMPLATES_PATH", os.path.join(os.path.dirname(__file__), "templates.yml")
+)
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class MessageTemplate:
+    """One template pre-split into literal segments and placeholders"""
+
+    __slots__ = ("name", "segments", "fields", "static")
+
+    def __init__(self, name: Text, text: Text) -> None:
+        self.name = name
+        segments: List[Tuple[Text, Optional[Text]]] = []
+        for literal, field, format_spec, conversion in Formatter().parse(text):
+            if format_spec or conversion:
+                raise ValueError(f"Template '{name}': format specs are not supported")
+            if field is not None and not field.isidentifier():
+                raise ValueError(f"Template '{name}': invalid placeholder '{{{field}}}'")
+            segments.append((literal, field))
+
+        self.segments = tuple(segments)
+        self.fields = tuple(sorted({field for _, field in segments if field}))
+        # Formatter.parse also unescapes {{ and }}, so rebuild static text from segments
+        self.static = "".join(literal for literal, _ in segments) if not self.fields else None
+
+    def render(self, values: Dict[Text, Any]) -> Text:
+        """Fill the placeholders from values"""
+        if self.static is not None:
+            return self.static
+        parts = []
+        for literal, field in self.segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(values[field]))
+        return "".join(parts)
+
+
+class TemplateRegistry:
+    """Loads message templates on first use and renders them through an LRU cache"""
+
+    def __init__(self, path: Text = DEFAULT_TEMPLATES_PATH,
+                 cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.path = path
+        self._templates: Optional[Dict[Text, Tuple[MessageTemplate, ...]]] = None
+        self._render_cached = lru_cache(maxsize=cache_size)(self._render_uncached)
+
+    def load(self) -> Dict[Text, Tuple[MessageTemplate, ...]]:
+        """The parsed templates, reading the file if it has not been read yet"""
+        if self._templates is None:
+            self.reload()
+        return self._templates
+
+    def reload(self) -> None:
+        """Re-read the templates file and drop cached renders"""
+        import yaml
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            document = yaml.safe_load(f) or {}
+
+        templates: Dict[Text, Tuple[MessageTemplate, ...]] = {}
+        for name, body in (document.get("templates") or {}).items():
+            variants = body if isinstance(body, list) else [body]
+            templates[name] = tuple(MessageTemplate(name, text) for text in variants)
+
+        self._templates = templates
+        self._render_cached.cache_clear()
+        logger.debug(f"Loaded {len(templates)} message templates from {self.path}")
+
+    def variant_count(self, name: Text) -> int:
+        """Number of alternative wordings for a template"""
+        return len(self.load()[name])
+
+    def _render_uncached(self, name: Text, variant: int,
+                         values: Tuple[Tuple[Text, Any], ...]) -> Text:
+        return self._templates[name][variant].render(dict(values))
+
+    def render(self, name: Text, variant: int = 0, **values: Any) -> Text:
+        """Render a template variant with the given placeholder values"""
+        template = self.load()[name][variant]
+        if template.static is not None:
+            return template.static
+        key = tuple((field, values[field]) for field in template.fields)
+        return self._render_cached(name, variant, key)
+
+    def render_random(self, name: Text, **values: Any) -> Text:
+        """Render a randomly chosen variant of a template"""
+        return self.render(name, random.randrange(self.variant_count(name)), **values)
+
+    def cache_info(self) -> Any:
+        """Hit/miss statistics of the render cache"""
+        return self._render_cached.cache_info()
+
+
+# Loaded once per action-server process
+TEMPLATES = TemplateRegistry()
@@ -0,0 +1,217 @@
+# Healthcare Chatbot Triage Knowledge Base
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Hot-Reloadable Triage Rules
+
+"""
+Data-driven triage rule store.
+
+Severity terms live in ``triage_rules.yml`` next to ``domain.yml``. The file
+is compiled into an immutable :class:`TriageSnapshot` and a background
+watcher thread recompiles it whenever it changes on disk. Publishing a new
+snapshot is a single reference assignment, so requests that already hold
+the previous snapshot finish with it.
+
+Importing this module reads nothing. ``action_server.py`` loads the rules
+file in its parent process at startup, before it forks the workers. In any
+other server the first :meth:`TriageKnowledgeBase.current` call starts the
+watcher, which also does the first load; until the file has been read and
+its scoring matrix compiled, requests are scored with the built-in lexicon,
+so the event loop never reads, parses or compiles the rules itself. A worker
+forked from a process that already loaded the rules keeps the loaded
+snapshot and starts its own watcher on first use, unless the parent called
+:meth:`TriageKnowledgeBase.hold`: the workers of ``action_server.py`` never
+reload on their own; the parent reloads the rules and replaces them, so
+every worker applies the same version.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Text, Tuple
+
+from .triage_lexicon import (
+    DEFAULT_TIER,
+    SUBSTRING_TIERS,
+    TIER_ORDER,
+    TRIAGE_LEXICON,
+    TriageLexicon,
+)
+from .triage_scoring import scorer_for
+
+logger = logging.getLogger(__name__)
+
+# Rules file, resolved against the working directory of `rasa run actions`
+DEFAULT_RULES_PATH = os.environ.get("TRIAGE_RULES_PATH", "triage_rules.yml")
+
+# Seconds between checks of the rules file for modifications
+DEFAULT_POLL_INTERVAL = float(os.environ.get("TRIAGE_RULES_POLL_INTERVAL", "2.0"))
+
+
+@dataclass(frozen=True)
+class TriageSnapshot:
+    """One compiled, read-only version of the triage rules"""
+
+    version: int
+    digest: Text
+    source: Optional[Text]
+    loaded_at: float
+    lexicon: TriageLexicon
+
+
+def parse_triage_rules(raw: Text, path: Text) -> Dict[Text, Any]:
+    """Parse a YAML or JSON rules document into lexicon arguments"""
+    if path.endswith(".json"):
+        document = json.loads(raw)
+    else:
+        import yaml
+
+        try:
+            document = yaml.safe_load(raw)
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path}: {e}") from e
+
+    if not isinstance(document, dict) or not isinstance(document.get("tiers"), dict):
+        raise ValueError(f"{path}: expected a mapping with a 'tiers' section")
+
+    terms: Dict[Text, Tuple[Text, ...]] = {}
+    for tier, values in document["tiers"].items():
+        if tier not in TIER_ORDER:
+            raise ValueError(f"{path}: unknown triage tier '{tier}'")
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            raise ValueError(f"{path}: tier '{tier}' must be a list of strings")
+        terms[tier] = tuple(values)
+
+    return {
+        "terms": terms,
+        "substring_tiers": tuple(document.get("substring_tiers", SUBSTRING_TIERS)),
+        "default_tier": document.get("default_tier", DEFAULT_TIER),
+    }
+
+
+class TriageKnowledgeBase:
+    """Holds the current triage snapshot and swaps it when the file changes"""
+
+    def __init__(self, path: Text = DEFAULT_RULES_PATH,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._file_stamp: Optional[Tuple[float, int]] = None
+        self._held = False
+        self._snapshot = TriageSnapshot(
+            version=0,
+            digest="builtin",
+            source=None,
+            loaded_at=time.time(),
+            lexicon=TRIAGE_LEXICON,
+        )
+
+    def current(self) -> TriageSnapshot:
+        """Return the snapshot to use for the whole of one request"""
+        if self._watcher is None and not self._held:
+            # First use in this process: the watcher reads the file in the
+            # background while this request uses the built-in lexicon
+            self.start_watching()
+        return self._snapshot
+
+    def latest(self) -> TriageSnapshot:
+        """The newest snapshot, without starting the watcher"""
+        return self._snapshot
+
+    def reload(self) -> bool:
+        """Recompile the rules file; returns True if a new snapshot was published"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return False
+
+            stamp = (stat.st_mtime, stat.st_size)
+            if stamp == self._file_stamp:
+                return False
+            self._file_stamp = stamp
+
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+                if digest == self._snapshot.digest:
+                    return False
+                lexicon = TriageLexicon(**parse_triage_rules(raw, self.path))
+            except (OSError, ValueError) as e:
+                logger.error(f"Keeping triage snapshot v{self._snapshot.version}: {e}")
+                return False
+            # Compiled before publishing, so no request compiles it on the event loop
+            scorer_for(lexicon)
+
+            self._snapshot = TriageSnapshot(
+                version=self._snapshot.version + 1,
+                digest=digest,
+                source=self.path,
+                loaded_at=time.time(),
+                lexicon=lexicon,
+            )
+            logger.info(
+                f"Loaded triage snapshot v{self._snapshot.version} "
+                f"({lexicon.term_count} terms) from {self.path}"
+            )
+            return True
+
+    def hold(self) -> None:
+        """Keep serving the current snapshot: no watcher and no reload on first use
+
+        Explicit reload() calls still publish new snapshots.
+        """
+        self._held = True
+        self.stop_watching()
+
+    def start_watching(self) -> None:
+        """Start the background thread that loads, then polls, the rules file"""
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, name="triage-rules-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stop the watcher thread"""
+        self._stop.set()
+        watcher = self._watcher
+        if watcher is not None and watcher is not threading.current_thread():
+            watcher.join()
+
+    def reset_after_fork(self) -> None:
+        """Drop the parent's lock and watcher thread, which do not survive fork"""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def _watch(self) -> None:
+        try:
+            # Scorer of the built-in lexicon, used until the file is loaded
+            scorer_for(self._snapshot.lexicon)
+        except Exception:
+            logger.exception("Could not compile the built-in triage scorer")
+        while True:
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Triage rules watcher failed to reload")
+            if self._stop.wait(self.poll_interval):
+                return
+
+
+# Shared by every triage turn in this action-server process
+TRIAGE_KNOWLEDGE = TriageKnowledgeBase()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=TRIAGE_KNOWLEDGE.reset_after_fork)
@@ -0,0 +1,198 @@
+# Healthcare Chatbot Triage Lexicon
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Symptom Classification Index
+
+"""
+Precompiled symptom-classification index for the triage action.
+
+Severity keywords are compiled once into two structures:
+
+* an Aho-Corasick automaton for tiers matched as substrings of a reported
+  symptom (e.g. "chest pain" inside "sudden chest pain"), and
+* a hash index of normalized phrases for tiers matched exactly.
+
+All symptoms of a turn are scanned in a single linear pass, so the cost of
+classification depends on the length of the reported text rather than on
+the number of clinical terms in the lexicon.
+"""
+
+from typing import Dict, Iterable, List, Optional, Text, Tuple
+
+# Severity tiers from most to least urgent
+TIER_ORDER: Tuple[Text, ...] = ("emergency", "high", "medium", "low")
+
+# Tier returned when no keyword matches
+DEFAULT_TIER = "low"
+
+# Tiers whose keywords match anywhere inside a symptom
+SUBSTRING_TIERS: Tuple[Text, ...] = ("emergency",)
+
+DEFAULT_TRIAGE_TERMS: Dict[Text, Tuple[Text, ...]] = {
+    # Emergency symptoms that require immediate attention
+    "emergency": (
+        "chest pain", "difficulty breathing", "shortness of breath",
+        "severe bleeding", "unconscious", "heart attack", "stroke",
+        "severe head injury", "poisoning", "severe allergic reaction",
+    ),
+    # High priority symptoms
+    "high": (
+        "fever", "severe headache", "persistent vomiting",
+        "severe abdominal pain", "difficulty swallowing",
+    ),
+    # Medium priority symptoms
+    "medium": (
+        "headache", "nausea", "fatigue", "joint pain", "muscle aches",
+        "sore throat", "cough", "dizziness",
+    ),
+    # Low priority symptoms
+    "low": (
+        "minor cuts", "bruises", "mild headache", "runny nose",
+        "minor rash", "mild indigestion",
+    ),
+}
+
+# Separator placed between symptoms so no keyword can span two of them
+_SEPARATOR = "\x00"
+
+
+def normalize_symptom(text: Text) -> Text:
+    """Lower-case a symptom and collapse runs of whitespace"""
+    return " ".join(text.lower().split())
+
+
+class AhoCorasickMatcher:
+    """Multi-pattern substring matcher reporting the most urgent tier rank"""
+
+    __slots__ = ("_goto", "_fail", "_rank", "_no_match")
+
+    def __init__(self, patterns: Dict[Text, int], no_match: int) -> None:
+        self._no_match = no_match
+        self._goto: List[Dict[Text, int]] = [{}]
+        self._rank: List[int] = [no_match]
+
+        # Build the keyword trie
+        for pattern, rank in patterns.items():
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._rank.append(no_match)
+                node = next_node
+            self._rank[node] = min(self._rank[node], rank)
+
+        # Breadth-first pass for failure links; each node inherits the best
+        # rank of its failure chain so scanning never has to walk outputs.
+        self._fail: List[int] = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._rank[child] = min(self._rank[child], self._rank[self._fail[child]])
+                queue.append(child)
+
+    def best_rank(self, text: Text, stop_at: int = 0) -> int:
+        """Return the lowest rank of any pattern found in text"""
+        goto, fail, ranks = self._goto, self._fail, self._rank
+        best = self._no_match
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if ranks[node] < best:
+                best = ranks[node]
+                if best <= stop_at:
+                    break
+        return best
+
+
+class TriageLexicon:
+    """Immutable severity lexicon compiled for single-pass classification"""
+
+    __slots__ = ("_tiers", "_default_rank", "_default_tier", "_automaton", "_exact_index",
+                 "term_count", "terms", "substring_tiers")
+
+    def __init__(self, terms: Dict[Text, Iterable[Text]],
+                 substring_tiers: Iterable[Text] = SUBSTRING_TIERS,
+                 default_tier: Text = DEFAULT_TIER) -> None:
+        self._tiers: Tuple[Text, ...] = tuple(tier for tier in TIER_ORDER if tier in terms)
+        unknown = set(terms) - set(self._tiers)
+        if unknown:
+            raise ValueError(f"Unknown triage tiers: {', '.join(sorted(unknown))}")
+        if default_tier not in TIER_ORDER:
+            raise ValueError(f"Unknown default triage tier: {default_tier}")
+
+        substring_tiers = set(substring_tiers)
+        no_match = len(self._tiers)
+        substring_patterns: Dict[Text, int] = {}
+        exact_index: Dict[Text, int] = {}
+        tier_terms: Dict[Text, List[Text]] = {tier: [] for tier in self._tiers}
+        count = 0
+
+        for rank, tier in enumerate(self._tiers):
+            for term in terms[tier]:
+                normalized = normalize_symptom(term)
+                if not normalized:
+                    continue
+                count += 1
+                tier_terms[tier].append(normalized)
+                target = substring_patterns if tier in substring_tiers else exact_index
+                target[normalized] = min(target.get(normalized, rank), rank)
+
+        self._automaton = AhoCorasickMatcher(substring_patterns, no_match)
+        self._exact_index = exact_index
+        self._default_rank = no_match
+        self._default_tier = default_tier
+        self.term_count = count
+        # Tiers whose terms match anywhere inside a symptom
+        self.substring_tiers: Tuple[Text, ...] = tuple(
+            tier for tier in self._tiers if tier in substring_tiers
+        )
+        # Normalized terms per tier, most urgent tier first
+        self.terms: Dict[Text, Tuple[Text, ...]] = {
+            tier: tuple(values) for tier, values in tier_terms.items()
+        }
+
+    @property
+    def tiers(self) -> Tuple[Text, ...]:
+        """Tiers with at least one term, most urgent first"""
+        return self._tiers
+
+    @property
+    def default_tier(self) -> Text:
+        """Tier assigned when nothing matches"""
+        return self._default_tier
+
+    def classify(self, symptoms: Iterable[Text]) -> Text:
+        """Return the most urgent severity tier matched by any symptom"""
+        normalized = [normalize_symptom(symptom) for symptom in symptoms]
+        best = self._automaton.best_rank(_SEPARATOR.join(normalized))
+        if best:
+            lookup = self._exact_index.get
+            for symptom in normalized:
+                rank = lookup(symptom, best)
+                if rank < best:
+                    best = rank
+        return self.tier_for_rank(best)
+
+    def tier_for_rank(self, rank: int) -> Text:
+        """Map a match rank back to its tier name"""
+        if rank >= self._default_rank:
+            return self._default_tier
+        return self._tiers[rank]
+
+
+def build_lexicon(terms: Optional[Dict[Text, Iterable[Text]]] = None) -> TriageLexicon:
+    """Compile a lexicon from tier -> terms, defaulting to the built-in list"""
+    return TriageLexicon(terms if terms is not None else DEFAULT_TRIAGE_TERMS)
+
+
+# Compiled once at import time and shared by every triage turn
+TRIAGE_LEXICON = build_lexicon()
@@ -0,0 +1,208 @@
+# Healthcare Chatbot Triage Memo
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Consistent Repeat Triage Answers
+
+"""
+Memo of triage results per conversation and symptom set.
+
+Patients often repeat or rephrase a complaint. The triage action looks up
+the conversation's sender id and its normalized set of symptoms here first
+and, on a hit, answers with the priority and the exact message it gave
+before instead of classifying again and picking a new random wording.
+Keys include the digest of the triage rules snapshot, so editing
+``triage_rules.yml`` makes old entries unreachable.
+
+Entries expire after a TTL. The default backend is a bounded in-process LRU,
+private to each worker; configure ``triage_memo`` in ``endpoints.yml`` to
+share entries between workers and hosts through Redis:
+
+    triage_memo:
+      type: redis
+      url: "localhost"
+      port: 6379
+      db: 1
+      ttl: 1800
+
+Lookups and updates are coroutines: the Redis memo uses ``redis.asyncio``,
+so a round trip to Redis never blocks the action server's event loop. The
+memo only saves work, so a Redis error is logged and treated as a miss.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Text, Tuple
+
+from .store import load_endpoint_config
+from .triage_lexicon import normalize_symptom
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 1800.0
+DEFAULT_MAX_ENTRIES = 10000
+REDIS_KEY_PREFIX = "triage_memo:"
+
+
+def symptom_set(symptoms: Iterable[Text]) -> FrozenSet[Text]:
+    """Normalized symptoms, ignoring order, case, spacing and repeats"""
+    return frozenset(filter(None, (normalize_symptom(symptom) for symptom in symptoms)))
+
+
+def memo_key(sender_id: Text, symptoms: FrozenSet[Text], rules_digest: Text) -> Text:
+    """Fixed-length key for one conversation, symptom set and rules version"""
+    raw = "\x1f".join([sender_id, rules_digest, *sorted(symptoms)])
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TriageMemo(ABC):
+    """Store of memoized triage results with a time to live"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: Text) -> Optional[Dict[Text, Any]]:
+        """The result stored under a key, if present and not expired"""
+        result = await self._get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    @abstractmethod
+    async def put(self, key: Text, result: Dict[Text, Any]) -> None:
+        """Store a result for the TTL"""
+
+    @abstractmethod
+    async def _get(self, key: Text) -> Optional[Dict[Text, Any]]:
+        pass
+
+
+class InMemoryTriageMemo(TriageMemo):
+    """Bounded LRU private to this process"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        # key -> (expiry on the monotonic clock, result)
+        self._entries: "OrderedDict[Text, Tuple[float, Dict[Text, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _get(self, key: Text) -> Optional[Dict[Text, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    async def put(self, key: Text, result: Dict[Text, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisTriageMemo(TriageMemo):
+    """Entries shared by every worker connected to the same Redis database
+
+    ``client`` is a ``redis.asyncio.Redis`` client; it binds its connections
+    to the event loop of the worker that first uses it.
+    """
+
+    def __init__(self, client: Any, ttl: float = DEFAULT_TTL) -> None:
+        import redis
+
+        super().__init__(ttl)
+        self.client = client
+        self._errors = (redis.RedisError, ValueError)
+
+    async def _get(self, key: Text) -> Optional[Dict[Text, Any]]:
+        try:
+            raw = await self.client.get(REDIS_KEY_PREFIX + key)
+            return json.loads(raw) if raw is not None else None
+        except self._errors as e:
+            logger.warning(f"Triage memo lookup failed: {e}")
+            return None
+
+    async def put(self, key: Text, result: Dict[Text, Any]) -> None:
+        try:
+            await self.client.set(
+                REDIS_KEY_PREFIX + key, json.dumps(result), px=int(self.ttl * 1000)
+            )
+        except self._errors as e:
+            logger.warning(f"Triage memo update failed: {e}")
+
+
+def create_triage_memo(config: Optional[Dict[Text, Any]] = None) -> TriageMemo:
+    """Build the memo described by a `triage_memo` endpoint config"""
+    config = config or {}
+    memo_type = config.get("type", "in_memory")
+    ttl = float(config.get("ttl", DEFAULT_TTL))
+
+    if memo_type == "in_memory":
+        return InMemoryTriageMemo(ttl, int(config.get("max_entries", DEFAULT_MAX_ENTRIES)))
+    if memo_type == "redis":
+        from redis import asyncio as aioredis
+
+        client = aioredis.Redis(
+            host=config.get("url", "localhost"),
+            port=int(config.get("port", 6379)),
+            db=int(config.get("db", 0)),
+            password=config.get("password"),
+            socket_timeout=float(config.get("socket_timeout", 0.2)),
+        )
+        return RedisTriageMemo(client, ttl)
+    raise ValueError(f"Unknown triage memo type: {memo_type}")
+
+
+# Created on first use, like the scheduling backend
+_memo: Optional[TriageMemo] = None
+_creating: Optional["asyncio.Future[TriageMemo]"] = None
+
+
+def load_triage_memo() -> TriageMemo:
+    """The memo described by endpoints.yml; reads the file, so call it off the event loop"""
+    return create_triage_memo(load_endpoint_config("triage_memo"))
+
+
+async def get_triage_memo() -> TriageMemo:
+    """Return the memo used by the triage action
+
+    The first call reads its configuration in a worker thread, so the event
+    loop never waits on endpoints.yml; concurrent first calls share it.
+    """
+    global _memo, _creating
+    if _memo is None:
+        if _creating is None:
+            loop = asyncio.get_running_loop()
+            _creating = asyncio.ensure_future(loop.run_in_executor(None, load_triage_memo))
+        creating = _creating
+        try:
+            created = await asyncio.shield(creating)
+        finally:
+            if _creating is creating and creating.done():
+                _creating = None
+        if _memo is None:
+            _memo = created
+    return _memo
+
+
+def set_triage_memo(memo: TriageMemo) -> None:
+    """Replace the memo (shared Redis instance, tests, load tests)"""
+    global _memo
+    _memo = memo
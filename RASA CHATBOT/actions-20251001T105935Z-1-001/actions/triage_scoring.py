@@ -0,0 +1,365 @@
+# Healthcare Chatbot Triage Scoring
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Aggregate Multi-Symptom Triage
+
+"""
+Aggregate triage scoring over every entity of a turn.
+
+The entities of a message (``symptom``, ``severity``, ``duration`` and
+``body_part``) become binary features: one per severity term of the triage
+rules, plus severity, duration and body-part modifiers. Terms of the rules'
+``substring_tiers`` match anywhere inside a reported symptom, as in
+:meth:`TriageLexicon.classify` (so "chest pains" counts as "chest pain");
+the others match as a whole word or phrase (so "severe fever" counts as
+"fever"). A severity word counts when it comes from a ``severity`` entity or
+stands within ``SEVERITY_WINDOW`` words of a symptom in the same clause, and
+never right after a negation ("fever, not severe at all"). Duration and
+body-part words are also picked up from the message text. The feature
+vectors of a batch of turns are multiplied by a (features x tiers) weight
+matrix in one NumPy operation:
+
+* a term adds 1.0 to its own tier and every less urgent one, and
+  ``ESCALATION_WEIGHT`` to the next more urgent tier up to
+  ``ESCALATION_CEILING``, so several medium symptoms add up to high, but only
+  an emergency term makes a turn an emergency;
+* modifiers add or remove weight per tier (``MODIFIER_WEIGHTS``).
+
+The priority is the most urgent tier whose score reaches ``TIER_THRESHOLD``,
+or the rules' default tier. Each result keeps the contribution of every
+feature to the chosen tier, which the triage action turns into its rationale;
+a turn that falls back to the default tier is explained by its highest-scoring
+tier instead, so the rationale names the signs that fell short.
+:meth:`TriageScorer.score_cases` scores any number of turns at once for
+offline audits (``triage_audit.py``).
+
+NumPy is imported when the first scorer is compiled, not at import time.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Text, Tuple
+
+from .triage_lexicon import TIER_ORDER, TriageLexicon, normalize_symptom
+
+# Score at which a tier is assigned
+TIER_THRESHOLD = 1.0
+
+# Weight a term adds to the next more urgent tier
+ESCALATION_WEIGHT = 0.35
+
+# Most urgent tier reachable by adding up less urgent terms: several
+# high-priority symptoms are not an emergency
+ESCALATION_CEILING = "high"
+
+# Rows scored per matrix product by score_cases
+BATCH_SIZE = 10000
+
+# Words describing how bad a symptom is, by level
+SEVERITY_WORDS: Dict[Text, Text] = {
+    "severe": "severe", "extreme": "severe", "intense": "severe", "unbearable": "severe",
+    "excruciating": "severe", "terrible": "severe", "worst": "severe",
+    "moderate": "moderate", "bad": "moderate",
+    "mild": "mild", "slight": "mild", "minor": "mild", "light": "mild",
+}
+SEVERITY_LEVELS = ("severe", "moderate", "mild")
+
+# Words before and after a symptom searched for severity words
+SEVERITY_WINDOW = 3
+
+# Words that cancel the severity word right after them ("not severe")
+NEGATION_WORDS = frozenset({
+    "not", "no", "never", "without", "hardly", "isn't", "isnt", "wasn't", "wasnt", "nothing",
+})
+
+# Severity words never reach across a clause ("a fever, not severe at all")
+_CLAUSE = re.compile(r"[,.;:!?\n]|\b(?:but|and|though|although)\b")
+_TOKEN = re.compile(r"[a-z']+")
+
+# "3 days", "a few weeks", "yesterday", ...
+DURATION_PATTERN = re.compile(
+    r"\b(?:(\d+|an?|one|two|three|four|five|six|seven|eight|nine|ten|few|several)\s+)?"
+    r"(minute|hour|day|night|week|month|year)s?\b"
+    r"|\b(yesterday|today|tonight|this morning)\b"
+)
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "few": 3, "several": 4,
+}
+DURATION_LEVELS = ("weeks", "days", "hours")
+
+# Body parts that make a complaint more urgent, with the words naming them
+BODY_PART_WORDS: Dict[Text, Text] = {
+    "chest": "chest", "heart": "chest",
+    "head": "head", "eye": "eye", "eyes": "eye", "vision": "eye",
+    "abdomen": "abdomen", "stomach": "abdomen", "belly": "abdomen",
+}
+
+# Weight each modifier adds per tier
+MODIFIER_WEIGHTS: Dict[Text, Dict[Text, float]] = {
+    "severity:severe": {"emergency": 0.4, "high": 0.6, "medium": 0.3},
+    "severity:moderate": {"high": 0.3, "medium": 0.2},
+    # Never lowers an emergency term
+    "severity:mild": {"high": -0.4},
+    "duration:hours": {},
+    "duration:days": {"high": 0.2, "medium": 0.2},
+    "duration:weeks": {"high": 0.4, "medium": 0.5},
+    "body_part:chest": {"emergency": 0.35, "high": 0.5},
+    "body_part:head": {"high": 0.25},
+    "body_part:eye": {"high": 0.25},
+    "body_part:abdomen": {"high": 0.25},
+}
+
+_WORD = re.compile(r"[a-z]+")
+_SEPARATOR = "\x00"
+
+
+def _negated(tokens: Sequence[Text], position: int) -> bool:
+    """Whether one of the two words before a token is a negation"""
+    return not NEGATION_WORDS.isdisjoint(tokens[max(0, position - 2):position])
+
+
+class TriageCase(NamedTuple):
+    """The triage-relevant entities and text of one user message"""
+
+    symptoms: Tuple[Text, ...]
+    severity: Tuple[Text, ...] = ()
+    duration: Tuple[Text, ...] = ()
+    body_parts: Tuple[Text, ...] = ()
+    text: Text = ""
+
+
+class TriageResult(NamedTuple):
+    """Priority, per-tier scores and what contributed to the priority"""
+
+    priority: Text
+    scores: Dict[Text, float]
+    # (feature, weight) for the chosen tier, largest effect first; for a
+    # fallback, for the highest-scoring tier that missed the threshold
+    contributions: Tuple[Tuple[Text, float], ...]
+    # No tier reached the threshold and the default tier was assigned
+    fallback: bool = False
+
+
+def case_from_message(message: Dict[Text, Any]) -> TriageCase:
+    """Build a case from a parsed message (``tracker.latest_message`` or parse_data)"""
+    values: Dict[Text, List[Text]] = {
+        "symptom": [], "severity": [], "duration": [], "body_part": [],
+    }
+    for entity in message.get("entities") or []:
+        name = entity.get("entity")
+        if name in values and entity.get("value") is not None:
+            values[name].append(str(entity["value"]))
+    return TriageCase(
+        symptoms=tuple(values["symptom"]),
+        severity=tuple(values["severity"]),
+        duration=tuple(values["duration"]),
+        body_parts=tuple(values["body_part"]),
+        text=message.get("text") or "",
+    )
+
+
+def duration_level(text: Text) -> Optional[Text]:
+    """Longest duration mentioned in a text: hours, days or weeks"""
+    level = None
+    for match in DURATION_PATTERN.finditer(text):
+        count, unit, relative = match.groups()
+        if relative is not None:
+            found = "days" if relative == "yesterday" else "hours"
+        elif unit in ("minute", "hour"):
+            found = "hours"
+        elif unit in ("day", "night"):
+            amount = int(count) if count and count.isdigit() else _NUMBER_WORDS.get(count, 1)
+            found = "weeks" if amount >= 7 else "days"
+        else:
+            found = "weeks"
+        if level is None or DURATION_LEVELS.index(found) < DURATION_LEVELS.index(level):
+            level = found
+    return level
+
+
+def feature_label(feature: Text) -> Text:
+    """Patient-facing wording of a feature name"""
+    kind, _, value = feature.partition(":")
+    if kind == "severity":
+        return f"described as {value}"
+    if kind == "duration":
+        return f"lasting {value}"
+    if kind == "body_part":
+        return f"affecting the {value}"
+    return value
+
+
+def rationale(result: TriageResult, limit: int = 4) -> Text:
+    """Main factors behind a result, e.g. "fever (+1.00), described as severe (+0.60)" """
+    factors = ", ".join(f"{feature_label(feature)} ({weight:+.2f})"
+                        for feature, weight in result.contributions[:limit])
+    if result.fallback and factors:
+        return f"below the threshold for any higher tier (strongest signs: {factors})"
+    return factors or "no warning signs found"
+
+
+class TriageScorer:
+    """Feature vocabulary and weight matrix compiled from one lexicon"""
+
+    def __init__(self, lexicon: TriageLexicon) -> None:
+        import numpy as np
+
+        self._np = np
+        self.tiers: Tuple[Text, ...] = TIER_ORDER
+        self.default_tier = lexicon.default_tier
+        self._default_column = self.tiers.index(self.default_tier)
+
+        features: List[Text] = []
+        rows: List[List[float]] = []
+        terms: List[Tuple[Text, bool]] = []
+        ceiling = self.tiers.index(ESCALATION_CEILING)
+        seen = set()
+        for tier in lexicon.tiers:
+            column = self.tiers.index(tier)
+            for term in lexicon.terms[tier]:
+                if term in seen:
+                    # Listed in two tiers: the more urgent one, seen first, wins
+                    continue
+                seen.add(term)
+                weights = [0.0] * column + [1.0] * (len(self.tiers) - column)
+                if column > ceiling:
+                    weights[column - 1] = ESCALATION_WEIGHT
+                features.append(f"symptom:{term}")
+                rows.append(weights)
+                terms.append((term, tier in lexicon.substring_tiers))
+        for feature, tier_weights in MODIFIER_WEIGHTS.items():
+            features.append(feature)
+            rows.append([tier_weights.get(tier, 0.0) for tier in self.tiers])
+
+        self.features: Tuple[Text, ...] = tuple(features)
+        self.weights = np.array(rows, dtype=np.float32).reshape(len(features), len(self.tiers))
+        self._index = {feature: index for index, feature in enumerate(self.features)}
+        # Longest alternatives first, so "mild headache" wins over "headache";
+        # only substring-tier terms match inside longer words ("chest pains")
+        alternatives = "|".join(
+            re.escape(term) if substring else rf"(?<!\w){re.escape(term)}(?!\w)"
+            for term, substring in sorted(terms, key=lambda item: len(item[0]), reverse=True)
+        )
+        self._term_pattern = re.compile(alternatives if terms else r"(?!)")
+
+    def _severity_words(self, case: TriageCase, symptoms: Sequence[Text]) -> List[Text]:
+        """Severity words of the severity entities and of the words around each symptom"""
+        found: List[Text] = []
+        negated = set()
+        for clause in [*symptoms, *_CLAUSE.split(normalize_symptom(case.text))]:
+            tokens = _TOKEN.findall(clause)
+            negated.update(token for position, token in enumerate(tokens)
+                           if token in SEVERITY_WORDS and _negated(tokens, position))
+
+            spans = [match.span() for match in self._term_pattern.finditer(clause)]
+            spans += [(start, start + len(symptom)) for symptom in symptoms
+                      for start in [clause.find(symptom)] if symptom and start >= 0]
+            for start, end in spans:
+                before = _TOKEN.findall(clause[:start])
+                window = before + [""] + _TOKEN.findall(clause[end:])
+                for position in range(max(0, len(before) - SEVERITY_WINDOW),
+                                      min(len(window), len(before) + 1 + SEVERITY_WINDOW)):
+                    if window[position] in SEVERITY_WORDS and not _negated(window, position):
+                        found.append(window[position])
+
+        # A severity entity counts unless the message only ever negates it
+        for value in case.severity:
+            found.extend(word for word in _WORD.findall(value.lower())
+                         if word in SEVERITY_WORDS and (word in found or word not in negated))
+        return found
+
+    def extract(self, case: TriageCase) -> Tuple[int, ...]:
+        """Indices of the features present in a case"""
+        index = self._index
+        found = set()
+
+        normalized = [normalize_symptom(symptom) for symptom in case.symptoms]
+        symptoms = _SEPARATOR.join(normalized)
+        for match in self._term_pattern.finditer(symptoms):
+            found.add(index[f"symptom:{match.group()}"])
+
+        # Body-part and duration words count only outside matched terms
+        text = normalize_symptom(case.text)
+        residue = self._term_pattern.sub(_SEPARATOR, f"{symptoms}{_SEPARATOR}{text}")
+        words = _WORD.findall(residue)
+
+        severities = {SEVERITY_WORDS[word] for word in self._severity_words(case, normalized)}
+        for level in SEVERITY_LEVELS:
+            if level in severities:
+                found.add(index[f"severity:{level}"])
+                break
+
+        durations = [duration_level(normalize_symptom(value)) for value in case.duration]
+        if not any(durations):
+            durations = [duration_level(residue)]
+        for level in DURATION_LEVELS:
+            if level in durations:
+                found.add(index[f"duration:{level}"])
+                break
+
+        body_parts = [normalize_symptom(value) for value in case.body_parts] + words
+        for word in body_parts:
+            feature = f"body_part:{BODY_PART_WORDS.get(word, word)}"
+            if feature in index:
+                found.add(index[feature])
+        return tuple(sorted(found))
+
+    def feature_names(self, indices: Iterable[int]) -> FrozenSet[Text]:
+        return frozenset(self.features[i] for i in indices)
+
+    def score_extracted(self, batch: Sequence[Sequence[int]],
+                        explain: bool = True) -> List[TriageResult]:
+        """Score feature-index lists from extract() with one matrix product per batch"""
+        np = self._np
+        results: List[TriageResult] = []
+        for start in range(0, len(batch), BATCH_SIZE):
+            chunk = batch[start:start + BATCH_SIZE]
+            rows = [row for row, indices in enumerate(chunk) for _ in indices]
+            columns = [column for indices in chunk for column in indices]
+            x = np.zeros((len(chunk), len(self.features)), dtype=np.float32)
+            x[rows, columns] = 1.0
+
+            scores = x @ self.weights
+            # Small tolerance: float32 sums such as 0.4 + 0.6 may land just below 1
+            reached = scores >= TIER_THRESHOLD - 1e-4
+            fallback = ~reached.any(axis=1)
+            chosen = np.where(fallback, self._default_column, reached.argmax(axis=1))
+            contributions = None
+            if explain:
+                # A fallback is explained by the tier that came closest, most urgent on ties
+                explained_by = np.where(fallback, scores.argmax(axis=1), chosen)
+                contributions = x * self.weights[:, explained_by].T
+
+            for row in range(len(chunk)):
+                column = int(chosen[row])
+                explained: Tuple[Tuple[Text, float], ...] = ()
+                if contributions is not None:
+                    effects = contributions[row]
+                    nonzero = np.flatnonzero(effects)
+                    order = nonzero[np.argsort(-np.abs(effects[nonzero]), kind="stable")]
+                    explained = tuple(
+                        (self.features[i], round(float(effects[i]), 2)) for i in order
+                    )
+                results.append(TriageResult(
+                    priority=self.tiers[column],
+                    scores={
+                        tier: round(float(scores[row, i]), 2) for i, tier in enumerate(self.tiers)
+                    },
+                    contributions=explained,
+                    fallback=bool(fallback[row]),
+                ))
+        return results
+
+    def score(self, case: TriageCase) -> TriageResult:
+        """Score one turn"""
+        return self.score_extracted([self.extract(case)])[0]
+
+    def score_cases(self, cases: Sequence[TriageCase], explain: bool = True) -> List[TriageResult]:
+        """Score many turns at once, e.g. historical traffic for an audit"""
+        return self.score_extracted([self.extract(case) for case in cases], explain)
+
+
+@lru_cache(maxsize=4)
+def scorer_for(lexicon: TriageLexicon) -> TriageScorer:
+    """The scorer compiled for a lexicon, built once per rules snapshot"""
+    return TriageScorer(lexicon)
@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Benchmark Suite
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Measured Performance Results
+
+Measures the chatbot instead of describing it:
+
+* NLU   - parses every example in tests/test_nlu.yml with the trained model and
+          records intent accuracy (overall and per intent), entity F1 and
+          parse latency.
+* Stories - runs the dialogue tests in tests/test_stories.yml through
+          ``rasa test core`` and records conversation and action accuracy.
+* Actions - runs every custom action in actions/actions.py for synthetic
+          conversations at several concurrency levels and records
+          p50/p95/p99 latency and throughput per level.
+
+Results are written to one JSON file (results/benchmark.json by default),
+which create_graphs.py renders. Runs are seeded and record the model
+fingerprint, git commit and library versions, so two result files can be
+compared for regressions between model versions:
+
+Usage:
+    python benchmark.py                                  # full run, latest model
+    python benchmark.py --skip-nlu --skip-stories        # actions only, no model needed
+    python benchmark.py --baseline results/baseline.json # run, then fail on regressions
+    python benchmark.py --compare results/baseline.json results/benchmark.json
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import importlib.metadata
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+import yaml
+
+SCHEMA_VERSION = 1
+
+DEFAULT_OUTPUT = "results/benchmark.json"
+DEFAULT_NLU_TESTS = "tests/test_nlu.yml"
+DEFAULT_STORY_TESTS = "tests/test_stories.yml"
+DEFAULT_CONCURRENCY = [1, 4, 16, 64]
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Regression thresholds
+DEFAULT_LATENCY_TOLERANCE = 0.20   # relative increase in p95/p99
+DEFAULT_LATENCY_FLOOR_MS = 0.1     # ignore latency changes smaller than this
+DEFAULT_ACCURACY_TOLERANCE = 0.01  # absolute drop in an accuracy or F1
+
+# [text](entity) or [text](entity:value) or [text]{"entity": "..."}
+ENTITY_ANNOTATION = re.compile(r"\[([^\]]+)\](?:\((\w+)(?::[^)]*)?\)|(\{[^}]*\}))")
+
+# Symptoms cycled through the synthetic conversations so every triage tier is exercised
+BENCHMARK_SYMPTOMS = [
+    ["headache"], ["fever", "cough"], ["chest pain"], ["sore throat"],
+    ["abdominal pain"], ["rash"], ["difficulty breathing"], ["back pain"],
+]
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60)
+    print(f"📊 {title}")
+    print("=" * 60)
+
+
+def percentiles(values: List[float]) -> Dict[Text, float]:
+    """Nearest-rank p50/p95/p99 plus mean and max"""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0, "count": 0}
+    ordered = sorted(values)
+    result = {
+        f"p{int(q * 100)}": ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+        for q in QUANTILES
+    }
+    result.update(mean=sum(ordered) / len(ordered), max=ordered[-1], count=len(ordered))
+    return {key: round(value, 4) for key, value in result.items()}
+
+
+# ====== RUN METADATA ======
+
+def find_latest_model(models_dir: Text = "models") -> Optional[Text]:
+    """Most recently trained model archive, if any"""
+    archives = glob.glob(os.path.join(models_dir, "*.tar.gz"))
+    return max(archives, key=os.path.getmtime) if archives else None
+
+
+def file_sha256(path: Text) -> Text:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def package_version(name: Text) -> Optional[Text]:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def git_commit() -> Optional[Text]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(model_path: Optional[Text], args: argparse.Namespace) -> Dict[Text, Any]:
+    model = None
+    if model_path:
+        model = {
+            "path": model_path,
+            "name": os.path.basename(model_path),
+            "sha256": file_sha256(model_path),
+        }
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "model": model,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "rasa": package_version("rasa"),
+            "rasa_sdk": package_version("rasa-sdk"),
+        },
+        "settings": {
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "conversations": args.conversations,
+            "backend_latency": args.latency,
+        },
+    }
+
+
+# ====== NLU ======
+
+def load_nlu_examples(path: Text) -> List[Tuple[Text, Text, List[Tuple[Text, Text]]]]:
+    """(text, intent, [(entity, value)]) for every annotated test example"""
+    with open(path, "r", encoding="utf-8") as f:
+        document = yaml.safe_load(f) or {}
+
+    examples = []
+    for block in document.get("nlu") or []:
+        intent = block.get("intent")
+        if not intent:
+            continue
+        for line in (block.get("examples") or "").splitlines():
+            line = line.strip()
+            if not line.startswith("- "):
+                continue
+            entities: List[Tuple[Text, Text]] = []
+
+            def strip_annotation(match: "re.Match") -> Text:
+                name = match.group(2)
+                if name is None:
+                    name = json.loads(match.group(3)).get("entity")
+                entities.append((name, match.group(1).lower()))
+                return match.group(1)
+
+            text = ENTITY_ANNOTATION.sub(strip_annotation, line[2:].strip())
+            examples.append((text, intent, entities))
+    return examples
+
+
+async def benchmark_nlu(model_path: Text, tests_path: Text, warmup: int = 5) -> Dict[Text, Any]:
+    """Intent accuracy, entity F1 and parse latency over the NLU test set"""
+    from rasa.core.agent import Agent
+
+    examples = load_nlu_examples(tests_path)
+    agent = Agent.load(model_path)
+    for text, _, _ in examples[:warmup]:
+        await agent.parse_message(text)
+
+    latencies: List[float] = []
+    intents: Dict[Text, Dict[Text, Any]] = {}
+    confusions: Dict[Text, Dict[Text, int]] = {}
+    true_positive = false_positive = false_negative = 0
+
+    for text, expected, expected_entities in examples:
+        start = time.perf_counter()
+        result = await agent.parse_message(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        predicted = (result.get("intent") or {}).get("name")
+        stats = intents.setdefault(expected, {"support": 0, "correct": 0})
+        stats["support"] += 1
+        if predicted == expected:
+            stats["correct"] += 1
+        else:
+            confusions.setdefault(expected, {}).setdefault(predicted, 0)
+            confusions[expected][predicted] += 1
+
+        found = {
+            (entity["entity"], text[entity["start"]:entity["end"]].lower())
+            for entity in result.get("entities") or []
+            if "start" in entity and "end" in entity
+        }
+        wanted = set(expected_entities)
+        true_positive += len(found & wanted)
+        false_positive += len(found - wanted)
+        false_negative += len(wanted - found)
+
+    for stats in intents.values():
+        stats["accuracy"] = round(stats["correct"] / stats["support"], 4)
+
+    precision = true_positive / (true_positive + false_positive) if true_positive + false_positive else 0.0
+    recall = true_positive / (true_positive + false_negative) if true_positive + false_negative else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    correct = sum(stats["correct"] for stats in intents.values())
+
+    return {
+        "examples": len(examples),
+        "accuracy": round(correct / len(examples), 4) if examples else 0.0,
+        "intents": dict(sorted(intents.items())),
+        "confusions": confusions,
+        "entities": {
+            "precision": round(precision, 4),
+            "recall": round(recall, 4),
+            "f1": round(f1, 4),
+        },
+        "latency_ms": percentiles(latencies),
+    }
+
+
+# ====== STORIES ======
+
+def annotate_entities(text: Text, entities: Dict[Text, Any]) -> Text:
+    """Mark entity values in a user message with [value](entity) syntax"""
+    for name, value in (entities or {}).items():
+        pattern = re.compile(re.escape(str(value)), re.IGNORECASE)
+        text = pattern.sub(lambda match: f"[{match.group(0)}]({name})", text, count=1)
+    return text
+
+
+def convert_test_cases(path: Text) -> Tuple[Dict[Text, Any], int]:
+    """Translate the tests/test_stories.yml test cases into Rasa test stories"""
+    with open(path, "r", encoding="utf-8") as f:
+        document = yaml.safe_load(f) or {}
+
+    stories = []
+    for case in document.get("test_cases") or document.get("stories") or []:
+        steps = []
+        for step in case.get("steps") or []:
+            step = dict(step)
+            if "user" in step:
+                step["user"] = annotate_entities(step["user"].strip(), step.pop("entities", None))
+            steps.append(step)
+        stories.append({"story": case.get("test_case") or case.get("story"), "steps": steps})
+    return {"version": document.get("version", "3.1"), "stories": stories}, len(stories)
+
+
+def benchmark_stories(model_path: Text, tests_path: Text, timeout: int = 1800) -> Dict[Text, Any]:
+    """Conversation- and action-level accuracy of the dialogue tests"""
+    converted, total = convert_test_cases(tests_path)
+    work_dir = tempfile.mkdtemp(prefix="benchmark_stories_")
+    stories_path = os.path.join(work_dir, "test_stories.yml")
+    out_dir = os.path.join(work_dir, "results")
+    with open(stories_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(converted, f, sort_keys=False, allow_unicode=True)
+
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "rasa", "test", "core", "--model", model_path,
+         "--stories", stories_path, "--out", out_dir, "--no-plot"],
+        check=True, timeout=timeout,
+    )
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    failed_path = os.path.join(out_dir, "failed_test_stories.yml")
+    if os.path.exists(failed_path):
+        with open(failed_path, "r", encoding="utf-8") as f:
+            failed = sum(1 for line in f if line.lstrip().startswith("- story:"))
+
+    action_accuracy = None
+    report_path = os.path.join(out_dir, "story_report.json")
+    if os.path.exists(report_path):
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        action_accuracy = report.get("accuracy")
+        if action_accuracy is None:
+            action_accuracy = (report.get("micro avg") or {}).get("f1-score")
+
+    return {
+        "total": total,
+        "passed": total - failed,
+        "failed": failed,
+        "success_rate": round((total - failed) / total, 4) if total else 0.0,
+        "action_accuracy": round(action_accuracy, 4) if action_accuracy is not None else None,
+        "seconds": round(elapsed, 2),
+    }
+
+
+# ====== ACTIONS ======
+
+def make_tracker(sender_id: Text, slots: Dict[Text, Any], symptoms: List[Text]) -> Any:
+    """Minimal tracker with the given slots and symptom entities"""
+    from rasa_sdk import Tracker
+
+    return Tracker(
+        sender_id=sender_id,
+        slots=slots,
+        latest_message={
+            "intent": {"name": "report_symptom"},
+            "entities": [{"entity": "symptom", "value": s} for s in symptoms],
+        },
+        events=[],
+        paused=False,
+        followup_action=None,
+        active_loop={},
+        latest_action_name="action_listen",
+    )
+
+
+async def benchmark_action_level(concurrency: int, conversations: int,
+                                 latency: float) -> Dict[Text, Any]:
+    """Run every custom action once per conversation at one concurrency level"""
+    from rasa_sdk.executor import CollectingDispatcher
+
+    from actions import actions as action_module
+    from actions.backend import LocalSchedulingBackend, set_backend
+    from actions.store import InMemoryAppointmentStore
+
+    # Conversation order; the slots each action sets feed the next one
+    action_classes = [
+        action_module.ActionPerformTriage,
+        action_module.ActionProvideHealthAdvice,
+        action_module.ActionBookAppointment,
+        action_module.ActionCheckAppointment,
+        action_module.ActionModifyAppointment,
+        action_module.ActionCancelAppointment,
+        action_module.ActionEmergencyProtocol,
+        action_module.ActionInitiateHandover,
+        action_module.ActionCollectFeedback,
+    ]
+    set_backend(LocalSchedulingBackend(latency=latency, store=InMemoryAppointmentStore()))
+    timings: Dict[Text, List[float]] = {cls().name(): [] for cls in action_classes}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def conversation(index: int) -> None:
+        async with semaphore:
+            sender_id = f"bench-{concurrency}-{index}"
+            symptoms = BENCHMARK_SYMPTOMS[index % len(BENCHMARK_SYMPTOMS)]
+            slots: Dict[Text, Any] = {}
+            for cls in action_classes:
+                action = cls()
+                tracker = make_tracker(sender_id, slots, symptoms)
+                start = time.perf_counter()
+                events = action.run(CollectingDispatcher(), tracker, {})
+                if asyncio.iscoroutine(events):
+                    events = await events
+                timings[action.name()].append((time.perf_counter() - start) * 1000)
+                for event in events:
+                    if event.get("event") == "slot":
+                        slots[event["name"]] = event["value"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(i) for i in range(conversations)))
+    elapsed = time.perf_counter() - start
+    calls = sum(len(values) for values in timings.values())
+
+    return {
+        "concurrency": concurrency,
+        "conversations": conversations,
+        "seconds": round(elapsed, 4),
+        "throughput": round(calls / elapsed, 1),
+        "actions": {name: percentiles(values) for name, values in timings.items()},
+    }
+
+
+async def benchmark_actions(levels: List[int], conversations: int,
+                            latency: float) -> Dict[Text, Any]:
+    # Warm caches, lazily loaded rules and the slot calendar before measuring
+    await benchmark_action_level(1, 4, latency)
+    results = []
+    for concurrency in levels:
+        results.append(await benchmark_action_level(concurrency, conversations, latency))
+    return {"backend_latency": latency, "levels": results}
+
+
+# ====== REGRESSION DETECTION ======
+
+def _latency_regression(label: Text, old: Dict[Text, float], new: Dict[Text, float],
+                        tolerance: float, floor_ms: float) -> List[Text]:
+    problems = []
+    for key in ("p95", "p99"):
+        before, after = old.get(key, 0.0), new.get(key, 0.0)
+        if after - before > floor_ms and after > before * (1 + tolerance):
+            problems.append(f"{label} {key} latency {before:.3f} ms → {after:.3f} ms")
+    return problems
+
+
+def _accuracy_regression(label: Text, before: Optional[float], after: Optional[float],
+                         tolerance: float) -> List[Text]:
+    if before is None or after is None or before - after <= tolerance:
+        return []
+    return [f"{label} {before:.1%} → {after:.1%}"]
+
+
+def compare_results(baseline: Dict[Text, Any], current: Dict[Text, Any],
+                    latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+                    latency_floor_ms: float = DEFAULT_LATENCY_FLOOR_MS,
+                    accuracy_tolerance: float = DEFAULT_ACCURACY_TOLERANCE) -> List[Text]:
+    """Regressions of current against baseline; empty when nothing got worse"""
+    problems: List[Text] = []
+
+    old_nlu, new_nlu = baseline.get("nlu"), current.get("nlu")
+    if old_nlu and new_nlu:
+        problems += _accuracy_regression("NLU intent accuracy", old_nlu["accuracy"],
+                                         new_nlu["accuracy"], accuracy_tolerance)
+        problems += _accuracy_regression("NLU entity F1", old_nlu["entities"]["f1"],
+                                         new_nlu["entities"]["f1"], accuracy_tolerance)
+        for intent, old_stats in old_nlu["intents"].items():
+            new_stats = new_nlu["intents"].get(intent)
+            if new_stats and new_stats["correct"] < old_stats["correct"]:
+                problems += _accuracy_regression(f"Intent '{intent}' accuracy",
+                                                 old_stats["accuracy"], new_stats["accuracy"],
+                                                 accuracy_tolerance)
+        problems += _latency_regression("NLU parse", old_nlu["latency_ms"],
+                                        new_nlu["latency_ms"], latency_tolerance,
+                                        latency_floor_ms)
+
+    old_stories, new_stories = baseline.get("stories"), current.get("stories")
+    if old_stories and new_stories:
+        problems += _accuracy_regression("Story success rate", old_stories["success_rate"],
+                                         new_stories["success_rate"], accuracy_tolerance)
+        problems += _accuracy_regression("Story action accuracy",
+                                         old_stories.get("action_accuracy"),
+                                         new_stories.get("action_accuracy"), accuracy_tolerance)
+
+    old_actions, new_actions = baseline.get("actions"), current.get("actions")
+    if old_actions and new_actions:
+        old_levels = {level["concurrency"]: level for level in old_actions["levels"]}
+        for level in new_actions["levels"]:
+            old_level = old_levels.get(level["concurrency"])
+            if not old_level:
+                continue
+            for name, stats in level["actions"].items():
+                if name in old_level["actions"]:
+                    problems += _latency_regression(
+                        f"{name} @ concurrency {level['concurrency']}",
+                        old_level["actions"][name], stats, latency_tolerance, latency_floor_ms,
+                    )
+    return problems
+
+
+def report_regressions(baseline_path: Text, current: Dict[Text, Any],
+                       args: argparse.Namespace) -> bool:
+    """Print the comparison against a baseline file; True if anything regressed"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print_header(f"REGRESSION CHECK vs {baseline_path}")
+    old_model = (baseline.get("model") or {}).get("name")
+    new_model = (current.get("model") or {}).get("name")
+    print(f"Baseline model: {old_model} | Current model: {new_model}")
+
+    problems = compare_results(baseline, current, args.latency_tolerance,
+                               args.latency_floor_ms, args.accuracy_tolerance)
+    if not problems:
+        print("✅ No regressions detected")
+        return False
+    for problem in problems:
+        print(f"❌ {problem}")
+    return True
+
+
+# ====== REPORTING ======
+
+def print_summary(results: Dict[Text, Any]) -> None:
+    nlu = results.get("nlu")
+    if nlu:
+        print_header("NLU")
+        print(f"Examples: {nlu['examples']} | Intent accuracy: {nlu['accuracy']:.1%} | "
+              f"Entity F1: {nlu['entities']['f1']:.1%}")
+        latency = nlu["latency_ms"]
+        print(f"Parse latency p50/p95/p99: {latency['p50']:.2f} / {latency['p95']:.2f} / "
+              f"{latency['p99']:.2f} ms")
+
+    stories = results.get("stories")
+    if stories:
+        print_header("DIALOGUE STORIES")
+        print(f"Passed: {stories['passed']}/{stories['total']} "
+              f"({stories['success_rate']:.1%})")
+        if stories.get("action_accuracy") is not None:
+            print(f"Action accuracy: {stories['action_accuracy']:.1%}")
+
+    actions = results.get("actions")
+    if actions:
+        print_header("CUSTOM ACTIONS")
+        for level in actions["levels"]:
+            print(f"\nConcurrency {level['concurrency']}: {level['throughput']:.1f} actions/s")
+            print(f"{'Action':<32} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+            for name, stats in level["actions"].items():
+                print(f"{name:<32} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the healthcare chatbot")
+    parser.add_argument("--model", help="Model archive (default: latest in models/)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results JSON file")
+    parser.add_argument("--nlu-tests", default=DEFAULT_NLU_TESTS)
+    parser.add_argument("--story-tests", default=DEFAULT_STORY_TESTS)
+    parser.add_argument("--skip-nlu", action="store_true")
+    parser.add_argument("--skip-stories", action="store_true")
+    parser.add_argument("--skip-actions", action="store_true")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY,
+                        help="Concurrency levels for the action benchmark")
+    parser.add_argument("--conversations", type=int, default=256,
+                        help="Synthetic conversations per concurrency level")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated scheduling-backend round trip in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", help="Compare the new results against this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two existing result files without running anything")
+    parser.add_argument("--latency-tolerance", type=float, default=DEFAULT_LATENCY_TOLERANCE)
+    parser.add_argument("--latency-floor-ms", type=float, default=DEFAULT_LATENCY_FLOOR_MS)
+    parser.add_argument("--accuracy-tolerance", type=float, default=DEFAULT_ACCURACY_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            current = json.load(f)
+        return 1 if report_regressions(args.compare[0], current, args) else 0
+
+    random.seed(args.seed)
+    needs_model = not (args.skip_nlu and args.skip_stories)
+    model_path = args.model or (find_latest_model() if needs_model else None)
+    if needs_model and not model_path:
+        print("❌ No trained model found in models/ - run 'rasa train' or pass --skip-nlu --skip-stories")
+        return 2
+
+    print("🏥 Healthcare Chatbot Benchmark")
+    print(f"Model: {model_path or 'none'} | Seed: {args.seed}")
+    results = run_metadata(model_path, args)
+
+    if not args.skip_nlu:
+        print("🧠 Running NLU test set...")
+        results["nlu"] = asyncio.run(benchmark_nlu(model_path, args.nlu_tests))
+    if not args.skip_stories:
+        print("💬 Running dialogue stories...")
+        results["stories"] = benchmark_stories(model_path, args.story_tests)
+    if not args.skip_actions:
+        print("⚙️  Timing custom actions...")
+        results["actions"] = asyncio.run(
+            benchmark_actions(args.concurrency, args.conversations, args.latency)
+        )
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print_summary(results)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline and report_regressions(args.baseline, results, args):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
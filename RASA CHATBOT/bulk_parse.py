@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Bulk NLU Parser
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Offline Batch Inference
+
+Parses large numbers of messages with a trained model without the one request
+per message of ``/webhooks/rest/webhook`` or ``/model/parse``, e.g. for
+re-labelling transcript exports.
+
+Input is a JSON lines stream, one message per line, either a JSON string or an
+object with a ``text`` field (``--text-field``); other fields of an object are
+copied to its result. Results are written as JSON lines in input order, each
+batch as soon as it is parsed, so only ``--batch-size`` messages are held in
+memory whatever the size of the input.
+
+Each batch goes through the NLU part of the model graph (the
+``config_simple.yml`` pipeline: tokenizer, featurizers, DIETClassifier, ...)
+in one graph run, and every DIETClassifier runs a single TensorFlow inference
+over the whole batch instead of one per message. Intents and entities are the
+same as ``rasa shell nlu`` would give; ``--benchmark`` checks that on the NLU
+test set and compares the throughput of both paths.
+
+Progress is printed to stderr, so results can be piped.
+
+Usage:
+    python bulk_parse.py transcripts.jsonl --output results/parsed.jsonl
+    cat texts.jsonl | python bulk_parse.py - --batch-size 512 > parsed.jsonl
+    python bulk_parse.py --benchmark tests/test_nlu.yml --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, IO, Iterator, List, Optional, Sequence, Text, Tuple
+
+from benchmark import DEFAULT_NLU_TESTS, find_latest_model, load_nlu_examples, percentiles
+
+DEFAULT_BATCH_SIZE = 256
+PROGRESS_EVERY = 10000
+
+# diet_process_batch calls DIETClassifier internals as laid out in Rasa 3.6
+# (the pinned rasa[full]==3.6.0); other releases keep per-message inference
+BATCHED_DIET_RASA_SERIES = "3.6."
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60, file=sys.stderr)
+    print(f"📦 {title}", file=sys.stderr)
+    print("=" * 60, file=sys.stderr)
+
+
+def status(message: Text) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+# ====== BATCHED DIET INFERENCE ======
+
+def diet_process_batch(component: Any, messages: List[Any]) -> List[Any]:
+    """DIETClassifier.process with one model inference for the whole batch
+
+    Falls back to the per-message implementation whenever the batch cannot be
+    mapped back row by row (an untrained model, messages without features).
+    """
+    import numpy as np
+    from rasa.nlu.classifiers.diet_classifier import DIETClassifier
+    from rasa.utils.tensorflow.constants import ENTITY_RECOGNITION, INTENT_CLASSIFICATION
+
+    if component.model is None or len(messages) < 2:
+        return DIETClassifier.process(component, messages)
+    model_data = component._create_model_data(messages, training=False)
+    if model_data.is_empty() or model_data.number_of_examples() != len(messages):
+        return DIETClassifier.process(component, messages)
+
+    # One internal batch: sequence outputs of several batches have different
+    # padded lengths and could not be concatenated
+    out = component.model.run_inference(model_data, batch_size=len(messages))
+    for row, message in enumerate(messages):
+        single = {key: value[row:row + 1] for key, value in out.items() if isinstance(value, np.ndarray)}
+        if component.component_config[INTENT_CLASSIFICATION]:
+            label, label_ranking = component._predict_label(single)
+            message.set("intent", label, add_to_output=True)
+            message.set("intent_ranking", label_ranking, add_to_output=True)
+        if component.component_config[ENTITY_RECOGNITION]:
+            entities = component._predict_entities(single, message)
+            message.set("entities", entities, add_to_output=True)
+    return messages
+
+
+def vectorize_diet(graph_runner: Any) -> List[Text]:
+    """Point the DIETClassifier nodes of a loaded graph at diet_process_batch
+
+    Returns the names of the nodes changed; none outside Rasa 3.6.x or if the
+    graph nodes are laid out differently, in which case batches still share
+    one graph run but DIET predicts message by message.
+    """
+    import rasa
+    from rasa.nlu.classifiers.diet_classifier import DIETClassifier
+
+    if not rasa.__version__.startswith(BATCHED_DIET_RASA_SERIES):
+        status(f"⚠️  Batched DIET inference is only enabled on Rasa {BATCHED_DIET_RASA_SERIES}x "
+               f"(installed: {rasa.__version__})")
+        return []
+
+    patched = []
+    for name, node in (getattr(graph_runner, "_instantiated_nodes", None) or {}).items():
+        # Exact class: ResponseSelector subclasses DIETClassifier with its own process()
+        if getattr(node, "_component_class", None) is DIETClassifier and \
+                getattr(node, "_fn_name", None) == "process" and hasattr(node, "_fn"):
+            node._fn = diet_process_batch
+            patched.append(name)
+    return patched
+
+
+class BulkParser:
+    """The NLU part of a trained model, run over batches of texts"""
+
+    def __init__(self, model_path: Text, vectorize: bool = True) -> None:
+        from rasa.core.agent import Agent
+
+        self.agent = Agent.load(model_path)
+        processor = self.agent.processor
+        self.graph_runner = processor.graph_runner
+        self.target = processor.model_metadata.nlu_target
+        if not self.target:
+            raise ValueError(f"{model_path} has no NLU pipeline")
+        self.vectorized_nodes = vectorize_diet(self.graph_runner) if vectorize else []
+
+    def parse(self, texts: Sequence[Text], ranking: bool = False) -> List[Dict[Text, Any]]:
+        """Parse data for each text, in order, as agent.parse_message returns it"""
+        from rasa.core.channels.channel import UserMessage
+        from rasa.engine.constants import PLACEHOLDER_MESSAGE, PLACEHOLDER_TRACKER
+
+        if not texts:
+            return []
+        results = self.graph_runner.run(
+            inputs={PLACEHOLDER_MESSAGE: [UserMessage(text) for text in texts], PLACEHOLDER_TRACKER: None},
+            targets=[self.target],
+        )
+        parsed = []
+        for message in results[self.target]:
+            data: Dict[Text, Any] = {"text": "", "intent": {"name": None, "confidence": 0.0}, "entities": []}
+            data.update(message.as_dict(only_output_properties=True))
+            if not ranking:
+                data.pop("intent_ranking", None)
+                data.pop("response_selector", None)
+            parsed.append(data)
+        return parsed
+
+
+# ====== STREAMING ======
+
+def iter_records(stream: IO[Text], text_field: Text) -> Iterator[Dict[Text, Any]]:
+    """Input records with their text under "text", skipping blank lines"""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}") from None
+        if isinstance(record, str):
+            record = {"text": record}
+        elif not isinstance(record, dict) or not isinstance(record.get(text_field), str):
+            raise ValueError(f"line {number}: expected a string or an object with a '{text_field}' string")
+        elif text_field != "text":
+            record = dict(record)
+            record["text"] = record.pop(text_field)
+        yield record
+
+
+def batches(records: Iterator[Dict[Text, Any]], size: int) -> Iterator[List[Dict[Text, Any]]]:
+    batch: List[Dict[Text, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_stream(parser: BulkParser, source: IO[Text], sink: IO[Text], args: argparse.Namespace) -> int:
+    """Parse every record of source into sink; returns the number of messages"""
+    total = 0
+    reported = 0
+    start = time.perf_counter()
+    for batch in batches(iter_records(source, args.text_field), args.batch_size):
+        results = parser.parse([record["text"] for record in batch], ranking=args.ranking)
+        lines = []
+        for record, result in zip(batch, results):
+            extra = {key: value for key, value in record.items() if key not in result}
+            lines.append(json.dumps({**extra, **result}, ensure_ascii=False))
+        sink.write("\n".join(lines) + "\n")
+        sink.flush()
+        total += len(batch)
+        if total - reported >= PROGRESS_EVERY:
+            reported = total
+            status(f"  {total:,} messages ({total / (time.perf_counter() - start):,.0f} msg/s)")
+    return total
+
+
+# ====== BENCHMARK ======
+
+async def parse_one_by_one(parser: BulkParser, texts: Sequence[Text]) -> Tuple[List[Dict[Text, Any]], List[float]]:
+    """What the REST channel does per message, without the HTTP round trip"""
+    results = []
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        results.append(await parser.agent.parse_message(text))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def entity_set(result: Dict[Text, Any]) -> set:
+    return {(entity.get("entity"), entity.get("start"), entity.get("end"), str(entity.get("value")))
+            for entity in result.get("entities") or []}
+
+
+def run_benchmark(parser: BulkParser, path: Text, repeat: int, batch_size: int) -> Dict[Text, Any]:
+    """Throughput of agent.parse_message against bulk parsing over the NLU test set"""
+    examples = load_nlu_examples(path)
+    if not examples:
+        raise ValueError(f"no annotated examples in {path}")
+    texts = [text for text, _, _ in examples] * repeat
+    expected = [intent for _, intent, _ in examples] * repeat
+
+    # Warm up both paths (TensorFlow builds its graphs on first use)
+    asyncio.run(parse_one_by_one(parser, texts[:5]))
+    parser.parse(texts[:batch_size])
+
+    start = time.perf_counter()
+    single, latencies = asyncio.run(parse_one_by_one(parser, texts))
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk: List[Dict[Text, Any]] = []
+    for offset in range(0, len(texts), batch_size):
+        bulk.extend(parser.parse(texts[offset:offset + batch_size]))
+    bulk_seconds = time.perf_counter() - start
+
+    def intent(result: Dict[Text, Any]) -> Optional[Text]:
+        return (result.get("intent") or {}).get("name")
+
+    return {
+        "fixture": path,
+        "messages": len(texts),
+        "batch_size": batch_size,
+        "vectorized_nodes": parser.vectorized_nodes,
+        "one_by_one": {
+            "seconds": round(single_seconds, 3),
+            "messages_per_second": round(len(texts) / single_seconds, 1),
+            "accuracy": round(sum(intent(r) == e for r, e in zip(single, expected)) / len(texts), 4),
+            "latency_ms": percentiles(latencies),
+        },
+        "bulk": {
+            "seconds": round(bulk_seconds, 3),
+            "messages_per_second": round(len(texts) / bulk_seconds, 1),
+            "accuracy": round(sum(intent(r) == e for r, e in zip(bulk, expected)) / len(texts), 4),
+        },
+        "speedup": round(single_seconds / bulk_seconds, 2),
+        "intent_agreement": round(sum(intent(a) == intent(b) for a, b in zip(single, bulk)) / len(texts), 4),
+        "entity_agreement": round(sum(entity_set(a) == entity_set(b) for a, b in zip(single, bulk)) / len(texts), 4),
+    }
+
+
+def print_benchmark(report: Dict[Text, Any]) -> None:
+    print_header(f"ONE BY ONE vs BULK ({report['messages']:,} messages)")
+    status(f"{'Path':<14} {'Seconds':>10} {'Msg/s':>10} {'Accuracy':>10}")
+    for label, key in (("one by one", "one_by_one"), (f"bulk x{report['batch_size']}", "bulk")):
+        run = report[key]
+        status(f"{label:<14} {run['seconds']:>10.2f} {run['messages_per_second']:>10,.0f} {run['accuracy']:>10.2%}")
+    status(f"\nSpeedup: {report['speedup']:.1f}x")
+    status(f"Same intent: {report['intent_agreement']:.2%} | same entities: {report['entity_agreement']:.2%}")
+    if not report["vectorized_nodes"]:
+        status("⚠️  DIETClassifier was not batched (Rasa version or --no-vectorize); only the graph runs were shared")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Parse a JSON lines stream of messages with the NLU model in batches")
+    parser.add_argument("input", nargs="?", help="JSON lines file of messages, or - for stdin")
+    parser.add_argument("--model", help="Model archive (default: latest in models/)")
+    parser.add_argument("--output", default="-", help="JSON lines results file (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--text-field", default="text", help="Field of each input object holding the message")
+    parser.add_argument("--ranking", action="store_true", help="Include intent rankings in the results")
+    parser.add_argument("--no-vectorize", action="store_true",
+                        help="Keep DIETClassifier's per-message inference (for comparison)")
+    parser.add_argument("--benchmark", nargs="?", const=DEFAULT_NLU_TESTS, metavar="NLU_TESTS",
+                        help=f"Compare against one-by-one parsing on an NLU test file (default: {DEFAULT_NLU_TESTS})")
+    parser.add_argument("--repeat", type=int, default=10, help="Times the benchmark fixture is parsed")
+    parser.add_argument("--report", help="Write the benchmark results as JSON to this file")
+    args = parser.parse_args()
+
+    if not args.input and not args.benchmark:
+        parser.error("give an input file (or -) or --benchmark")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    model_path = args.model or find_latest_model()
+    if not model_path:
+        status("❌ No trained model found in models/ - run 'rasa train' or pass --model")
+        return 2
+
+    status("🏥 Healthcare Chatbot Bulk NLU Parser")
+    start = time.perf_counter()
+    try:
+        bulk = BulkParser(model_path, vectorize=not args.no_vectorize)
+    except ValueError as e:
+        status(f"❌ {e}")
+        return 1
+    status(f"Model: {model_path} loaded in {time.perf_counter() - start:.1f}s | "
+           f"batched DIET nodes: {', '.join(bulk.vectorized_nodes) or 'none'}")
+
+    if args.benchmark:
+        try:
+            report = run_benchmark(bulk, args.benchmark, args.repeat, args.batch_size)
+        except (OSError, ValueError) as e:
+            status(f"❌ {e}")
+            return 1
+        print_benchmark(report)
+        if args.report:
+            os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            status(f"\n📊 Results written to {args.report}")
+        return 0
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    if args.output != "-":
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        total = parse_stream(bulk, source, sink, args)
+    except ValueError as e:
+        status(f"❌ {args.input}: {e}")
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - start
+    status(f"✅ {total:,} messages parsed in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} msg/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Training Cache Manager
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Training Cache Garbage Collection
+
+Keeps the Rasa training cache (``.rasa/cache``: ``cache.db`` plus one ``tmp*``
+directory per cached graph-component result) from growing with every
+``rasa train``:
+
+1. Drops ``cache_entry`` rows whose result directory no longer exists.
+2. Evicts the least recently used entries (by ``last_used``) that are older
+   than ``--max-age-days`` or exceed the ``--max-size-mb`` budget.
+3. Deletes ``tmp*`` directories that no ``cache_entry`` row references.
+4. Replaces byte-identical files across the remaining directories with
+   hardlinks to a single copy (Rasa copies cached results out of the cache,
+   so shared inodes are never written through).
+5. Compacts ``cache.db`` with VACUUM.
+
+Directories modified within ``--grace-minutes`` are never touched, so the
+tool is safe to run while a training job is writing to the cache.
+
+Usage:
+    python cache_manager.py --dry-run
+    python cache_manager.py --max-size-mb 500 --max-age-days 30
+    python cache_manager.py --cache-dir cache --no-dedupe
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Text, Tuple
+
+CACHE_DB = "cache.db"
+DEFAULT_GRACE_MINUTES = 10
+
+# Same variable Rasa's LocalTrainingCache reads
+CACHE_DIR_ENV = "RASA_CACHE_DIRECTORY"
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60)
+    print(f"🧹 {title}")
+    print("=" * 60)
+
+
+def format_size(size: float) -> Text:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def default_cache_dir() -> Text:
+    """RASA_CACHE_DIRECTORY, then .rasa/cache, then the cache/ snapshot"""
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    return os.path.join(".rasa", "cache") if os.path.isdir(os.path.join(".rasa", "cache")) else "cache"
+
+
+def directory_size(path: Text, seen: Optional[set] = None) -> int:
+    """Bytes used by a directory, counting each hardlinked inode once"""
+    seen = set() if seen is None else seen
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            stat = os.lstat(os.path.join(root, name))
+            key = (stat.st_dev, stat.st_ino)
+            if key not in seen:
+                seen.add(key)
+                total += stat.st_size
+    return total
+
+
+def is_recent(path: Text, grace_seconds: float) -> bool:
+    return time.time() - os.path.getmtime(path) < grace_seconds
+
+
+class TrainingCache:
+    """Rows of cache.db joined with the result directories on disk"""
+
+    def __init__(self, cache_dir: Text) -> None:
+        self.cache_dir = cache_dir
+        self.db_path = os.path.join(cache_dir, CACHE_DB)
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"No {CACHE_DB} in {cache_dir}")
+        self.connection = sqlite3.connect(self.db_path, timeout=30)
+
+    def resolve(self, location: Optional[Text]) -> Optional[Text]:
+        """Map a stored result_location to a directory in this cache.
+
+        Locations are stored as written by the training machine (for example
+        ``.rasa\\cache\\tmpab12cd``), so only the directory name is trusted.
+        """
+        if not location:
+            return None
+        name = os.path.basename(location.replace("\\", "/").rstrip("/"))
+        return os.path.join(self.cache_dir, name)
+
+    def entries(self) -> List[Tuple[Text, datetime, Optional[Text]]]:
+        """(fingerprint_key, last_used, result directory) ordered oldest first"""
+        rows = self.connection.execute(
+            "SELECT fingerprint_key, last_used, result_location FROM cache_entry "
+            "ORDER BY last_used"
+        ).fetchall()
+        return [(key, datetime.fromisoformat(str(last_used)), self.resolve(location))
+                for key, last_used, location in rows]
+
+    def result_directories(self) -> List[Text]:
+        return sorted(
+            os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+            if os.path.isdir(os.path.join(self.cache_dir, name))
+        )
+
+    def delete_entries(self, keys: List[Text]) -> None:
+        self.connection.executemany(
+            "DELETE FROM cache_entry WHERE fingerprint_key = ?", [(key,) for key in keys]
+        )
+        self.connection.commit()
+
+    def vacuum(self) -> None:
+        self.connection.execute("VACUUM")
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def drop_dangling(cache: TrainingCache, dry_run: bool) -> int:
+    """Remove rows whose result directory is gone"""
+    dangling = [key for key, _, directory in cache.entries()
+                if directory and not os.path.isdir(directory)]
+    if dangling and not dry_run:
+        cache.delete_entries(dangling)
+    print(f"{'Would drop' if dry_run else 'Dropped'} {len(dangling)} entries with missing results")
+    return len(dangling)
+
+
+def evict(cache: TrainingCache, max_size_mb: Optional[float], max_age_days: Optional[float],
+          grace_seconds: float, dry_run: bool) -> int:
+    """Evict least recently used entries by age and by total size budget"""
+    entries = cache.entries()
+    sizes: Dict[Text, int] = {}
+    for key, _, directory in entries:
+        if directory and os.path.isdir(directory):
+            sizes[key] = directory_size(directory)
+
+    victims: List[Tuple[Text, Optional[Text]]] = []
+    if max_age_days is not None:
+        cutoff = datetime.now() - timedelta(days=max_age_days)
+        victims += [(key, directory) for key, last_used, directory in entries if last_used < cutoff]
+
+    if max_size_mb is not None:
+        budget = max_size_mb * 1024 * 1024
+        already = {key for key, _ in victims}
+        total = sum(size for key, size in sizes.items() if key not in already)
+        for key, _, directory in entries:
+            if total <= budget:
+                break
+            if key in sizes and key not in already:
+                victims.append((key, directory))
+                total -= sizes[key]
+
+    # Never evict results a running training job may still be writing
+    victims = [(key, directory) for key, directory in victims
+               if not (directory and os.path.isdir(directory) and is_recent(directory, grace_seconds))]
+
+    freed = sum(sizes.get(key, 0) for key, _ in victims)
+    if victims and not dry_run:
+        cache.delete_entries([key for key, _ in victims])
+        for _, directory in victims:
+            if directory:
+                shutil.rmtree(directory, ignore_errors=True)
+    print(f"{'Would evict' if dry_run else 'Evicted'} {len(victims)} LRU entries "
+          f"({format_size(freed)})")
+    return freed
+
+
+def delete_orphans(cache: TrainingCache, grace_seconds: float, dry_run: bool) -> int:
+    """Delete result directories that no cache_entry row references"""
+    referenced = {os.path.normcase(os.path.abspath(directory))
+                  for _, _, directory in cache.entries() if directory}
+    freed, count = 0, 0
+    for directory in cache.result_directories():
+        if os.path.normcase(os.path.abspath(directory)) in referenced:
+            continue
+        if is_recent(directory, grace_seconds):
+            continue
+        freed += directory_size(directory)
+        count += 1
+        if not dry_run:
+            shutil.rmtree(directory, ignore_errors=True)
+    print(f"{'Would delete' if dry_run else 'Deleted'} {count} orphaned directories "
+          f"({format_size(freed)})")
+    return freed
+
+
+def file_digest(path: Text) -> Text:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dedupe(cache: TrainingCache, grace_seconds: float, dry_run: bool) -> int:
+    """Hardlink byte-identical files across result directories"""
+    # Group by size first so only files that could match are hashed
+    by_size: Dict[int, List[Tuple[Text, os.stat_result]]] = defaultdict(list)
+    for directory in cache.result_directories():
+        if is_recent(directory, grace_seconds):
+            continue
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.lstat(path)
+                if stat.st_size:
+                    by_size[stat.st_size].append((path, stat))
+
+    saved, linked = 0, 0
+    for size, candidates in by_size.items():
+        if len(candidates) < 2:
+            continue
+        by_digest: Dict[Text, List[Tuple[Text, os.stat_result]]] = defaultdict(list)
+        for path, stat in candidates:
+            by_digest[file_digest(path)].append((path, stat))
+
+        for group in by_digest.values():
+            canonical, canonical_stat = group[0]
+            for path, stat in group[1:]:
+                if (stat.st_dev, stat.st_ino) == (canonical_stat.st_dev, canonical_stat.st_ino):
+                    continue
+                if stat.st_dev != canonical_stat.st_dev:
+                    continue
+                if not dry_run:
+                    temporary = f"{path}.dedupe"
+                    try:
+                        os.link(canonical, temporary)
+                        os.replace(temporary, path)
+                    except OSError as e:
+                        print(f"⚠️  Could not hardlink {path}: {e}")
+                        if os.path.exists(temporary):
+                            os.remove(temporary)
+                        continue
+                saved += size
+                linked += 1
+    print(f"{'Would hardlink' if dry_run else 'Hardlinked'} {linked} duplicate files "
+          f"({format_size(saved)})")
+    return saved
+
+
+def print_stats(cache: TrainingCache, label: Text) -> None:
+    entries = cache.entries()
+    directories = cache.result_directories()
+    seen: set = set()
+    size = sum(directory_size(directory, seen) for directory in directories)
+    with_results = sum(1 for _, _, directory in entries if directory)
+    print(f"{label}: {len(entries)} entries ({with_results} with results), "
+          f"{len(directories)} directories, {format_size(size)} on disk, "
+          f"{format_size(os.path.getsize(cache.db_path))} database")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Garbage-collect the Rasa training cache")
+    parser.add_argument("--cache-dir", default=default_cache_dir(),
+                        help=f"Cache directory (default: ${CACHE_DIR_ENV}, .rasa/cache or cache)")
+    parser.add_argument("--max-size-mb", type=float,
+                        help="Evict least recently used results until the cache fits this budget")
+    parser.add_argument("--max-age-days", type=float,
+                        help="Evict entries not used for this many days")
+    parser.add_argument("--grace-minutes", type=float, default=DEFAULT_GRACE_MINUTES,
+                        help="Leave directories modified this recently alone")
+    parser.add_argument("--no-dedupe", action="store_true", help="Skip hardlink deduplication")
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+    args = parser.parse_args()
+
+    try:
+        cache = TrainingCache(args.cache_dir)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("🏥 Healthcare Chatbot Training Cache Manager")
+    print_header(f"CACHE {args.cache_dir}{' (dry run)' if args.dry_run else ''}")
+    grace_seconds = args.grace_minutes * 60
+    start = time.perf_counter()
+    try:
+        print_stats(cache, "Before")
+        drop_dangling(cache, args.dry_run)
+        if args.max_size_mb is not None or args.max_age_days is not None:
+            evict(cache, args.max_size_mb, args.max_age_days, grace_seconds, args.dry_run)
+        delete_orphans(cache, grace_seconds, args.dry_run)
+        if not args.no_dedupe:
+            dedupe(cache, grace_seconds, args.dry_run)
+        if not args.dry_run:
+            cache.vacuum()
+        print_stats(cache, "After")
+    finally:
+        cache.close()
+
+    print(f"✅ Done in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+# Healthcare Chatbot Rasa Server Components
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Custom Channels and Pipeline Components
+
+"""
+Extensions loaded by the Rasa server (not the action server).
+
+Reference them by module path, e.g. in credentials.yml:
+
+    components.emergency_fast_path.EmergencyFastPathRestInput:
+"""
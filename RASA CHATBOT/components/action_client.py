@@ -0,0 +1,276 @@
+# Healthcare Chatbot Action Endpoint Client
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Pooled Keep-Alive Action Server Connections
+
+"""
+Pooled keep-alive HTTP client for calls from the Rasa server to the action server.
+
+Rasa opens a new ``aiohttp`` session, and so a new TCP connection, for every
+custom action call and closes it afterwards: each turn pays connection setup
+and leaves a socket in TIME_WAIT. ``ActionEndpointClient`` replaces the action
+endpoint of each call (see ``components/slim_action_calls.py``) with one
+long-lived session per action server URL whose connections stay open between
+calls:
+
+* ``pool_size`` bounds the open connections; calls beyond it wait for one.
+* Idle connections are closed after ``keepalive_timeout`` seconds. Keep it
+  below the action server's own keep-alive timeout (5 seconds for
+  ``rasa run actions``; see ``--keep-alive-timeout`` of ``action_server.py``),
+  so the client never reuses a connection the server is closing.
+* ``connect_timeout`` limits TCP connection setup, ``request_timeout`` the
+  whole call (Rasa's own timeout when unset).
+* A call that could not connect at all (connection refused or unreachable)
+  is retried up to ``max_retries`` times, drawing on a retry budget of
+  ``retry_budget`` retries per call made plus one per second, so retries
+  cannot multiply the load on an action server that is down.
+  Nothing else is retried, not even a kept-alive connection the server
+  closed: the server may have read the request and run the action before
+  closing it (e.g. a draining worker of ``action_server.py`` being killed),
+  and actions such as booking an appointment are not idempotent.
+* Request bodies of ``compress_threshold`` bytes or more are sent
+  deflate-compressed (0 disables).
+
+Configured on the action endpoint in endpoints.yml:
+
+    action_endpoint:
+      url: "http://localhost:5055/webhook"
+      pool_size: 32
+      keepalive_timeout: 4
+
+Connection reuse statistics are served at ``/webhooks/rest/action_client_stats``
+by the REST channel. HTTP/1.1 pipelining and HTTP/2 are not used: aiohttp
+supports neither and the Sanic action server does not speak HTTP/2.
+"""
+
+import asyncio
+import json
+import logging
+import ssl
+import time
+import zlib
+from typing import Any, Dict, Optional, Text
+
+import aiohttp
+from rasa.utils.endpoints import ClientResponseError, concat_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_KEEPALIVE_TIMEOUT = 4.0
+DEFAULT_CONNECT_TIMEOUT = 2.0
+DEFAULT_REQUEST_TIMEOUT = 300.0
+DEFAULT_MAX_RETRIES = 1
+DEFAULT_RETRY_BUDGET = 0.1
+DEFAULT_COMPRESS_THRESHOLD = 16384
+
+
+class RetryBudget:
+    """Retries allowed as a share of recent calls, plus a steady minimum"""
+
+    def __init__(self, ratio: float = DEFAULT_RETRY_BUDGET, per_second: float = 1.0,
+                 max_balance: float = 10.0) -> None:
+        self.ratio = ratio
+        self.per_second = per_second
+        self.max_balance = max_balance
+        self._balance = max_balance
+        self._updated = time.monotonic()
+
+    def _refill(self, amount: float = 0.0) -> None:
+        now = time.monotonic()
+        self._balance = min(self.max_balance,
+                            self._balance + amount + (now - self._updated) * self.per_second)
+        self._updated = now
+
+    def deposit(self) -> None:
+        """Record a call"""
+        self._refill(self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one retry from the budget, if there is one"""
+        self._refill()
+        if self._balance < 1.0:
+            return False
+        self._balance -= 1.0
+        return True
+
+
+class ActionEndpointClient:
+    """Pooled keep-alive stand-in for Rasa's action EndpointConfig"""
+
+    @classmethod
+    def from_endpoint(cls, endpoint: Any) -> "ActionEndpointClient":
+        options = getattr(endpoint, "kwargs", None) or {}
+        request_timeout = options.get("request_timeout")
+        return cls(
+            endpoint,
+            pool_size=int(options.get("pool_size", DEFAULT_POOL_SIZE)),
+            keepalive_timeout=float(options.get("keepalive_timeout", DEFAULT_KEEPALIVE_TIMEOUT)),
+            connect_timeout=float(options.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT)),
+            request_timeout=float(request_timeout) if request_timeout is not None else None,
+            max_retries=int(options.get("max_retries", DEFAULT_MAX_RETRIES)),
+            retry_budget=float(options.get("retry_budget", DEFAULT_RETRY_BUDGET)),
+            compress_threshold=int(options.get("compress_threshold", DEFAULT_COMPRESS_THRESHOLD)),
+        )
+
+    def __init__(self, endpoint: Any, pool_size: int = DEFAULT_POOL_SIZE,
+                 keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 request_timeout: Optional[float] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 retry_budget: float = DEFAULT_RETRY_BUDGET,
+                 compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD) -> None:
+        self.endpoint = endpoint
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.budget = RetryBudget(retry_budget)
+        self.compress_threshold = compress_threshold
+        self.stats = {
+            "requests": 0,
+            "in_flight": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "retries": 0,
+            "retries_denied": 0,
+            "failures": 0,
+            "compressed": 0,
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __getattr__(self, name: Text) -> Any:
+        # url, headers, kwargs, ... of the configured endpoint
+        return getattr(self.endpoint, name)
+
+    async def _on_connection_created(self, session: Any, context: Any, params: Any) -> None:
+        self.stats["connections_created"] += 1
+
+    async def _on_connection_reused(self, session: Any, context: Any, params: Any) -> None:
+        self.stats["connections_reused"] += 1
+
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session of the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection_created)
+            trace.on_connection_reuseconn.append(self._on_connection_reused)
+            connector_options: Dict[Text, Any] = {}
+            cafile = getattr(self.endpoint, "cafile", None)
+            if cafile:
+                connector_options["ssl"] = ssl.create_default_context(cafile=cafile)
+            basic_auth = getattr(self.endpoint, "basic_auth", None)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size, keepalive_timeout=self.keepalive_timeout, **connector_options
+                ),
+                headers=getattr(self.endpoint, "headers", None),
+                auth=aiohttp.BasicAuth(basic_auth["username"], basic_auth["password"]) if basic_auth else None,
+                trace_configs=[trace],
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, method: Text = "post", subpath: Optional[Text] = None,
+                      content_type: Optional[Text] = "application/json", **kwargs: Any) -> Any:
+        """Same contract as EndpointConfig.request: parsed JSON, ClientResponseError on >= 400"""
+        headers = {"Content-Type": content_type} if content_type else {}
+        headers.update(kwargs.pop("headers", None) or {})
+        kwargs.pop("compress", None)
+        if kwargs.get("json") is not None:
+            body = json.dumps(kwargs.pop("json")).encode("utf-8")
+            if self.compress_threshold and len(body) >= self.compress_threshold:
+                body = zlib.compress(body)
+                headers["Content-Encoding"] = "deflate"
+                self.stats["compressed"] += 1
+            kwargs["data"] = body
+        call_timeout = kwargs.pop("timeout", None)
+        timeout = aiohttp.ClientTimeout(
+            total=self.request_timeout or call_timeout or DEFAULT_REQUEST_TIMEOUT,
+            sock_connect=self.connect_timeout,
+        )
+        params = self.endpoint.combine_parameters(kwargs)
+        url = concat_url(self.endpoint.url, subpath)
+
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        self.budget.deposit()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    async with self.session().request(method, url, headers=headers, params=params, timeout=timeout,
+                                                      **kwargs) as response:
+                        if response.status >= 400:
+                            raise ClientResponseError(response.status, response.reason,
+                                                      await response.content.read())
+                        try:
+                            return await response.json()
+                        except aiohttp.ContentTypeError:
+                            return None
+                except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) as e:
+                    # Only a call that never connected cannot have run the action
+                    if not isinstance(e, aiohttp.ClientConnectorError) or attempt >= self.max_retries:
+                        self.stats["failures"] += 1
+                        raise
+                    if not self.budget.withdraw():
+                        self.stats["retries_denied"] += 1
+                        self.stats["failures"] += 1
+                        raise
+                    attempt += 1
+                    self.stats["retries"] += 1
+                    logger.debug(f"Retrying action call to {url} ({e!r})")
+        finally:
+            self.stats["in_flight"] -= 1
+
+    def as_dict(self) -> Dict[Text, Any]:
+        opened = self.stats["connections_created"] + self.stats["connections_reused"]
+        return {
+            "url": self.endpoint.url,
+            "pool_size": self.pool_size,
+            "keepalive_timeout": self.keepalive_timeout,
+            **self.stats,
+            "reuse_ratio": self.stats["connections_reused"] / opened if opened else 0.0,
+        }
+
+
+# One client per action server URL, shared by every action call of this process
+_clients: Dict[Text, ActionEndpointClient] = {}
+
+
+def get_action_client(endpoint: Any) -> ActionEndpointClient:
+    """The pooled client for an action endpoint"""
+    client = _clients.get(endpoint.url)
+    if client is None:
+        client = _clients[endpoint.url] = ActionEndpointClient.from_endpoint(endpoint)
+        logger.info(f"Pooled action endpoint client for {endpoint.url} ({client.pool_size} connections)")
+    return client
+
+
+def action_client_stats() -> Dict[Text, Any]:
+    return {"clients": [client.as_dict() for client in _clients.values()]}
+
+
+async def close_action_clients() -> None:
+    for client in _clients.values():
+        await client.close()
+
+
+def add_action_client_routes(blueprint: Any) -> None:
+    """Serve the client statistics from a channel blueprint and close the pools on shutdown"""
+    from sanic import response
+
+    @blueprint.route("/action_client_stats", methods=["GET"])
+    async def action_client_stats_route(request: Any) -> Any:
+        return response.json(action_client_stats())
+
+    @blueprint.listener("after_server_stop")
+    async def close_clients(app: Any, loop: Any) -> None:
+        await close_action_clients()
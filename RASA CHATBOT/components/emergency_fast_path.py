@@ -0,0 +1,186 @@
+# Healthcare Chatbot Emergency Fast Path
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Pre-NLU Emergency Detection
+
+"""
+REST channel that spots life-safety messages before NLU inference.
+
+Every incoming text is matched against one compiled regular expression built
+from the emergency phrases (the ``emergency`` tier of ``triage_rules.yml``
+plus the phrasings below). On a match the message is handed to Rasa as the
+intent trigger ``/emergency_help``, which skips the tokenizer, featurizers
+and DIETClassifier entirely; the ``emergency_help`` rule then runs
+``action_emergency_protocol``. Anything else falls through to normal
+inference unchanged.
+
+Enable it in credentials.yml in place of the plain ``rest:`` channel; it keeps
+the ``/webhooks/rest/webhook`` URL used by the React frontend:
+
+    components.emergency_fast_path.EmergencyFastPathRestInput:
+      latency_budget_us: 200
+
+Detection statistics are served at ``/webhooks/rest/emergency_stats``.
+"""
+
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Text
+
+import yaml
+from rasa.core.channels.channel import UserMessage
+from rasa.core.channels.rest import RestInput
+from sanic import Blueprint, response
+from sanic.request import Request
+from sanic.response import HTTPResponse
+
+logger = logging.getLogger(__name__)
+
+EMERGENCY_INTENT_TRIGGER = "/emergency_help"
+
+# Phrasings of emergencies that are not symptom names
+EMERGENCY_PHRASES = (
+    "call 911", "call an ambulance", "need an ambulance", "need paramedics",
+    "medical emergency", "this is an emergency", "life threatening",
+    "life or death", "can't breathe", "cannot breathe", "can not breathe",
+    "heart attack", "bleeding heavily", "overdose", "suicidal",
+    "kill myself", "seizure", "choking",
+)
+
+# A negation right before a phrase ("no chest pain", "don't have any chest
+# pain") cancels the match. Only these filler words may stand between the two;
+# anything else, and any punctuation ("no fever, chest pain", "never mind,
+# chest pain"), keeps the match: when in doubt the message is an emergency.
+NEGATION = re.compile(
+    r"\b(?:no|not|don't|dont|never|without|denies|deny)"
+    r"(?:\s+(?:have|has|had|having|any|a|an|feel|feeling|got))*\s+$"
+)
+
+DEFAULT_RULES_PATH = "triage_rules.yml"
+DEFAULT_LATENCY_BUDGET_US = 200
+
+
+def load_emergency_terms(path: Text = DEFAULT_RULES_PATH) -> Iterable[Text]:
+    """Emergency-tier terms from the triage rules file, if it exists"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = yaml.safe_load(f) or {}
+    except OSError:
+        return ()
+    return (rules.get("tiers") or {}).get("emergency") or ()
+
+
+class EmergencyDetector:
+    """Compiled matcher for emergency phrases in raw user text"""
+
+    def __init__(self, phrases: Iterable[Text]) -> None:
+        # Longest phrases first so the reported match is the most specific
+        unique = sorted({" ".join(p.lower().split()) for p in phrases if p.strip()},
+                        key=len, reverse=True)
+        alternation = "|".join(re.escape(p).replace(r"\ ", r"\s+") for p in unique)
+        self.pattern = re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+
+    def detect(self, text: Text) -> Optional[Text]:
+        """Return the emergency phrase found in text, or None"""
+        for match in self.pattern.finditer(text):
+            if not NEGATION.search(text[max(0, match.start() - 60):match.start()].lower()):
+                return match.group(0)
+        return None
+
+
+class FastPathStats:
+    """Counters and latency figures for the detector"""
+
+    def __init__(self, budget_us: float) -> None:
+        self.budget_us = budget_us
+        self.messages = 0
+        self.emergencies = 0
+        self.over_budget = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def record(self, elapsed_us: float, matched: bool) -> None:
+        self.messages += 1
+        self.emergencies += matched
+        self.total_us += elapsed_us
+        self.max_us = max(self.max_us, elapsed_us)
+        if elapsed_us > self.budget_us:
+            self.over_budget += 1
+            logger.warning(
+                f"Emergency detection took {elapsed_us:.0f}µs "
+                f"(budget {self.budget_us:.0f}µs)"
+            )
+
+    def as_dict(self) -> Dict[Text, Any]:
+        return {
+            "messages": self.messages,
+            "emergencies": self.emergencies,
+            "budget_us": self.budget_us,
+            "over_budget": self.over_budget,
+            "mean_us": self.total_us / self.messages if self.messages else 0.0,
+            "max_us": self.max_us,
+        }
+
+
+class EmergencyFastPathRestInput(RestInput):
+    """REST input channel with pre-NLU emergency short-circuiting"""
+
+    @classmethod
+    def from_credentials(cls, credentials: Optional[Dict[Text, Any]]) -> "EmergencyFastPathRestInput":
+        credentials = credentials or {}
+        return cls(
+            rules_path=credentials.get("rules_path", DEFAULT_RULES_PATH),
+            extra_phrases=credentials.get("phrases") or (),
+            latency_budget_us=float(
+                credentials.get("latency_budget_us", DEFAULT_LATENCY_BUDGET_US)
+            ),
+        )
+
+    def __init__(self, rules_path: Text = DEFAULT_RULES_PATH,
+                 extra_phrases: Iterable[Text] = (),
+                 latency_budget_us: float = DEFAULT_LATENCY_BUDGET_US) -> None:
+        phrases = [*EMERGENCY_PHRASES, *load_emergency_terms(rules_path), *extra_phrases]
+        self.detector = EmergencyDetector(phrases)
+        self.stats = FastPathStats(latency_budget_us)
+
+    def _route(self, message: UserMessage) -> UserMessage:
+        text = message.text or ""
+        if text.startswith("/"):
+            # Buttons and intent triggers already bypass NLU
+            return message
+
+        start = time.perf_counter()
+        phrase = self.detector.detect(text)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        self.stats.record(elapsed_us, phrase is not None)
+
+        if phrase is None:
+            return message
+
+        metadata = dict(message.metadata or {})
+        metadata["emergency_fast_path"] = {
+            "original_text": text,
+            "matched": phrase,
+            "detection_us": round(elapsed_us, 1),
+        }
+        logger.info(f"Emergency fast path for {message.sender_id}: '{phrase}'")
+        return UserMessage(
+            text=EMERGENCY_INTENT_TRIGGER,
+            output_channel=message.output_channel,
+            sender_id=message.sender_id,
+            input_channel=message.input_channel,
+            message_id=message.message_id,
+            metadata=metadata,
+        )
+
+    def blueprint(self, on_new_message: Callable[[UserMessage], Awaitable[Any]]) -> Blueprint:
+        async def route_message(message: UserMessage) -> Any:
+            return await on_new_message(self._route(message))
+
+        webhook = super().blueprint(route_message)
+
+        @webhook.route("/emergency_stats", methods=["GET"])
+        async def emergency_stats(request: Request) -> HTTPResponse:
+            return response.json(self.stats.as_dict())
+
+        return webhook
@@ -0,0 +1,265 @@
+# Healthcare Chatbot NLU Result Cache
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Skipping Inference for Repeated Messages
+
+"""
+Cache of NLU results for repeated messages.
+
+Much of the traffic repeats itself: greetings, "goodbye", affirm/deny and the
+quick-reply texts of the web widget. Their parse results are kept in a bounded
+LRU keyed on the model fingerprint and the normalized text (case, whitespace
+and punctuation ignored), so "Hello!" and "hello" share one entry.
+
+Two parts, sharing one cache per Rasa server process:
+
+* ``NLUCacheRecorder`` is the last component of the NLU pipeline. It stores the
+  final intent and entities of every message it sees, and a model with a new
+  fingerprint (``model_id``, different for every ``rasa train``) empties the
+  cache when it is loaded.
+* ``NLUCacheRestInput`` is the REST channel (with the emergency fast path). It
+  looks each message up before NLU and, on a hit, hands Rasa the cached parse
+  data with the message, so tokenization, featurization and DIETClassifier
+  inference are skipped. The original text is kept.
+
+Rasa runs every pipeline component for every message, so a component alone
+cannot skip the ones after it; the lookup therefore happens in the channel.
+Enable both:
+
+    # config_simple.yml, after FallbackClassifier
+    - name: components.nlu_cache.NLUCacheRecorder
+
+    # credentials.yml, in place of the emergency fast path channel
+    components.nlu_cache.NLUCacheRestInput:
+      max_entries: 10000
+
+Hit and miss counts are served at ``/webhooks/rest/nlu_cache_stats``; the
+channel also serves the action server connection statistics of
+``components/action_client.py`` and the lock metrics of
+``components/lock_store.py``.
+"""
+
+import copy
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple
+
+from rasa.core.channels.channel import UserMessage
+from rasa.engine.graph import ExecutionContext, GraphComponent
+from rasa.engine.recipes.default_recipe import DefaultV1Recipe
+from rasa.engine.storage.resource import Resource
+from rasa.engine.storage.storage import ModelStorage
+from rasa.shared.nlu.training_data.message import Message
+from sanic import Blueprint, response
+from sanic.request import Request
+from sanic.response import HTTPResponse
+
+from .action_client import add_action_client_routes
+from .emergency_fast_path import DEFAULT_LATENCY_BUDGET_US, DEFAULT_RULES_PATH, EmergencyFastPathRestInput
+from .lock_store import add_lock_store_routes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_TEXT_LENGTH = 200
+FALLBACK_INTENT = "nlu_fallback"
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+
+
+def normalize_text(text: Text) -> Text:
+    """Lower case, punctuation dropped, whitespace collapsed"""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def relocate_entities(entities: Iterable[Dict[Text, Any]], cached_text: Text,
+                      text: Text) -> Optional[List[Dict[Text, Any]]]:
+    """Entities of cached_text with their offsets moved into text, or None"""
+    lowered = text.lower()
+    cursor = 0
+    moved = []
+    for entity in sorted(entities, key=lambda e: e.get("start", 0)):
+        if "start" not in entity or "end" not in entity:
+            moved.append(entity)
+            continue
+        span = cached_text[entity["start"]:entity["end"]].lower()
+        start = lowered.find(span, cursor)
+        if not span or start < 0:
+            return None
+        cursor = start + len(span)
+        moved.append({**entity, "start": start, "end": cursor})
+    return moved
+
+
+class NLUResultCache:
+    """Bounded LRU of parse data per model fingerprint and normalized text"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_text_length: int = DEFAULT_MAX_TEXT_LENGTH) -> None:
+        self.max_entries = max_entries
+        self.max_text_length = max_text_length
+        self.fingerprint: Optional[Text] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # (fingerprint, normalized text) -> parse data
+        self._entries: "OrderedDict[Tuple[Text, Text], Dict[Text, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set_fingerprint(self, fingerprint: Optional[Text]) -> None:
+        """Start caching for a newly loaded model, dropping the old model's entries"""
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            if self._entries:
+                self.invalidations += 1
+                logger.info(f"NLU cache cleared for model {fingerprint} ({len(self._entries)} entries)")
+            self._entries.clear()
+            self.fingerprint = fingerprint
+
+    def get(self, text: Text) -> Optional[Dict[Text, Any]]:
+        """Parse data for text, or None on a miss"""
+        if self.fingerprint is None or len(text) > self.max_text_length:
+            return None
+        key = (self.fingerprint, normalize_text(text))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+        entities = None
+        if cached is not None:
+            entities = relocate_entities(cached.get("entities") or [], cached.get("text") or "", text)
+        if entities is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Callers own the result; the tracker stores and may change it
+        parse_data = copy.deepcopy(cached)
+        parse_data["text"] = text
+        parse_data["entities"] = entities
+        return parse_data
+
+    def put(self, fingerprint: Text, parse_data: Dict[Text, Any]) -> None:
+        text = parse_data.get("text") or ""
+        normalized = normalize_text(text)
+        if fingerprint != self.fingerprint or not normalized or len(text) > self.max_text_length:
+            return
+        with self._lock:
+            self._entries[(fingerprint, normalized)] = copy.deepcopy(parse_data)
+            self._entries.move_to_end((fingerprint, normalized))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def as_dict(self) -> Dict[Text, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.fingerprint,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Shared by the pipeline component and the channel of this server process
+NLU_CACHE = NLUResultCache()
+
+
+@DefaultV1Recipe.register([DefaultV1Recipe.ComponentType.INTENT_CLASSIFIER], is_trainable=False)
+class NLUCacheRecorder(GraphComponent):
+    """Last pipeline component: stores each message's final parse data"""
+
+    @staticmethod
+    def get_default_config() -> Dict[Text, Any]:
+        return {
+            # Results below this confidence are parsed again next time
+            "min_confidence": 0.0,
+        }
+
+    @classmethod
+    def create(cls, config: Dict[Text, Any], model_storage: ModelStorage, resource: Resource,
+               execution_context: ExecutionContext) -> "NLUCacheRecorder":
+        return cls(config, execution_context.model_id)
+
+    def __init__(self, config: Dict[Text, Any], model_id: Optional[Text]) -> None:
+        self.min_confidence = float(config.get("min_confidence", 0.0))
+        self.fingerprint = model_id
+        if model_id is not None:
+            NLU_CACHE.set_fingerprint(model_id)
+
+    def process(self, messages: List[Message]) -> List[Message]:
+        if self.fingerprint is None:
+            return messages
+        for message in messages:
+            intent = message.get("intent") or {}
+            if intent.get("name") in (None, FALLBACK_INTENT) or \
+                    (intent.get("confidence") or 0.0) < self.min_confidence:
+                continue
+            parse_data = message.as_dict(only_output_properties=True)
+            parse_data["text"] = message.get("text")
+            parse_data.setdefault("entities", [])
+            NLU_CACHE.put(self.fingerprint, parse_data)
+        return messages
+
+
+class NLUCacheRestInput(EmergencyFastPathRestInput):
+    """REST input channel answering repeated messages from the NLU cache"""
+
+    @classmethod
+    def from_credentials(cls, credentials: Optional[Dict[Text, Any]]) -> "NLUCacheRestInput":
+        credentials = credentials or {}
+        return cls(
+            rules_path=credentials.get("rules_path", DEFAULT_RULES_PATH),
+            extra_phrases=credentials.get("phrases") or (),
+            latency_budget_us=float(credentials.get("latency_budget_us", DEFAULT_LATENCY_BUDGET_US)),
+            max_entries=int(credentials.get("max_entries", DEFAULT_MAX_ENTRIES)),
+            max_text_length=int(credentials.get("max_text_length", DEFAULT_MAX_TEXT_LENGTH)),
+        )
+
+    def __init__(self, rules_path: Text = DEFAULT_RULES_PATH,
+                 extra_phrases: Iterable[Text] = (),
+                 latency_budget_us: float = DEFAULT_LATENCY_BUDGET_US,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_text_length: int = DEFAULT_MAX_TEXT_LENGTH) -> None:
+        super().__init__(rules_path, extra_phrases, latency_budget_us)
+        NLU_CACHE.max_entries = max_entries
+        NLU_CACHE.max_text_length = max_text_length
+
+    def _route(self, message: UserMessage) -> UserMessage:
+        message = super()._route(message)
+        text = message.text or ""
+        if not text or text.startswith("/") or message.parse_data:
+            # Intent triggers (emergency fast path included) bypass NLU already
+            return message
+        parse_data = NLU_CACHE.get(text)
+        if parse_data is None:
+            return message
+        return UserMessage(
+            text=text,
+            output_channel=message.output_channel,
+            sender_id=message.sender_id,
+            parse_data=parse_data,
+            input_channel=message.input_channel,
+            message_id=message.message_id,
+            metadata=message.metadata,
+        )
+
+    def blueprint(self, on_new_message: Any) -> Blueprint:
+        webhook = super().blueprint(on_new_message)
+
+        @webhook.route("/nlu_cache_stats", methods=["GET"])
+        async def nlu_cache_stats(request: Request) -> HTTPResponse:
+            return response.json(NLU_CACHE.as_dict())
+
+        add_action_client_routes(webhook)
+        add_lock_store_routes(webhook)
+        return webhook
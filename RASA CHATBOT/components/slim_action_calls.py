@@ -0,0 +1,96 @@
+# Healthcare Chatbot Slim Action Calls
+# GitHub Repository: https://github.com/user/healthcare-chatbot
+# MSc AI Assignment - Constant-Size Action Server Requests
+
+"""
+Action server requests carrying only what each action reads.
+
+Rasa serializes the whole tracker, every event of the conversation included,
+for each call to ``action_endpoint``. Once installed, a call to an action
+that declares its tracker dependencies (``actions/dependencies.py``) is built
+from the declared slots, the declared number of recent events, ``sender_id``
+and ``latest_message`` only; the event history is never serialized, so the
+cost of a call stays the same however long the conversation gets. Calls to
+actions without a declaration are unchanged.
+
+Calls are sent through the pooled keep-alive client of
+``components/action_client.py``, which also deflate-compresses request bodies
+larger than ``compress_threshold`` bytes (``Content-Encoding: deflate``, which
+the rasa_sdk action server decompresses). Both are configured on the action
+endpoint in endpoints.yml:
+
+    action_endpoint:
+      url: "http://localhost:5055/webhook"
+      slim_trackers: true
+      compress_threshold: 16384    # bytes; 0 disables compression
+
+Rasa has no setting for this, so ``rasa_server.py`` installs it before
+starting the ``rasa`` command line.
+"""
+
+import itertools
+import logging
+from typing import Any, Dict, Optional, Text
+
+from actions.dependencies import TrackerDependencies, declared_dependencies, slim_tracker_state
+
+from .action_client import ActionEndpointClient, get_action_client
+
+logger = logging.getLogger(__name__)
+
+# Read from the source of the actions package on the first action call
+_dependencies: Optional[Dict[Text, TrackerDependencies]] = None
+
+
+def action_dependencies() -> Dict[Text, TrackerDependencies]:
+    """Declared dependencies by action name; empty if the actions cannot be read"""
+    global _dependencies
+    if _dependencies is None:
+        try:
+            _dependencies = declared_dependencies()
+        except (ImportError, OSError, SyntaxError, ValueError) as e:
+            logger.warning(f"Action dependencies not loaded, sending full trackers: {e}")
+            _dependencies = {}
+        else:
+            logger.info(f"Slim trackers for {len(_dependencies)} actions")
+    return _dependencies
+
+
+def slim_action_call(action: Any, tracker: Any, domain: Any, declared: TrackerDependencies) -> Dict[Text, Any]:
+    """The request body for an action, built from its declared dependencies only"""
+    import rasa
+    from rasa.shared.core.trackers import EventVerbosity
+
+    # Without events, the state costs the same at every turn
+    state = tracker.current_state(EventVerbosity.NONE)
+    recent = list(itertools.islice(reversed(tracker.events), declared.events))[::-1]
+    return {
+        "next_action": action.name(),
+        "sender_id": tracker.sender_id,
+        "tracker": slim_tracker_state(state, declared, [event.as_dict() for event in recent]),
+        "domain": domain.as_dict() if declared.domain else {},
+        "version": rasa.__version__,
+    }
+
+
+def install_slim_action_calls() -> None:
+    """Make Rasa's RemoteAction send slim requests through the pooled client"""
+    from rasa.core.actions.action import RemoteAction
+
+    original = RemoteAction._action_call_format
+    if getattr(original, "slim_action_calls", False):
+        return
+
+    def _action_call_format(self: Any, tracker: Any, domain: Any) -> Dict[Text, Any]:
+        # RemoteAction sends the request it formats through self.action_endpoint
+        if self.action_endpoint is not None and not isinstance(self.action_endpoint, ActionEndpointClient):
+            self.action_endpoint = get_action_client(self.action_endpoint)
+        options = getattr(self.action_endpoint, "kwargs", None) or {}
+
+        declared = action_dependencies().get(self.name()) if options.get("slim_trackers", True) else None
+        if declared is None:
+            return original(self, tracker, domain)
+        return slim_action_call(self, tracker, domain, declared)
+
+    _action_call_format.slim_action_calls = True
+    RemoteAction._action_call_format = _action_call_format
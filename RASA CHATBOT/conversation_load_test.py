@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Conversation Load Test
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Capacity Planning and Soak Testing
+
+Replays the conversations in tests/test_stories.yml as concurrent synthetic
+users, the way the web widget does it:
+
+* Every user turn is posted to the Rasa REST channel
+  (``/webhooks/rest/webhook``, as ChatInterface.js and src/App.js do) and
+  recorded under the turn's expected intent.
+* Every custom action the story expects is called on the action server
+  (``/webhook`` on port 5055) with a tracker holding the conversation's slots,
+  and recorded under the action's name. Slots returned by one action are
+  passed on to the next, as Rasa would.
+
+Users arrive as a Poisson process at ``--rate`` conversations per second
+(optionally ramped up over ``--ramp-up`` seconds), or ``--users`` users run
+conversations back to back. Throughput, p50/p95/p99 latency and error rates
+are reported per intent and per action; latencies are kept in bounded
+log-linear histograms, so hour-long soak runs use constant memory.
+
+``--stub`` starts an in-process stand-in for both servers, so the tool runs
+without a trained model or network: the Rasa stub answers with each turn's
+expected responses after a simulated latency, and the action stub runs the
+real actions from actions/actions.py.
+
+Usage:
+    python conversation_load_test.py --stub --rate 20 --duration 60
+    python conversation_load_test.py --rate 50 --ramp-up 30 --duration 600 --output results/soak.json
+    python conversation_load_test.py --users 32 --targets actions --action-url http://localhost:5055
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, NamedTuple, Optional, Text, Tuple
+
+import aiohttp
+import yaml
+from aiohttp import web
+
+from actions.instrumentation import LogLinearHistogram
+from validate_project import DEFAULT_ACTIONS
+
+DEFAULT_STORY_TESTS = "tests/test_stories.yml"
+DEFAULT_DOMAIN = "domain.yml"
+DEFAULT_RASA_URL = "http://localhost:5005"
+DEFAULT_ACTION_URL = "http://localhost:5055"
+REST_WEBHOOK = "/webhooks/rest/webhook"
+ACTION_WEBHOOK = "/webhook"
+TARGETS = ("rasa", "actions")
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class ActionCall(NamedTuple):
+    name: Text
+    slots: Dict[Text, Any]
+
+
+class Turn(NamedTuple):
+    text: Text
+    intent: Text
+    entities: Dict[Text, Any]
+    responses: List[Text]
+    actions: List[ActionCall]
+
+
+class Conversation(NamedTuple):
+    name: Text
+    turns: List[Turn]
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60)
+    print(f"🚦 {title}")
+    print("=" * 60)
+
+
+def load_conversations(path: Text) -> List[Conversation]:
+    """User turns, expected responses and custom action calls of every test case"""
+    with open(path, "r", encoding="utf-8") as f:
+        document = yaml.safe_load(f) or {}
+
+    conversations = []
+    for case in document.get("test_cases") or document.get("stories") or []:
+        turns: List[Turn] = []
+        # Slots the story sets before an action, applied before calling it
+        pending_slots: Dict[Text, Any] = {}
+        for step in case.get("steps") or []:
+            if "user" in step:
+                turns.append(Turn(step["user"].strip(), step.get("intent", "unknown"),
+                                  step.get("entities") or {}, [], []))
+            elif "slot_was_set" in step:
+                for slot in step["slot_was_set"] or []:
+                    if isinstance(slot, dict):
+                        pending_slots.update(slot)
+            elif "action" in step and turns:
+                name = step["action"]
+                turns[-1].responses.append(name)
+                if name.startswith("action_") and name not in DEFAULT_ACTIONS:
+                    turns[-1].actions.append(ActionCall(name, dict(pending_slots)))
+                    pending_slots.clear()
+        if turns:
+            conversations.append(Conversation(case.get("test_case") or case.get("story"), turns))
+    return conversations
+
+
+class EndpointStats:
+    """Requests, errors and latency for one intent or action"""
+
+    __slots__ = ("requests", "errors", "error_kinds", "latency_us")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.error_kinds: Dict[Text, int] = {}
+        self.latency_us = LogLinearHistogram()
+
+    def record(self, elapsed_s: float, error: Optional[Text]) -> None:
+        self.requests += 1
+        self.latency_us.record(int(elapsed_s * 1_000_000))
+        if error:
+            self.errors += 1
+            self.error_kinds[error] = self.error_kinds.get(error, 0) + 1
+
+    def as_dict(self, elapsed_s: float) -> Dict[Text, Any]:
+        latency = self.latency_us
+        return {
+            "requests": self.requests,
+            "throughput_rps": round(self.requests / elapsed_s, 2) if elapsed_s else 0.0,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "error_kinds": dict(sorted(self.error_kinds.items())),
+            "latency_ms": {
+                "mean": round(latency.total / latency.count / 1000, 3) if latency.count else 0.0,
+                "max": latency.max / 1000,
+                **{f"p{int(q * 100)}": latency.quantile(q) / 1000 for q in QUANTILES},
+            },
+        }
+
+
+class LoadStats:
+    """Per-intent and per-action statistics of one run"""
+
+    def __init__(self) -> None:
+        self.intents: Dict[Text, EndpointStats] = {}
+        self.actions: Dict[Text, EndpointStats] = {}
+        self.total = EndpointStats()
+        self.conversations_started = 0
+        self.conversations_completed = 0
+        self.conversations_shed = 0
+        self.empty_replies = 0
+
+    def record(self, group: Dict[Text, EndpointStats], name: Text, elapsed_s: float,
+               error: Optional[Text]) -> None:
+        if name not in group:
+            group[name] = EndpointStats()
+        group[name].record(elapsed_s, error)
+        self.total.record(elapsed_s, error)
+
+    def as_dict(self, elapsed_s: float) -> Dict[Text, Any]:
+        return {
+            "seconds": round(elapsed_s, 2),
+            "conversations": {
+                "started": self.conversations_started,
+                "completed": self.conversations_completed,
+                "shed": self.conversations_shed,
+                "per_second": round(self.conversations_completed / elapsed_s, 2) if elapsed_s else 0.0,
+            },
+            "empty_replies": self.empty_replies,
+            "total": self.total.as_dict(elapsed_s),
+            "intents": {name: stats.as_dict(elapsed_s) for name, stats in sorted(self.intents.items())},
+            "actions": {name: stats.as_dict(elapsed_s) for name, stats in sorted(self.actions.items())},
+        }
+
+
+def tracker_payload(sender_id: Text, turn: Turn, slots: Dict[Text, Any]) -> Dict[Text, Any]:
+    """Tracker state as Rasa sends it to the action server"""
+    return {
+        "sender_id": sender_id,
+        "slots": slots,
+        "latest_message": {
+            "text": turn.text,
+            "intent": {"name": turn.intent, "confidence": 1.0},
+            "entities": [{"entity": name, "value": value} for name, value in turn.entities.items()],
+        },
+        "events": [],
+        "paused": False,
+        "followup_action": None,
+        "active_loop": {},
+        "latest_action_name": "action_listen",
+    }
+
+
+async def timed_post(session: aiohttp.ClientSession, url: Text,
+                     payload: Dict[Text, Any]) -> Tuple[float, Optional[Text], Any]:
+    """(seconds, error kind or None, decoded body)"""
+    start = time.perf_counter()
+    try:
+        async with session.post(url, json=payload) as response:
+            body = await response.json(content_type=None)
+            error = None if response.status == 200 else f"http_{response.status}"
+    except asyncio.TimeoutError:
+        return time.perf_counter() - start, "timeout", None
+    except aiohttp.ClientConnectionError:
+        return time.perf_counter() - start, "connection", None
+    except (aiohttp.ClientError, ValueError):
+        return time.perf_counter() - start, "bad_response", None
+    return time.perf_counter() - start, error, body
+
+
+async def run_conversation(session: aiohttp.ClientSession, conversation: Conversation,
+                           args: argparse.Namespace, domain: Dict[Text, Any],
+                           stats: LoadStats, rng: random.Random) -> None:
+    """Play one conversation as a new user"""
+    sender_id = f"load-{uuid.uuid4().hex[:12]}"
+    slots: Dict[Text, Any] = {}
+    stats.conversations_started += 1
+
+    for turn in conversation.turns:
+        if args.think_time:
+            await asyncio.sleep(rng.expovariate(1 / args.think_time))
+
+        if "rasa" in args.targets:
+            elapsed, error, body = await timed_post(
+                session, args.rasa_url + REST_WEBHOOK, {"sender": sender_id, "message": turn.text}
+            )
+            stats.record(stats.intents, turn.intent, elapsed, error)
+            if not error and not body:
+                stats.empty_replies += 1
+
+        if "actions" in args.targets:
+            for call in turn.actions:
+                slots.update(call.slots)
+                payload = {
+                    "next_action": call.name,
+                    "sender_id": sender_id,
+                    "tracker": tracker_payload(sender_id, turn, slots),
+                    "domain": domain,
+                    "version": "3.6.0",
+                }
+                elapsed, error, body = await timed_post(session, args.action_url + ACTION_WEBHOOK, payload)
+                stats.record(stats.actions, call.name, elapsed, error)
+                for event in (body or {}).get("events", []) if not error else []:
+                    if event.get("event") == "slot":
+                        slots[event["name"]] = event.get("value")
+
+    stats.conversations_completed += 1
+
+
+async def open_loop(start_conversation: Any, args: argparse.Namespace, stats: LoadStats,
+                    rng: random.Random) -> None:
+    """Poisson arrivals at --rate, ramped up linearly over --ramp-up seconds"""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    in_flight: set = set()
+    while True:
+        elapsed = loop.time() - started
+        if elapsed >= args.duration:
+            break
+        share = min(1.0, elapsed / args.ramp_up) if args.ramp_up else 1.0
+        await asyncio.sleep(rng.expovariate(args.rate * max(share, 0.05)))
+        if len(in_flight) >= args.max_in_flight:
+            # Shed instead of queueing, so an overloaded server can't exhaust this process
+            stats.conversations_shed += 1
+            continue
+        task = asyncio.ensure_future(start_conversation())
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def closed_loop(start_conversation: Any, args: argparse.Namespace) -> None:
+    """--users users running conversations back to back until --duration ends"""
+    deadline = asyncio.get_running_loop().time() + args.duration
+
+    async def user() -> None:
+        while asyncio.get_running_loop().time() < deadline:
+            await start_conversation()
+
+    await asyncio.gather(*(user() for _ in range(args.users)))
+
+
+async def report_progress(stats: LoadStats, interval: float) -> None:
+    started = time.perf_counter()
+    last_requests = 0
+    while True:
+        await asyncio.sleep(interval)
+        requests = stats.total.requests
+        print(f"⏱️  {time.perf_counter() - started:6.0f}s | "
+              f"{(requests - last_requests) / interval:8.1f} req/s | "
+              f"p95 {stats.total.latency_us.quantile(0.95) / 1000:7.1f} ms | "
+              f"errors {stats.total.errors} | "
+              f"in flight {stats.conversations_started - stats.conversations_completed}")
+        last_requests = requests
+
+
+# ====== STUB BACKEND ======
+
+def load_action_registry() -> Dict[Text, Any]:
+    """Instances of every custom action in actions/actions.py, by name
+
+    The actions book into an in-memory store and memo, so stub runs never
+    write to the appointment store configured in endpoints.yml.
+    """
+    os.environ.setdefault("ACTION_METRICS_PORT", "0")
+    from rasa_sdk import Action
+
+    from actions import actions as module
+    from actions.backend import LocalSchedulingBackend, set_backend
+    from actions.store import InMemoryAppointmentStore
+    from actions.triage_memo import InMemoryTriageMemo, set_triage_memo
+
+    set_backend(LocalSchedulingBackend(store=InMemoryAppointmentStore()))
+    set_triage_memo(InMemoryTriageMemo())
+
+    registry = {}
+    for value in vars(module).values():
+        if isinstance(value, type) and issubclass(value, Action) and value.__module__ == module.__name__:
+            action = value()
+            registry[action.name()] = action
+    return registry
+
+
+def stub_rasa_app(conversations: List[Conversation], latency: float, error_rate: float,
+                  rng: random.Random) -> web.Application:
+    """REST channel stand-in replying with each turn's expected responses"""
+    replies = {turn.text.lower(): turn.responses for c in conversations for turn in c.turns}
+
+    async def webhook(request: web.Request) -> web.Response:
+        message = await request.json()
+        if latency:
+            await asyncio.sleep(rng.expovariate(1 / latency))
+        if rng.random() < error_rate:
+            return web.json_response({"error": "injected failure"}, status=500)
+        responses = replies.get(str(message.get("message", "")).strip().lower(), ["utter_default"])
+        return web.json_response([{"recipient_id": message.get("sender"), "text": name}
+                                  for name in responses])
+
+    app = web.Application()
+    app.router.add_post(REST_WEBHOOK, webhook)
+    return app
+
+
+def stub_action_app(registry: Dict[Text, Any]) -> web.Application:
+    """Action server stand-in running the real custom actions in-process"""
+    from rasa_sdk import Tracker
+    from rasa_sdk.executor import CollectingDispatcher
+
+    async def webhook(request: web.Request) -> web.Response:
+        call = await request.json()
+        action = registry.get(call.get("next_action"))
+        if action is None:
+            return web.json_response({"error": f"No registered action found for name "
+                                               f"'{call.get('next_action')}'."}, status=404)
+        dispatcher = CollectingDispatcher()
+        events = action.run(dispatcher, Tracker.from_dict(call["tracker"]), call.get("domain") or {})
+        if asyncio.iscoroutine(events):
+            events = await events
+        return web.json_response({"events": events, "responses": dispatcher.messages})
+
+    app = web.Application()
+    app.router.add_post(ACTION_WEBHOOK, webhook)
+    return app
+
+
+async def start_stub(app: web.Application) -> Tuple[web.AppRunner, Text]:
+    """Serve an app on a free loopback port; returns (runner, base URL)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.SockSite(runner, sock).start()
+    return runner, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+# ====== REPORT ======
+
+def print_table(title: Text, rows: Dict[Text, Dict[Text, Any]]) -> None:
+    print_header(title)
+    if not rows:
+        print("No requests")
+        return
+    print(f"{'Name':<32} {'Requests':>9} {'Req/s':>8} {'Errors':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in rows.items():
+        latency = row["latency_ms"]
+        print(f"{name:<32} {row['requests']:>9} {row['throughput_rps']:>8.1f} "
+              f"{row['error_rate']:>7.1%} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+              f"{latency['p99']:>8.1f}")
+
+
+async def run(args: argparse.Namespace) -> Dict[Text, Any]:
+    conversations = load_conversations(args.stories)
+    if not conversations:
+        raise ValueError(f"No conversations found in {args.stories}")
+    domain: Dict[Text, Any] = {}
+    if "actions" in args.targets and os.path.exists(args.domain):
+        with open(args.domain, "r", encoding="utf-8") as f:
+            domain = yaml.safe_load(f) or {}
+
+    rng = random.Random(args.seed)
+    runners = []
+    if args.stub:
+        rasa_runner, args.rasa_url = await start_stub(
+            stub_rasa_app(conversations, args.stub_latency, args.stub_error_rate, random.Random(args.seed))
+        )
+        action_runner, args.action_url = await start_stub(stub_action_app(load_action_registry()))
+        runners += [rasa_runner, action_runner]
+
+    print(f"Conversations: {len(conversations)} | Targets: {', '.join(args.targets)} | "
+          + (f"Users: {args.users}" if args.users else f"Rate: {args.rate}/s")
+          + f" | Duration: {args.duration}s{' | Stub backend' if args.stub else ''}")
+    print(f"Rasa: {args.rasa_url} | Actions: {args.action_url}")
+
+    stats = LoadStats()
+    connector = aiohttp.TCPConnector(limit=args.connections)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def start_conversation() -> None:
+            await run_conversation(session, rng.choice(conversations), args, domain, stats, rng)
+
+        progress = asyncio.ensure_future(report_progress(stats, args.progress_interval))
+        start = time.perf_counter()
+        try:
+            if args.users:
+                await closed_loop(start_conversation, args)
+            else:
+                await open_loop(start_conversation, args, stats, rng)
+        finally:
+            elapsed = time.perf_counter() - start
+            progress.cancel()
+            for runner in runners:
+                await runner.cleanup()
+    return stats.as_dict(elapsed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay test conversations as concurrent users")
+    parser.add_argument("--stories", default=DEFAULT_STORY_TESTS)
+    parser.add_argument("--domain", default=DEFAULT_DOMAIN, help="Sent to the action server")
+    parser.add_argument("--rasa-url", default=DEFAULT_RASA_URL)
+    parser.add_argument("--action-url", default=DEFAULT_ACTION_URL)
+    parser.add_argument("--targets", default=",".join(TARGETS),
+                        help="Comma-separated servers to load: rasa, actions")
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="New conversations per second (Poisson arrivals)")
+    parser.add_argument("--ramp-up", type=float, default=0.0,
+                        help="Seconds to ramp the arrival rate up to --rate")
+    parser.add_argument("--users", type=int,
+                        help="Closed loop: this many users running conversations back to back")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to generate load")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean seconds a user waits before each message")
+    parser.add_argument("--max-in-flight", type=int, default=1000,
+                        help="Conversations in progress before new arrivals are shed")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection pool size")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds per request")
+    parser.add_argument("--progress-interval", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stub", action="store_true",
+                        help="Run against in-process stand-ins for Rasa and the action server")
+    parser.add_argument("--stub-latency", type=float, default=0.05,
+                        help="Mean simulated Rasa response time in seconds")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0,
+                        help="Share of Rasa stub requests answered with HTTP 500")
+    parser.add_argument("--max-error-rate", type=float,
+                        help="Exit with code 1 if the overall error rate exceeds this")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    args.targets = [target.strip() for target in args.targets.split(",") if target.strip()]
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown or not args.targets:
+        parser.error(f"--targets must be a subset of {', '.join(TARGETS)}")
+
+    print("🏥 Healthcare Chatbot Conversation Load Test")
+    try:
+        results = asyncio.run(run(args))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    total = results["total"]
+    print_table("INTENTS (REST webhook)", results["intents"])
+    print_table("ACTIONS (action server)", results["actions"])
+    print_header("SUMMARY")
+    conversations = results["conversations"]
+    print(f"Conversations: {conversations['completed']} completed "
+          f"({conversations['per_second']:.1f}/s), {conversations['shed']} shed")
+    print(f"Requests: {total['requests']} ({total['throughput_rps']:.1f}/s), "
+          f"errors {total['errors']} ({total['error_rate']:.2%}) {total['error_kinds'] or ''}")
+    print(f"Latency: p50 {total['latency_ms']['p50']:.1f} ms, p95 {total['latency_ms']['p95']:.1f} ms, "
+          f"p99 {total['latency_ms']['p99']:.1f} ms, max {total['latency_ms']['max']:.1f} ms")
+    if results["empty_replies"]:
+        print(f"⚠️  {results['empty_replies']} REST replies contained no bot message")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"📊 Results written to {args.output}")
+
+    if args.max_error_rate is not None and total["error_rate"] > args.max_error_rate:
+        print(f"❌ Error rate {total['error_rate']:.2%} exceeds {args.max_error_rate:.2%}")
+        return 1
+    print("✅ Load test complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,205 +1,228 @@
+import argparse
+import glob
+import json
+import os
+import sys
+
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 from matplotlib.patches import Rectangle
 import pandas as pd
 
+from validate_project import load_project
+
+# Inventory charts are counted from domain.yml and the training data, performance
+# charts are drawn from the measurements written by benchmark.py
+parser = argparse.ArgumentParser(description="Render the healthcare chatbot analysis graphs")
+parser.add_argument("--results", default="results/benchmark.json",
+                    help="Benchmark results file produced by benchmark.py")
+parser.add_argument("--data", default="data",
+                    help="Training data directory counted for the inventory figure")
+args = parser.parse_args()
+
 # Set style for professional appearance
 plt.style.use('default')
 sns.set_style("whitegrid")
 sns.set_palette("husl")
 
-# Create Figure 1: Chatbot Capability Comparison (Before vs After)
-fig1, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
-fig1.suptitle('Healthcare Chatbot Enhancement Analysis', fontsize=20, fontweight='bold', y=0.95)
-
-# Graph 1: Training Data Expansion
-categories = ['Intents', 'Training Examples', 'Dialogue Stories', 'Custom Actions', 'Response Variations']
-before = [5, 42, 5, 3, 10]
-after = [15, 420, 20, 9, 35]
-
-x = np.arange(len(categories))
-width = 0.35
-
-bars1 = ax1.bar(x - width/2, before, width, label='Before Extension', color='#ff7f7f', alpha=0.8)
-bars2 = ax1.bar(x + width/2, after, width, label='After Extension', color='#2ecc71', alpha=0.8)
-
-ax1.set_xlabel('Component Categories', fontweight='bold')
+# Create Figure 1: Training Data Inventory (counted from domain.yml and the data directory)
+data_files = sorted(glob.glob(os.path.join(args.data, "**", "*.yml"), recursive=True))
+project = load_project(["domain.yml"], data_files)
+if project.domain is None:
+    print("❌ domain.yml not found - run this script from the project root")
+    sys.exit(1)
+
+story_counts = {path: project.files[path].get("stories_count", 0) for path in data_files}
+rule_counts = {path: project.files[path].get("rules_count", 0) for path in data_files}
+custom_actions = sorted(action for action in project.actions if not action.startswith('utter_'))
+inventory = {
+    'Intents': len(project.intents),
+    'Training Examples': sum(project.nlu_intent_counts.values()),
+    'Stories': sum(story_counts.values()),
+    'Rules': sum(rule_counts.values()),
+    'Custom Actions': len(custom_actions),
+    'Responses': len(project.responses),
+}
+
+fig1, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(20, 7))
+fig1.suptitle('Healthcare Chatbot Training Data Inventory', fontsize=20, fontweight='bold')
+
+# Graph 1: Project inventory
+bars = ax1.bar(list(inventory), list(inventory.values()), color='#2ecc71', alpha=0.8)
+ax1.set_xlabel('Component', fontweight='bold')
 ax1.set_ylabel('Count', fontweight='bold')
-ax1.set_title('Training Data & Components Expansion', fontweight='bold', fontsize=14)
-ax1.set_xticks(x)
-ax1.set_xticklabels(categories, rotation=45, ha='right')
-ax1.legend()
+ax1.set_title('Domain & Training Data Components', fontweight='bold', fontsize=14)
+ax1.set_xticks(range(len(inventory)))
+ax1.set_xticklabels(list(inventory), rotation=45, ha='right')
 ax1.grid(True, alpha=0.3)
 
 # Add value labels on bars
-for bar in bars1:
+for bar in bars:
     height = bar.get_height()
-    ax1.text(bar.get_x() + bar.get_width()/2., height + 1,
+    ax1.text(bar.get_x() + bar.get_width()/2., height,
              f'{int(height)}', ha='center', va='bottom', fontweight='bold')
 
-for bar in bars2:
-    height = bar.get_height()
-    ax1.text(bar.get_x() + bar.get_width()/2., height + 5,
-             f'{int(height)}', ha='center', va='bottom', fontweight='bold', color='green')
-
-# Graph 2: Intent Distribution Pie Chart
-intent_categories = ['Symptom Reporting', 'Appointment Management', 'Emergency Handling', 
-                    'Information Requests', 'Conversation Management', 'Feedback & Support']
-intent_counts = [50, 90, 60, 45, 105, 70]  # Training examples per category
-colors = ['#ff9999', '#66b3ff', '#ff6666', '#ffcc99', '#c2c2f0', '#ffb3e6']
-
-wedges, texts, autotexts = ax2.pie(intent_counts, labels=intent_categories, autopct='%1.1f%%', 
-                                  colors=colors, startangle=90, textprops={'fontsize': 10})
-ax2.set_title('Training Examples Distribution by Intent Category', fontweight='bold', fontsize=14)
-
-# Graph 3: Feature Capabilities Radar Chart
-features = ['NLU Accuracy', 'Dialogue Flow', 'Emergency Detection', 'Appointment Mgmt', 
-           'Health Advice', 'User Experience', 'Error Handling', 'Context Awareness']
-before_scores = [6, 4, 5, 4, 3, 5, 4, 3]
-after_scores = [9, 9, 10, 9, 8, 9, 8, 9]
-
-angles = np.linspace(0, 2 * np.pi, len(features), endpoint=False).tolist()
-angles += angles[:1]  # Complete the circle
-
-before_scores += before_scores[:1]
-after_scores += after_scores[:1]
-
-ax3 = plt.subplot(2, 2, 3, projection='polar')
-ax3.plot(angles, before_scores, 'o-', linewidth=2, label='Before Extension', color='#ff7f7f')
-ax3.fill(angles, before_scores, alpha=0.25, color='#ff7f7f')
-ax3.plot(angles, after_scores, 'o-', linewidth=2, label='After Extension', color='#2ecc71')
-ax3.fill(angles, after_scores, alpha=0.25, color='#2ecc71')
-
-ax3.set_xticks(angles[:-1])
-ax3.set_xticklabels(features, fontsize=10)
-ax3.set_ylim(0, 10)
-ax3.set_title('Capability Assessment (1-10 Scale)', fontweight='bold', fontsize=14, pad=20)
-ax3.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
-ax3.grid(True)
-
-# Graph 4: MSc Assignment Criteria Achievement
-criteria = ['Innovation\n(25%)', 'Technical\nImplementation\n(20%)', 'Testing\nRobustness\n(15%)', 
-           'UI Design\n(15%)', 'Code Quality\n(25%)']
-target_scores = [25, 20, 15, 15, 25]
-achieved_scores = [24, 19, 14, 14, 24]  # Near-perfect scores
-
-x = np.arange(len(criteria))
-bars1 = ax4.bar(x - 0.2, target_scores, 0.4, label='Target Score', color='lightblue', alpha=0.7)
-bars2 = ax4.bar(x + 0.2, achieved_scores, 0.4, label='Achieved Score', color='darkgreen', alpha=0.8)
-
-ax4.set_xlabel('Assessment Criteria', fontweight='bold')
-ax4.set_ylabel('Score (%)', fontweight='bold')
-ax4.set_title('MSc Assignment Criteria Achievement', fontweight='bold', fontsize=14)
-ax4.set_xticks(x)
-ax4.set_xticklabels(criteria)
-ax4.legend()
-ax4.grid(True, alpha=0.3)
-
-# Add percentage labels
-for i, (target, achieved) in enumerate(zip(target_scores, achieved_scores)):
-    ax4.text(i - 0.2, target + 0.5, f'{target}%', ha='center', va='bottom', fontweight='bold')
-    ax4.text(i + 0.2, achieved + 0.5, f'{achieved}%', ha='center', va='bottom', fontweight='bold', color='darkgreen')
+# Graph 2: Training examples per intent
+if project.nlu_intent_counts:
+    intents = sorted(project.nlu_intent_counts, key=project.nlu_intent_counts.get)
+    counts = [project.nlu_intent_counts[intent] for intent in intents]
+    ax2.barh(intents, counts, color='#66b3ff', alpha=0.8)
+    ax2.set_xlabel('Training Examples', fontweight='bold')
+    ax2.set_ylabel('Intent', fontweight='bold')
+    for i, count in enumerate(counts):
+        ax2.text(count + 0.5, i, f'{count}', va='center', fontweight='bold')
+    ax2.grid(True, alpha=0.3, axis='x')
+else:
+    ax2.text(0.5, 0.5, f'No NLU examples in {args.data}', ha='center', va='center',
+             fontsize=12, color='gray', transform=ax2.transAxes)
+ax2.set_title('Training Examples per Intent', fontweight='bold', fontsize=14)
+
+# Graph 3: Stories and rules per data file
+dialogue_files = [path for path in data_files if story_counts[path] or rule_counts[path]]
+x = np.arange(len(dialogue_files))
+ax3.bar(x - 0.2, [story_counts[path] for path in dialogue_files], 0.4,
+        label='Stories', color='#3498db', alpha=0.8)
+ax3.bar(x + 0.2, [rule_counts[path] for path in dialogue_files], 0.4,
+        label='Rules', color='#f39c12', alpha=0.8)
+ax3.set_xlabel('Data File', fontweight='bold')
+ax3.set_ylabel('Count', fontweight='bold')
+ax3.set_title('Dialogue Training Data per File', fontweight='bold', fontsize=14)
+ax3.set_xticks(x)
+ax3.set_xticklabels([os.path.relpath(path, args.data) for path in dialogue_files],
+                    rotation=45, ha='right')
+ax3.legend()
+ax3.grid(True, alpha=0.3)
 
 plt.tight_layout()
 plt.savefig('healthcare_chatbot_analysis.png', dpi=300, bbox_inches='tight')
 plt.show()
 
-# Create Figure 2: Conversation Flow and Performance Metrics
+# Create Figure 2: Measured Performance (from benchmark.py results)
+if not os.path.exists(args.results):
+    print(f"❌ {args.results} not found - run 'python benchmark.py' first to measure performance")
+    sys.exit(1)
+
+with open(args.results, "r", encoding="utf-8") as f:
+    results = json.load(f)
+
+model_name = (results.get("model") or {}).get("name", "no model")
 fig2, ((ax5, ax6), (ax7, ax8)) = plt.subplots(2, 2, figsize=(16, 12))
-fig2.suptitle('Healthcare Chatbot Performance & Flow Analysis', fontsize=20, fontweight='bold', y=0.95)
-
-# Graph 5: Conversation Flow Complexity
-flow_types = ['Simple\nGreeting', 'Symptom\nReporting', 'Appointment\nBooking', 'Emergency\nHandling', 
-              'Multi-turn\nConsultation', 'Human\nHandover']
-complexity_scores = [2, 6, 5, 9, 8, 7]
-user_satisfaction = [8.5, 9.2, 9.0, 9.8, 9.1, 8.8]
-
-# Create scatter plot with bubble sizes
-bubble_sizes = [score * 50 for score in complexity_scores]
-scatter = ax5.scatter(complexity_scores, user_satisfaction, s=bubble_sizes, alpha=0.6, 
-                     c=range(len(flow_types)), cmap='viridis')
-
-ax5.set_xlabel('Conversation Complexity (1-10)', fontweight='bold')
-ax5.set_ylabel('User Satisfaction Score (1-10)', fontweight='bold')
-ax5.set_title('Conversation Complexity vs User Satisfaction', fontweight='bold', fontsize=14)
-
-# Add labels for each bubble
-for i, txt in enumerate(flow_types):
-    ax5.annotate(txt, (complexity_scores[i], user_satisfaction[i]), 
-                xytext=(5, 5), textcoords='offset points', fontsize=9, fontweight='bold')
-
-ax5.grid(True, alpha=0.3)
-ax5.set_xlim(0, 10)
-ax5.set_ylim(8, 10)
-
-# Graph 6: Response Time Performance
-response_categories = ['Simple Queries', 'Symptom Analysis', 'Appointment Booking', 
-                      'Emergency Detection', 'Health Advice', 'Human Handover']
-avg_response_time = [0.3, 0.8, 1.2, 0.5, 1.0, 2.1]  # seconds
-target_time = [0.5, 1.0, 1.5, 0.5, 1.5, 2.5]
-
-x = np.arange(len(response_categories))
-bars1 = ax6.bar(x - 0.2, target_time, 0.4, label='Target Time', color='lightcoral', alpha=0.7)
-bars2 = ax6.bar(x + 0.2, avg_response_time, 0.4, label='Actual Time', color='mediumseagreen', alpha=0.8)
-
-ax6.set_xlabel('Query Categories', fontweight='bold')
-ax6.set_ylabel('Response Time (seconds)', fontweight='bold')
-ax6.set_title('Response Time Performance Analysis', fontweight='bold', fontsize=14)
-ax6.set_xticks(x)
-ax6.set_xticklabels(response_categories, rotation=45, ha='right')
-ax6.legend()
-ax6.grid(True, alpha=0.3)
+fig2.suptitle(f'Healthcare Chatbot Measured Performance\n{model_name} - {results["created_at"]}',
+              fontsize=18, fontweight='bold', y=0.98)
+
+
+def mark_not_measured(ax, title):
+    """Placeholder for a benchmark section that was skipped"""
+    ax.set_title(title, fontweight='bold', fontsize=14)
+    ax.text(0.5, 0.5, 'Not measured in this run', ha='center', va='center',
+            fontsize=12, color='gray', transform=ax.transAxes)
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+
+actions = results.get("actions")
+nlu = results.get("nlu")
+stories = results.get("stories")
+
+# Graph 5: Action Throughput vs Concurrency
+if actions:
+    levels = [level["concurrency"] for level in actions["levels"]]
+    throughput = [level["throughput"] for level in actions["levels"]]
+    ax5.plot(levels, throughput, 'o-', linewidth=2, color='#3498db')
+    ax5.set_xscale('log', base=2)
+    ax5.set_xticks(levels)
+    ax5.set_xticklabels([str(level) for level in levels])
+    ax5.set_xlabel('Concurrent Conversations', fontweight='bold')
+    ax5.set_ylabel('Actions per Second', fontweight='bold')
+    ax5.set_title('Custom Action Throughput vs Concurrency', fontweight='bold', fontsize=14)
+    for level, value in zip(levels, throughput):
+        ax5.annotate(f'{value:,.0f}', (level, value), xytext=(5, 5),
+                     textcoords='offset points', fontsize=9, fontweight='bold')
+    ax5.grid(True, alpha=0.3)
+else:
+    mark_not_measured(ax5, 'Custom Action Throughput vs Concurrency')
+
+# Graph 6: Action Latency Percentiles at the highest concurrency level
+if actions:
+    level = actions["levels"][-1]
+    action_names = list(level["actions"])
+    x = np.arange(len(action_names))
+    for offset, key, color in ((-0.27, 'p50', 'mediumseagreen'), (0, 'p95', 'orange'),
+                               (0.27, 'p99', 'lightcoral')):
+        ax6.bar(x + offset, [level["actions"][name][key] for name in action_names], 0.27,
+                label=key, color=color, alpha=0.8)
+    ax6.set_xlabel('Custom Action', fontweight='bold')
+    ax6.set_ylabel('Latency (ms)', fontweight='bold')
+    ax6.set_title(f'Action Latency at Concurrency {level["concurrency"]}',
+                  fontweight='bold', fontsize=14)
+    ax6.set_xticks(x)
+    ax6.set_xticklabels([name.replace('action_', '') for name in action_names],
+                        rotation=45, ha='right')
+    ax6.legend()
+    ax6.grid(True, alpha=0.3)
+else:
+    mark_not_measured(ax6, 'Action Latency Percentiles')
 
 # Graph 7: Intent Recognition Accuracy
-intents = ['greet', 'report_symptom', 'book_appointment', 'emergency_help', 'ask_health_advice', 
-          'ask_clinic_hours', 'modify_appointment', 'cancel_appointment']
-accuracy_scores = [98.5, 94.2, 96.8, 99.1, 91.5, 95.3, 93.7, 94.9]
-
-bars = ax7.barh(intents, accuracy_scores, color=['#2ecc71' if score >= 95 else '#f39c12' if score >= 90 else '#e74c3c' for score in accuracy_scores])
-ax7.set_xlabel('Accuracy (%)', fontweight='bold')
-ax7.set_ylabel('Intent Categories', fontweight='bold')
-ax7.set_title('NLU Intent Recognition Accuracy', fontweight='bold', fontsize=14)
-ax7.set_xlim(85, 100)
-
-# Add accuracy labels
-for i, (intent, score) in enumerate(zip(intents, accuracy_scores)):
-    ax7.text(score + 0.2, i, f'{score}%', va='center', fontweight='bold')
-
-ax7.grid(True, alpha=0.3, axis='x')
-
-# Graph 8: User Journey Success Rate
-journey_stages = ['Initial Contact', 'Symptom Collection', 'Triage Assessment', 'Recommendation', 
-                 'Action Taken', 'Satisfaction']
-success_rates = [99.2, 95.8, 92.3, 94.1, 89.7, 91.5]
-
-# Create a funnel-like visualization
-colors = plt.cm.RdYlGn(np.linspace(0.3, 0.9, len(journey_stages)))
-bars = ax8.bar(journey_stages, success_rates, color=colors, alpha=0.8)
-
-ax8.set_xlabel('User Journey Stages', fontweight='bold')
-ax8.set_ylabel('Success Rate (%)', fontweight='bold')
-ax8.set_title('User Journey Success Funnel', fontweight='bold', fontsize=14)
-ax8.set_xticklabels(journey_stages, rotation=45, ha='right')
-ax8.set_ylim(80, 100)
-
-# Add percentage labels on bars
-for bar, rate in zip(bars, success_rates):
-    height = bar.get_height()
-    ax8.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-             f'{rate}%', ha='center', va='bottom', fontweight='bold')
-
-ax8.grid(True, alpha=0.3)
+if nlu:
+    intents = list(nlu["intents"])
+    accuracy_scores = [round(nlu["intents"][intent]["accuracy"] * 100, 1) for intent in intents]
+
+    bars = ax7.barh(intents, accuracy_scores, color=['#2ecc71' if score >= 95 else '#f39c12' if score >= 90 else '#e74c3c' for score in accuracy_scores])
+    ax7.set_xlabel('Accuracy (%)', fontweight='bold')
+    ax7.set_ylabel('Intent Categories', fontweight='bold')
+    ax7.set_title(f'NLU Intent Recognition Accuracy (overall {nlu["accuracy"]:.1%})',
+                  fontweight='bold', fontsize=14)
+    ax7.set_xlim(0, 105)
+
+    # Add accuracy labels
+    for i, (intent, score) in enumerate(zip(intents, accuracy_scores)):
+        ax7.text(score + 0.5, i, f'{score}%', va='center', fontweight='bold')
+
+    ax7.grid(True, alpha=0.3, axis='x')
+else:
+    mark_not_measured(ax7, 'NLU Intent Recognition Accuracy')
+
+# Graph 8: Measured Success Funnel
+stages = []
+if nlu:
+    stages += [('Intent\nAccuracy', nlu["accuracy"]), ('Entity\nF1', nlu["entities"]["f1"])]
+if stories:
+    if stories.get("action_accuracy") is not None:
+        stages.append(('Dialogue Action\nAccuracy', stories["action_accuracy"]))
+    stages.append(('Conversation\nSuccess', stories["success_rate"]))
+
+if stages:
+    journey_stages = [name for name, _ in stages]
+    success_rates = [round(rate * 100, 1) for _, rate in stages]
+
+    colors = plt.cm.RdYlGn(np.linspace(0.3, 0.9, len(journey_stages)))
+    bars = ax8.bar(journey_stages, success_rates, color=colors, alpha=0.8)
+
+    ax8.set_xlabel('Evaluation Stage', fontweight='bold')
+    ax8.set_ylabel('Success Rate (%)', fontweight='bold')
+    ax8.set_title('Measured Success Funnel', fontweight='bold', fontsize=14)
+    ax8.set_ylim(0, 105)
+
+    # Add percentage labels on bars
+    for bar, rate in zip(bars, success_rates):
+        height = bar.get_height()
+        ax8.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                 f'{rate}%', ha='center', va='bottom', fontweight='bold')
+
+    ax8.grid(True, alpha=0.3)
+else:
+    mark_not_measured(ax8, 'Measured Success Funnel')
 
 plt.tight_layout()
 plt.savefig('healthcare_chatbot_performance.png', dpi=300, bbox_inches='tight')
 plt.show()
 
 print("✅ Both graphs have been created successfully!")
-print("📊 Graph 1: healthcare_chatbot_analysis.png - Capability comparison and MSc criteria")
-print("📈 Graph 2: healthcare_chatbot_performance.png - Performance metrics and user journey")
-print("\n🎯 These graphs demonstrate:")
-print("• Massive 10x improvement in all metrics")
-print("• Near-perfect MSc assignment criteria achievement")
-print("• High user satisfaction and system performance")
-print("• Professional healthcare AI capabilities")
+print("📊 Graph 1: healthcare_chatbot_analysis.png - Training data inventory from domain.yml "
+      f"and {args.data}/")
+print(f"📈 Graph 2: healthcare_chatbot_performance.png - Measured performance from {args.results}")
+print("\n🎯 Counted in this project:")
+for name, count in inventory.items():
+    print(f"• {name}: {count}")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Parallel NLU Cross-Validation
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - NLU Evaluation (>90% Accuracy Target)
+
+Replacement for ``rasa test nlu --cross-validation``, which trains and
+evaluates folds one after another. The training examples are split into
+stratified folds (every intent is spread evenly across folds) and each fold
+is trained and evaluated by ``rasa train nlu`` / ``rasa test nlu`` in its own
+worker process, several at a time.
+
+Each worker gets a fixed share of the CPU through the TensorFlow and BLAS
+thread-count variables, so concurrent folds do not oversubscribe the
+machine, and its own training cache so folds never contend for cache.db.
+Per-fold metrics are written to ``<out>/fold_<n>.json`` as soon as the fold
+finishes and merged into ``<out>/report.json`` at the end.
+
+Usage:
+    python cross_validate.py --folds 5
+    python cross_validate.py --folds 5 --workers 5 --threads-per-worker 6
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+import yaml
+
+# Cross-validate the pipeline make train deploys
+from incremental_train import DEFAULT_CONFIG
+
+DEFAULT_NLU_DATA = "data/nlu.yml"
+DEFAULT_OUT = "results/cross_validation"
+
+# Read by Rasa (TF_*), TensorFlow and the BLAS libraries behind numpy/sklearn
+THREAD_ENV_VARS = (
+    "TF_INTRA_OP_PARALLELISM_THREADS", "OMP_NUM_THREADS", "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS",
+)
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60)
+    print(f"🧪 {title}")
+    print("=" * 60)
+
+
+def load_training_data(path: Text) -> Tuple[Text, Dict[Text, List[Text]], List[Dict[Text, Any]]]:
+    """(version, {intent: [annotated example]}, non-intent blocks such as synonyms)"""
+    with open(path, "r", encoding="utf-8") as f:
+        document = yaml.safe_load(f) or {}
+
+    examples: Dict[Text, List[Text]] = {}
+    other_blocks = []
+    for block in document.get("nlu") or []:
+        if "intent" not in block:
+            other_blocks.append(block)
+            continue
+        for line in (block.get("examples") or "").splitlines():
+            line = line.strip()
+            if line.startswith("- "):
+                examples.setdefault(block["intent"], []).append(line[2:].strip())
+    return str(document.get("version", "3.1")), examples, other_blocks
+
+
+def stratified_folds(examples: Dict[Text, List[Text]], folds: int,
+                     seed: int) -> List[Dict[Text, List[Text]]]:
+    """Deal every intent's shuffled examples round-robin into folds"""
+    rng = random.Random(seed)
+    result: List[Dict[Text, List[Text]]] = [{} for _ in range(folds)]
+    offset = 0
+    for intent in sorted(examples):
+        shuffled = list(examples[intent])
+        rng.shuffle(shuffled)
+        for index, example in enumerate(shuffled):
+            result[(index + offset) % folds].setdefault(intent, []).append(example)
+        # Rotate the starting fold so small intents don't all land in fold 0
+        offset += len(shuffled)
+    return result
+
+
+class _LiteralText(str):
+    pass
+
+
+yaml.SafeDumper.add_representer(
+    _LiteralText, lambda dumper, data: dumper.represent_scalar("tag:yaml.org,2002:str", data, style="|")
+)
+
+
+def write_training_file(path: Text, version: Text, examples: Dict[Text, List[Text]],
+                        other_blocks: List[Dict[Text, Any]]) -> None:
+    blocks: List[Dict[Text, Any]] = [
+        {"intent": intent, "examples": _LiteralText("".join(f"- {e}\n" for e in lines))}
+        for intent, lines in sorted(examples.items())
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump({"version": version, "nlu": blocks + other_blocks}, f,
+                       sort_keys=False, allow_unicode=True)
+
+
+def read_report(path: Text) -> Optional[Dict[Text, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_fold(fold: int, train_path: Text, test_path: Text, config: Text,
+             work_dir: Text, threads: int) -> Dict[Text, Any]:
+    """Train and evaluate one fold in this worker process"""
+    env = dict(os.environ)
+    for name in THREAD_ENV_VARS:
+        env[name] = str(threads)
+    env["TF_INTER_OP_PARALLELISM_THREADS"] = "1"
+    env["RASA_CACHE_DIRECTORY"] = os.path.join(work_dir, "cache")
+
+    model_dir = os.path.join(work_dir, "models")
+    results_dir = os.path.join(work_dir, "results")
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "rasa", "train", "nlu", "--config", config,
+         "--nlu", train_path, "--out", model_dir, "--fixed-model-name", f"fold_{fold}"],
+        check=True, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    trained = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "rasa", "test", "nlu", "--model",
+         os.path.join(model_dir, f"fold_{fold}.tar.gz"), "--nlu", test_path,
+         "--out", results_dir, "--no-plot"],
+        check=True, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    finished = time.perf_counter()
+
+    intent_report = read_report(os.path.join(results_dir, "intent_report.json")) or {}
+    entity_report = read_report(os.path.join(results_dir, "DIETClassifier_report.json"))
+    return {
+        "fold": fold,
+        "train_seconds": round(trained - start, 2),
+        "test_seconds": round(finished - trained, 2),
+        # sklearn reports "micro avg" instead of "accuracy" when a fold lacks some labels
+        "intent_accuracy": intent_report.get("accuracy",
+                                             (intent_report.get("micro avg") or {}).get("f1-score")),
+        "intent_weighted_f1": (intent_report.get("weighted avg") or {}).get("f1-score"),
+        "entity_weighted_f1": ((entity_report or {}).get("weighted avg") or {}).get("f1-score"),
+        "intents": {
+            name: {key: scores.get(key) for key in ("precision", "recall", "f1-score", "support")}
+            for name, scores in intent_report.items()
+            if isinstance(scores, dict) and name not in ("macro avg", "weighted avg", "micro avg")
+        },
+    }
+
+
+def summarize(values: List[Optional[float]]) -> Optional[Dict[Text, float]]:
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {
+        "mean": round(statistics.mean(values), 4),
+        "std": round(statistics.pstdev(values), 4),
+        "min": round(min(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def merge_folds(fold_results: List[Dict[Text, Any]]) -> Dict[Text, Any]:
+    """Mean and spread of every metric across folds"""
+    intents: Dict[Text, Dict[Text, List[float]]] = {}
+    for result in fold_results:
+        for name, scores in result["intents"].items():
+            merged = intents.setdefault(name, {"f1-score": [], "precision": [], "recall": []})
+            for key in merged:
+                if scores.get(key) is not None:
+                    merged[key].append(scores[key])
+    return {
+        "folds": len(fold_results),
+        "intent_accuracy": summarize([r["intent_accuracy"] for r in fold_results]),
+        "intent_weighted_f1": summarize([r["intent_weighted_f1"] for r in fold_results]),
+        "entity_weighted_f1": summarize([r["entity_weighted_f1"] for r in fold_results]),
+        "intents": {
+            name: {key: round(statistics.mean(values), 4) for key, values in scores.items() if values}
+            for name, scores in sorted(intents.items())
+        },
+        "fold_results": sorted(fold_results, key=lambda r: r["fold"]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cross-validate the NLU model in parallel")
+    parser.add_argument("--nlu", default=DEFAULT_NLU_DATA)
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, help="Folds trained at once (default: --folds)")
+    parser.add_argument("--threads-per-worker", type=int,
+                        help="CPU threads per fold (default: cores / workers)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--keep-models", action="store_true",
+                        help="Keep each fold's model and Rasa reports under --out")
+    args = parser.parse_args()
+
+    workers = max(1, min(args.workers or args.folds, args.folds))
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+
+    version, examples, other_blocks = load_training_data(args.nlu)
+    folds = stratified_folds(examples, args.folds, args.seed)
+    total = sum(len(lines) for lines in examples.values())
+
+    print("🏥 Healthcare Chatbot NLU Cross-Validation")
+    print(f"Examples: {total} | Intents: {len(examples)} | Folds: {args.folds} | "
+          f"Workers: {workers} x {threads} threads")
+
+    os.makedirs(args.out, exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix="cross_validation_")
+    jobs = []
+    for fold in range(args.folds):
+        fold_dir = os.path.join(scratch, f"fold_{fold}")
+        os.makedirs(fold_dir)
+        train = {}
+        for other, fold_examples in enumerate(folds):
+            if other != fold:
+                for intent, lines in fold_examples.items():
+                    train.setdefault(intent, []).extend(lines)
+        train_path = os.path.join(fold_dir, "train.yml")
+        test_path = os.path.join(fold_dir, "test.yml")
+        write_training_file(train_path, version, train, other_blocks)
+        write_training_file(test_path, version, folds[fold], [])
+        jobs.append((fold, train_path, test_path, os.path.abspath(args.config), fold_dir, threads))
+
+    print_header("FOLDS")
+    start = time.perf_counter()
+    fold_results: List[Dict[Text, Any]] = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_fold, *job): job[0] for job in jobs}
+        for future in as_completed(futures):
+            fold = futures[future]
+            try:
+                result = future.result()
+            except subprocess.CalledProcessError as e:
+                failed += 1
+                print(f"❌ Fold {fold} failed: {(e.stderr or '').strip().splitlines()[-1:]}")
+                continue
+            fold_results.append(result)
+            # Stream each fold's metrics to disk as soon as it finishes
+            with open(os.path.join(args.out, f"fold_{fold}.json"), "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+            accuracy = result["intent_accuracy"]
+            accuracy_text = f"{accuracy:.1%}" if accuracy is not None else "n/a"
+            print(f"✅ Fold {fold}: intent accuracy {accuracy_text} "
+                  f"({result['train_seconds']:.0f}s train)")
+    elapsed = time.perf_counter() - start
+
+    if args.keep_models:
+        shutil.copytree(scratch, os.path.join(args.out, "folds"), dirs_exist_ok=True)
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    if not fold_results:
+        print("❌ No fold completed")
+        return 1
+
+    report = merge_folds(fold_results)
+    report["seconds"] = round(elapsed, 1)
+    report["workers"] = workers
+    report["threads_per_worker"] = threads
+    with open(os.path.join(args.out, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_header("CROSS-VALIDATION REPORT")
+    for label, key in (("Intent accuracy", "intent_accuracy"),
+                       ("Intent weighted F1", "intent_weighted_f1"),
+                       ("Entity weighted F1", "entity_weighted_f1")):
+        summary = report[key]
+        if summary:
+            print(f"{label}: {summary['mean']:.1%} ± {summary['std']:.1%}")
+    print(f"Wall time: {elapsed:.1f}s for {len(fold_results)} folds")
+    print(f"📊 Report written to {os.path.join(args.out, 'report.json')}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
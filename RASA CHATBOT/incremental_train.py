@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Incremental Training Driver
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Change-Aware Model Training
+
+Retrains only what the latest data edit affects:
+
+1. Every training input (config, domain and each file under data/) is
+   fingerprinted with SHA-256 and compared with the fingerprints recorded in
+   the training cache's ``cache.db`` (table ``training_input``) after the last
+   successful run.
+2. If nothing changed and the last model still exists, training is skipped.
+3. Otherwise ``rasa train`` runs against the same persistent cache, so Rasa's
+   graph fingerprinting restores every component whose inputs are unchanged
+   (e.g. the tokenizer, featurizers and DIETClassifier when only stories
+   changed) and trains just the rest.
+4. With ``--warm-start`` and an unchanged config and domain, the previous
+   model is fine-tuned (``rasa train --finetune``) for a fraction of the
+   configured epochs instead of training DIET/TED/ResponseSelector from
+   scratch.
+
+A report lists the changed files and which components were restored from
+the cache or retrained.
+
+Usage:
+    python incremental_train.py                 # train if inputs changed
+    python incremental_train.py --plan          # show what changed, don't train
+    python incremental_train.py --warm-start --epoch-fraction 0.2
+    python incremental_train.py --force
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Text, Tuple
+
+import yaml
+
+from cache_manager import CACHE_DB, CACHE_DIR_ENV, default_cache_dir
+
+MANIFEST_TABLE = "training_input"
+
+# The deployed pipeline (DIET, TED, ResponseSelector, NLUCacheRecorder);
+# config.yml only holds an assistant_id, so Rasa would fill in its defaults
+DEFAULT_CONFIG = "config_simple.yml"
+
+# Lines written by rasa.engine.training.hooks for every graph component
+TRAINED_COMPONENT = re.compile(r"Starting to train component '([^']+)'")
+RESTORED_COMPONENT = re.compile(r"Restored component '([^']+)' from cache")
+SAVED_MODEL = re.compile(r"model is trained and saved at '([^']+)'")
+
+# Categories whose change rules out fine-tuning the previous model
+STRUCTURAL_CATEGORIES = ("config", "domain")
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60)
+    print(f"🤖 {title}")
+    print("=" * 60)
+
+
+def file_sha256(path: Text) -> Text:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def categorize(path: Text, config: Text, domain: Text) -> Text:
+    """config, domain, nlu, core or other, by role or by top-level YAML keys"""
+    if os.path.abspath(path) == os.path.abspath(config):
+        return "config"
+    if os.path.abspath(path) == os.path.abspath(domain):
+        return "domain"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            keys = set((yaml.safe_load(f) or {}).keys())
+    except (yaml.YAMLError, AttributeError):
+        return "other"
+    if keys & {"stories", "rules"}:
+        return "core"
+    if "nlu" in keys:
+        return "nlu"
+    return "other"
+
+
+def training_inputs(config: Text, domain: Text, data: Text) -> Dict[Text, Tuple[Text, Text]]:
+    """{path: (category, sha256)} for every file rasa train reads"""
+    paths = [config, domain]
+    if os.path.isdir(data):
+        paths += sorted(glob.glob(os.path.join(data, "**", "*.yml"), recursive=True))
+        paths += sorted(glob.glob(os.path.join(data, "**", "*.yaml"), recursive=True))
+    else:
+        paths.append(data)
+    return {os.path.normpath(path): (categorize(path, config, domain), file_sha256(path))
+            for path in paths if os.path.isfile(path)}
+
+
+class TrainingManifest:
+    """Fingerprints of the inputs of the last successful training run"""
+
+    def __init__(self, cache_dir: Text) -> None:
+        os.makedirs(cache_dir, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(cache_dir, CACHE_DB), timeout=30)
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} ("
+            "path VARCHAR PRIMARY KEY, category VARCHAR NOT NULL, "
+            "sha256 VARCHAR NOT NULL, model VARCHAR, trained_at DATETIME NOT NULL)"
+        )
+        self.connection.commit()
+
+    def load(self) -> Tuple[Dict[Text, Tuple[Text, Text]], Optional[Text]]:
+        rows = self.connection.execute(
+            f"SELECT path, category, sha256, model FROM {MANIFEST_TABLE}"
+        ).fetchall()
+        model = rows[0][3] if rows else None
+        return {path: (category, sha256) for path, category, sha256, _ in rows}, model
+
+    def save(self, inputs: Dict[Text, Tuple[Text, Text]], model: Optional[Text]) -> None:
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {MANIFEST_TABLE}")
+            self.connection.executemany(
+                f"INSERT INTO {MANIFEST_TABLE} VALUES (?, ?, ?, ?, datetime('now'))",
+                [(path, category, sha256, model)
+                 for path, (category, sha256) in inputs.items()],
+            )
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def diff_inputs(previous: Dict[Text, Tuple[Text, Text]],
+                current: Dict[Text, Tuple[Text, Text]]) -> Dict[Text, List[Text]]:
+    """Changed, added and removed paths grouped by category"""
+    changes: Dict[Text, List[Text]] = {}
+    for path in sorted(set(previous) | set(current)):
+        if previous.get(path, (None, None))[1] == current.get(path, (None, None))[1]:
+            continue
+        category = (current.get(path) or previous.get(path))[0]
+        status = "added" if path not in previous else "removed" if path not in current else "changed"
+        changes.setdefault(category, []).append(f"{path} ({status})")
+    return changes
+
+
+def run_rasa_train(command: List[Text], cache_dir: Text) -> Tuple[int, List[Text], List[Text], Optional[Text]]:
+    """Run rasa train, echoing its output; returns (code, trained, restored, model)"""
+    env = dict(os.environ, **{CACHE_DIR_ENV: cache_dir})
+    trained: List[Text] = []
+    restored: List[Text] = []
+    model = None
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, env=env, bufsize=1)
+    for line in process.stdout:
+        sys.stdout.write(line)
+        if TRAINED_COMPONENT.search(line):
+            trained.append(TRAINED_COMPONENT.search(line).group(1))
+        elif RESTORED_COMPONENT.search(line):
+            restored.append(RESTORED_COMPONENT.search(line).group(1))
+        elif SAVED_MODEL.search(line):
+            model = SAVED_MODEL.search(line).group(1)
+    return process.wait(), trained, restored, model
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Retrain only what changed")
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    parser.add_argument("--domain", default="domain.yml")
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--out", default="models")
+    parser.add_argument("--cache-dir", default=default_cache_dir(),
+                        help=f"Training cache shared with rasa (default: ${CACHE_DIR_ENV}, .rasa/cache or cache)")
+    parser.add_argument("--warm-start", action="store_true",
+                        help="Fine-tune the previous model when config and domain are unchanged")
+    parser.add_argument("--epoch-fraction", type=float, default=0.2,
+                        help="Share of the configured epochs used when warm-starting")
+    parser.add_argument("--force", action="store_true", help="Retrain every component")
+    parser.add_argument("--plan", action="store_true", help="Report changes without training")
+    args = parser.parse_args()
+
+    print("🏥 Healthcare Chatbot Incremental Training")
+    current = training_inputs(args.config, args.domain, args.data)
+    manifest = TrainingManifest(args.cache_dir)
+    try:
+        previous, previous_model = manifest.load()
+        changes = diff_inputs(previous, current)
+
+        print_header("CHANGED TRAINING INPUTS")
+        if not previous:
+            print("No previous training run recorded - full training required")
+        elif not changes:
+            print("✅ No training inputs changed")
+        for category, paths in changes.items():
+            for path in paths:
+                print(f"  [{category}] {path}")
+
+        model_exists = bool(previous_model) and os.path.exists(previous_model)
+        if previous and not changes and model_exists and not args.force:
+            print(f"\n⏭️  Skipping training - {previous_model} is up to date")
+            return 0
+        if args.plan:
+            return 0
+
+        command = [sys.executable, "-m", "rasa", "train", "--config", args.config,
+                   "--domain", args.domain, "--data", args.data, "--out", args.out]
+        if args.force:
+            command.append("--force")
+        elif (args.warm_start and model_exists
+              and not any(category in changes for category in STRUCTURAL_CATEGORIES)):
+            print(f"\n🔥 Warm-starting from {previous_model} "
+                  f"({args.epoch_fraction:.0%} of configured epochs)")
+            command += ["--finetune", previous_model, "--epoch-fraction", str(args.epoch_fraction)]
+
+        print_header("TRAINING")
+        start = time.perf_counter()
+        code, trained, restored, model = run_rasa_train(command, args.cache_dir)
+        elapsed = time.perf_counter() - start
+        if code != 0:
+            print(f"❌ rasa train failed with exit code {code}")
+            return code
+
+        if model is None:
+            models = glob.glob(os.path.join(args.out, "*.tar.gz"))
+            model = max(models, key=os.path.getmtime) if models else None
+        manifest.save(current, model)
+    finally:
+        manifest.close()
+
+    print_header("TRAINING REPORT")
+    print(f"Model: {model}")
+    print(f"Time: {elapsed:.1f}s")
+    print(f"♻️  Restored from cache ({len(restored)}): {', '.join(restored) or '-'}")
+    print(f"🛠️  Retrained ({len(trained)}): {', '.join(trained) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
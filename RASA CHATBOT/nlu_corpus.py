@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot NLU Corpus Tool
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Training Data Quality
+
+Streams Rasa YAML NLU files example by example, so memory stays flat however
+large the corpus is, and reports what inflates DIET training time:
+
+* Exact duplicates - the same example (case and whitespace normalized) more
+  than once within an intent, or under two different intents (a conflict).
+* Near duplicates across intents - examples whose sets of 4-byte shingles
+  have an estimated Jaccard similarity above ``--threshold``, found with
+  MinHash signatures and locality-sensitive hashing.
+* Class imbalance - intents far below or above the median example count.
+
+Entity annotations (``[text](entity)``, ``[text](entity:value)`` and
+``[text]{"entity": ...}``) are parsed with one compiled expression.
+Per-example state is kept in temporary files on disk (an SQLite index and
+partitioned LSH bucket files), not in Python objects. ``--output`` writes a
+copy of a single input file without the redundant duplicates, leaving every
+other line untouched; with several inputs ``--output-dir`` writes one such
+copy per file, under the same file name, since each file is its own YAML
+document.
+
+Usage:
+    python nlu_corpus.py data/nlu.yml
+    python nlu_corpus.py export/*.yml --threshold 0.85 --report results/corpus.json
+    python nlu_corpus.py data/nlu.yml --output data/nlu_dedup.yml --drop-conflicts
+    python nlu_corpus.py data/nlu.yml export/extra.yml --output-dir results/dedup
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import re
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Text, Tuple
+
+import numpy as np
+
+# [text](entity), [text](entity:value) or [text]{"entity": "...", "role": "..."}
+ENTITY_ANNOTATION = re.compile(
+    r"\[(?P<text>[^\]]+)\]"
+    r"(?:\((?P<entity>[^)\s:]+)(?::(?P<value>[^)]*))?\)|(?P<json>\{[^}]*\}))"
+)
+BLOCK_START = re.compile(r"^(\s*)-\s+(intent|synonym|regex|lookup)\s*:\s*(.*?)\s*(?:#.*)?$")
+NLU_KEY = re.compile(r"^nlu\s*:")
+EXAMPLES_KEY = re.compile(r"^(\s*)examples\s*:\s*[|>][-+]?\s*$")
+WHITESPACE = re.compile(r"\s+")
+
+SHINGLE_SIZE = 4
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Bucket files per band; a power of two, so the low key bits pick the file
+KEY_PARTITIONS = 16
+BATCH_SIZE = 10000
+SIGNATURE_BATCH_SIZE = 2000
+PAIR_BATCH_SIZE = 50000
+# Examples compared per LSH bucket, so templated corpora cannot go quadratic
+MAX_BUCKET_MEMBERS = 64
+
+# Intents below/above these multiples of the median count are flagged
+UNDER_REPRESENTED = 0.25
+OVER_REPRESENTED = 4.0
+
+
+class Entity(NamedTuple):
+    start: int
+    end: int
+    value: Text
+    entity: Text
+
+
+class Example(NamedTuple):
+    intent: Text
+    text: Text
+    entities: List[Entity]
+    line: int
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60)
+    print(f"📚 {title}")
+    print("=" * 60)
+
+
+def parse_annotations(annotated: Text) -> Tuple[Text, List[Entity]]:
+    """Plain text and entity spans of one annotated example"""
+    entities: List[Entity] = []
+    parts: List[Text] = []
+    offset = 0
+    cursor = 0
+    for match in ENTITY_ANNOTATION.finditer(annotated):
+        parts.append(annotated[cursor:match.start()])
+        offset += match.start() - cursor
+        text = match.group("text")
+        name = match.group("entity")
+        value = match.group("value") or text
+        if name is None:
+            try:
+                data = json.loads(match.group("json"))
+            except ValueError:
+                data = {}
+            name = data.get("entity", "")
+            value = data.get("value", text)
+        entities.append(Entity(offset, offset + len(text), value, name))
+        parts.append(text)
+        offset += len(text)
+        cursor = match.end()
+    parts.append(annotated[cursor:])
+    return "".join(parts), entities
+
+
+def iter_lines(path: Text) -> Iterator[Tuple[Text, Optional[Example]]]:
+    """Every line of a Rasa YAML NLU file, paired with the example it holds (if any)
+
+    The ``- intent:`` items may be indented under ``nlu:``; an ``examples:``
+    key belongs to the item it is indented under.
+    """
+    intent: Optional[Text] = None
+    block_indent: Optional[int] = None
+    examples_indent: Optional[int] = None
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for number, line in enumerate(f, 1):
+            stripped = line.strip()
+            indent = len(line) - len(line.lstrip())
+
+            if examples_indent is not None:
+                if not stripped:
+                    yield line, None
+                    continue
+                if indent > examples_indent:
+                    if intent is not None and stripped.startswith("- "):
+                        text, entities = parse_annotations(stripped[2:].strip())
+                        yield line, Example(intent, text, entities, number)
+                    else:
+                        yield line, None
+                    continue
+                examples_indent = None
+
+            block = BLOCK_START.match(line)
+            if block:
+                block_indent = len(block.group(1))
+                intent = block.group(3).strip("\"'") if block.group(2) == "intent" else None
+            else:
+                key = EXAMPLES_KEY.match(line)
+                if key and block_indent is not None and len(key.group(1)) > block_indent:
+                    examples_indent = len(key.group(1))
+                elif stripped and not stripped.startswith("#") and block_indent is not None \
+                        and indent <= block_indent:
+                    # A line at or left of the item ends it
+                    intent = None
+                    block_indent = None
+            yield line, None
+
+
+def iter_examples(paths: List[Text]) -> Iterator[Example]:
+    """Stream the training examples of several NLU files"""
+    for path in paths:
+        for _, example in iter_lines(path):
+            if example is not None:
+                yield example
+
+
+def normalize(text: Text) -> Text:
+    return WHITESPACE.sub(" ", text.lower()).strip().rstrip(".!?")
+
+
+def text_hash(text: Text) -> int:
+    """64-bit signed hash, so it fits an SQLite INTEGER"""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class MinHasher:
+    """MinHash signatures over 4-byte shingles, computed a batch at a time"""
+
+    def __init__(self, permutations: int = NUM_PERMUTATIONS, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: odd a, any b, keep the high 32 bits of a * h + b
+        self.a = rng.integers(0, 1 << 63, size=(permutations, 1), dtype=np.uint64) * 2 + 1
+        self.b = rng.integers(0, 1 << 63, size=(permutations, 1), dtype=np.uint64)
+
+    def signatures(self, texts: List[Text]) -> np.ndarray:
+        """(len(texts), permutations) uint32 signatures"""
+        if len(texts) > SIGNATURE_BATCH_SIZE:
+            return np.concatenate([self.signatures(texts[i:i + SIGNATURE_BATCH_SIZE])
+                                   for i in range(0, len(texts), SIGNATURE_BATCH_SIZE)])
+        encoded = [text.encode("utf-8").ljust(SHINGLE_SIZE) for text in texts]
+        starts = np.cumsum([0] + [len(data) for data in encoded[:-1]])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        # Every window of SHINGLE_SIZE bytes packed into one integer
+        shingles = np.zeros(len(data) - SHINGLE_SIZE + 1, dtype=np.uint64)
+        for offset in range(SHINGLE_SIZE):
+            shingles = (shingles << np.uint64(8)) | data[offset:len(data) - SHINGLE_SIZE + 1 + offset]
+        # uint64 arithmetic wraps silently, which is what multiply-shift wants
+        permuted = ((self.a * shingles + self.b) >> np.uint64(32)).astype(np.uint32)
+        # Windows straddling two texts must not count for either of them
+        straddling = (starts[1:, None] - np.arange(1, SHINGLE_SIZE)).ravel()
+        permuted[:, straddling] = np.iinfo(np.uint32).max
+        return np.minimum.reduceat(permuted, starts, axis=1).T
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """(n, LSH_BANDS) signed 64-bit keys, one per band of rows"""
+    rows = signatures.reshape(len(signatures), LSH_BANDS, -1).astype(np.uint64)
+    keys = np.zeros(rows.shape[:2], dtype=np.uint64)
+    for column in range(rows.shape[2]):
+        # Multiply-xor mixing; uint64 arithmetic wraps silently
+        keys = (keys * np.uint64(0x100000001B3)) ^ rows[:, :, column]
+    return keys.view(np.int64)
+
+
+class CorpusIndex:
+    """On-disk index of every example, so analysis memory does not grow with the corpus.
+
+    Examples live in SQLite; LSH bucket rows are spilled to one binary file per
+    (band, key range) partition and grouped one partition at a time.
+    """
+
+    def __init__(self, directory: Optional[Text] = None) -> None:
+        self.directory = tempfile.mkdtemp(prefix="nlu_corpus_", dir=directory)
+        # Files with an nlu: section in which no intent examples were found
+        self.empty_files: List[Text] = []
+        self.db = sqlite3.connect(os.path.join(self.directory, "index.db"))
+        self.db.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            PRAGMA cache_size = -65536;
+            CREATE TABLE example (id INTEGER PRIMARY KEY, intent INTEGER, norm_hash INTEGER,
+                                  source TEXT, line INTEGER, text TEXT, signature BLOB);
+            CREATE TABLE entity (name TEXT PRIMARY KEY, count INTEGER);
+        """)
+        self.intents: Dict[Text, int] = {}
+        self.intent_names: List[Text] = []
+
+    def intent_id(self, intent: Text) -> int:
+        if intent not in self.intents:
+            self.intents[intent] = len(self.intent_names)
+            self.intent_names.append(intent)
+        return self.intents[intent]
+
+    def load(self, paths: List[Text], near_duplicates: bool) -> int:
+        hasher = MinHasher() if near_duplicates else None
+        examples: List[List[Any]] = []
+        normalized: List[Text] = []
+        entity_counts: Dict[Text, int] = {}
+        count = 0
+
+        def flush() -> None:
+            if hasher is not None and examples:
+                signatures = hasher.signatures(normalized)
+                unique: List[int] = []
+                seen: Set[Tuple[int, int]] = set()
+                for row, example in enumerate(examples):
+                    example[6] = signatures[row].tobytes()
+                    # Copies of one example in one intent would only crowd the buckets
+                    if (example[1], example[2]) not in seen:
+                        seen.add((example[1], example[2]))
+                        unique.append(row)
+                self.spill_bands(band_keys(signatures[unique]),
+                                 np.array([examples[row][1] for row in unique]),
+                                 np.array([examples[row][0] for row in unique]))
+            self.db.executemany("INSERT INTO example VALUES (?, ?, ?, ?, ?, ?, ?)", examples)
+            examples.clear()
+            normalized.clear()
+
+        for path in paths:
+            first = count + 1
+            has_nlu = False
+            for line, example in iter_lines(path):
+                if example is None:
+                    has_nlu = has_nlu or bool(NLU_KEY.match(line))
+                    continue
+                count += 1
+                text = normalize(example.text)
+                normalized.append(text)
+                examples.append([count, self.intent_id(example.intent), text_hash(text), path,
+                                 example.line, example.text[:200], None])
+                for entity in example.entities:
+                    entity_counts[entity.entity] = entity_counts.get(entity.entity, 0) + 1
+                if len(examples) >= BATCH_SIZE:
+                    flush()
+            if has_nlu and count < first:
+                self.empty_files.append(path)
+        flush()
+
+        self.db.executemany("INSERT INTO entity VALUES (?, ?)", entity_counts.items())
+        self.db.execute("CREATE INDEX example_hash ON example (norm_hash, intent)")
+        self.db.commit()
+        return count
+
+    def partition_path(self, partition: int) -> Text:
+        return os.path.join(self.directory, f"band_{partition}.bin")
+
+    def spill_bands(self, keys: np.ndarray, intents: np.ndarray, ids: np.ndarray) -> None:
+        """Append (key, intent, id) rows to the file of their band and key range"""
+        rows = np.empty(keys.shape + (3,), dtype=np.int64)
+        rows[:, :, 0] = keys
+        rows[:, :, 1] = intents[:, None]
+        rows[:, :, 2] = ids[:, None]
+        partitions = (np.arange(LSH_BANDS) * KEY_PARTITIONS + (keys & (KEY_PARTITIONS - 1))).ravel()
+        rows = rows.reshape(-1, 3)
+        order = np.argsort(partitions, kind="stable")
+        bounds = np.searchsorted(partitions[order], np.arange(LSH_BANDS * KEY_PARTITIONS + 1))
+        for partition in range(LSH_BANDS * KEY_PARTITIONS):
+            if bounds[partition] < bounds[partition + 1]:
+                with open(self.partition_path(partition), "ab") as f:
+                    rows[order[bounds[partition]:bounds[partition + 1]]].tofile(f)
+
+    def intent_counts(self) -> Dict[Text, int]:
+        rows = self.db.execute("SELECT intent, COUNT(*) FROM example GROUP BY intent")
+        return {self.intent_names[intent]: count for intent, count in rows}
+
+    def entity_counts(self) -> Dict[Text, int]:
+        return dict(self.db.execute("SELECT name, count FROM entity ORDER BY count DESC"))
+
+    def duplicates_within_intents(self, limit: int) -> Tuple[int, List[Dict[Text, Any]]]:
+        total = self.db.execute(
+            "SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM example "
+            "GROUP BY intent, norm_hash HAVING n > 1)"
+        ).fetchone()[0]
+        rows = self.db.execute(
+            "SELECT intent, MIN(text), COUNT(*) AS n FROM example GROUP BY intent, norm_hash "
+            "HAVING n > 1 ORDER BY n DESC LIMIT ?", (limit,)
+        )
+        return total, [{"intent": self.intent_names[intent], "text": text, "copies": n}
+                       for intent, text, n in rows]
+
+    def conflicts(self, limit: int) -> Tuple[int, List[Dict[Text, Any]]]:
+        """Identical examples labelled with different intents"""
+        total = self.db.execute(
+            "SELECT COUNT(*) FROM (SELECT norm_hash FROM example GROUP BY norm_hash "
+            "HAVING COUNT(DISTINCT intent) > 1)"
+        ).fetchone()[0]
+        rows = self.db.execute(
+            "SELECT MIN(text), GROUP_CONCAT(DISTINCT intent) FROM example GROUP BY norm_hash "
+            "HAVING COUNT(DISTINCT intent) > 1 LIMIT ?", (limit,)
+        )
+        return total, [{"text": text,
+                        "intents": sorted(self.intent_names[int(i)] for i in intents.split(","))}
+                       for text, intents in rows]
+
+    def candidate_pairs(self) -> Iterator[np.ndarray]:
+        """(band, id, id) rows for examples of different intents sharing an LSH bucket"""
+        for partition in range(LSH_BANDS * KEY_PARTITIONS):
+            if not os.path.exists(self.partition_path(partition)):
+                continue
+            band = partition // KEY_PARTITIONS
+            rows = np.fromfile(self.partition_path(partition), dtype=np.int64).reshape(-1, 3)
+            rows = rows[np.argsort(rows[:, 0], kind="stable")]
+            starts = np.flatnonzero(np.r_[True, rows[1:, 0] != rows[:-1, 0]])
+            mixed = (np.minimum.reduceat(rows[:, 1], starts)
+                     != np.maximum.reduceat(rows[:, 1], starts))
+            ends = np.r_[starts[1:], len(rows)]
+            for start, end in zip(starts[mixed], ends[mixed]):
+                members = rows[start:min(end, start + MAX_BUCKET_MEMBERS)]
+                first, second = np.triu_indices(len(members), k=1)
+                different = members[first, 1] != members[second, 1]
+                first, second = first[different], second[different]
+                yield np.column_stack((np.full(len(first), band),
+                                       members[first, 2], members[second, 2]))
+
+    def fetch(self, ids: Iterable[int], columns: Text) -> Dict[int, Tuple[Any, ...]]:
+        found: Dict[int, Tuple[Any, ...]] = {}
+        ids = list(ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self.db.execute(
+                f"SELECT id, {columns} FROM example WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update((row[0], row[1:]) for row in rows)
+        return found
+
+    def compare(self, batch: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Estimated similarity of each candidate pair and whether it counts as a near duplicate"""
+        ids = np.unique(batch[:, 1:])
+        rows = self.fetch(ids.tolist(), "norm_hash, signature")
+        hashes = np.array([rows[i][0] for i in ids.tolist()], dtype=np.int64)
+        signatures = np.frombuffer(b"".join(rows[i][1] for i in ids.tolist()),
+                                   dtype=np.uint32).reshape(len(ids), NUM_PERMUTATIONS)
+        first = np.searchsorted(ids, batch[:, 1])
+        second = np.searchsorted(ids, batch[:, 2])
+
+        equal = signatures[first] == signatures[second]
+        similarity = equal.mean(axis=1)
+        # Count each pair only in the first band where it collides
+        first_band = equal.reshape(len(batch), LSH_BANDS, -1).all(axis=2).argmax(axis=1)
+        keep = ((similarity >= threshold) & (first_band == batch[:, 0])
+                & (hashes[first] != hashes[second]))
+        return similarity, keep
+
+    def near_duplicates(self, threshold: float, limit: int) -> Tuple[int, List[Dict[Text, Any]]]:
+        """Similar examples labelled with different intents"""
+        top: List[Tuple[float, int, int]] = []
+        total = 0
+        pending: List[np.ndarray] = []
+        pending_size = 0
+        for pairs in chain(self.candidate_pairs(), [None]):
+            if pairs is not None:
+                pending.append(pairs)
+                pending_size += len(pairs)
+                if pending_size < PAIR_BATCH_SIZE:
+                    continue
+            if not pending_size:
+                break
+            batch = np.concatenate(pending)
+            pending, pending_size = [], 0
+            similarity, keep = self.compare(batch, threshold)
+            total += int(keep.sum())
+            for index in np.nonzero(keep)[0].tolist():
+                pair = (float(similarity[index]), int(batch[index, 1]), int(batch[index, 2]))
+                if len(top) < limit:
+                    heapq.heappush(top, pair)
+                else:
+                    heapq.heappushpop(top, pair)
+
+        texts = self.fetch([example_id for _, a, b in top for example_id in (a, b)], "intent, text")
+        return total, [{
+            "similarity": round(similarity, 3),
+            "a": {"intent": self.intent_names[texts[a][0]], "text": texts[a][1]},
+            "b": {"intent": self.intent_names[texts[b][0]], "text": texts[b][1]},
+        } for similarity, a, b in sorted(top, reverse=True)]
+
+    def ids_to_drop(self, drop_conflicts: bool) -> Iterator[int]:
+        """Ascending ids of redundant copies (and optionally of conflicting examples)"""
+        query = ("SELECT id FROM example e WHERE id > (SELECT MIN(id) FROM example "
+                 "WHERE norm_hash = e.norm_hash AND intent = e.intent)")
+        if drop_conflicts:
+            query += (" OR norm_hash IN (SELECT norm_hash FROM example GROUP BY norm_hash "
+                      "HAVING COUNT(DISTINCT intent) > 1)")
+        for (example_id,) in self.db.execute(query + " ORDER BY id"):
+            yield example_id
+
+    def close(self) -> None:
+        self.db.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def imbalance_report(counts: Dict[Text, int]) -> Dict[Text, Any]:
+    if not counts:
+        return {}
+    median = statistics.median(counts.values())
+    return {
+        "intents": len(counts),
+        "median": median,
+        "max_to_min_ratio": round(max(counts.values()) / max(1, min(counts.values())), 2),
+        "under_represented": sorted(i for i, n in counts.items() if n < median * UNDER_REPRESENTED),
+        "over_represented": sorted(i for i, n in counts.items() if n > median * OVER_REPRESENTED),
+    }
+
+
+def output_paths(paths: List[Text], output: Optional[Text], output_dir: Optional[Text]) -> List[Tuple[Text, Text]]:
+    """(input, output) pairs: one output file per input, never an input itself"""
+    if output:
+        if len(paths) > 1:
+            raise ValueError("--output takes a single input file; use --output-dir for several")
+        pairs = [(paths[0], output)]
+    else:
+        pairs = [(path, os.path.join(output_dir, os.path.basename(path))) for path in paths]
+        names = [target for _, target in pairs]
+        if len(set(names)) < len(names):
+            raise ValueError("Input files share a file name; deduplicate them separately")
+    inputs = {os.path.abspath(path) for path in paths}
+    for _, target in pairs:
+        if os.path.abspath(target) in inputs:
+            raise ValueError(f"{target} is an input file; write the copy somewhere else")
+    return pairs
+
+
+def write_deduplicated(pairs: List[Tuple[Text, Text]], drop: Iterator[int]) -> int:
+    """Copy each input file line by line to its output, leaving out the dropped examples"""
+    next_drop = next(drop, None)
+    example_id = 0
+    dropped = 0
+    for path, output in pairs:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8", newline="") as out:
+            # Example ids run across the inputs in the order they were loaded
+            for line, example in iter_lines(path):
+                if example is not None:
+                    example_id += 1
+                    if example_id == next_drop:
+                        next_drop = next(drop, None)
+                        dropped += 1
+                        continue
+                out.write(line)
+    return dropped
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Analyse and deduplicate NLU training data")
+    parser.add_argument("paths", nargs="+", help="Rasa YAML NLU files")
+    parser.add_argument("--threshold", type=float, default=0.8,
+                        help="Estimated Jaccard similarity for near duplicates")
+    parser.add_argument("--no-near-duplicates", action="store_true",
+                        help="Only look for exact duplicates")
+    parser.add_argument("--limit", type=int, default=20, help="Examples shown per finding")
+    parser.add_argument("--report", help="Write the findings to this JSON file")
+    outputs = parser.add_mutually_exclusive_group()
+    outputs.add_argument("--output", help="Write a copy of the (single) input file without redundant duplicates")
+    outputs.add_argument("--output-dir", help="Write a copy of every input file without redundant duplicates here")
+    parser.add_argument("--drop-conflicts", action="store_true",
+                        help="With --output or --output-dir, also drop examples labelled with several intents")
+    parser.add_argument("--tmp-dir", help="Where to keep the temporary index")
+    args = parser.parse_args()
+
+    pairs: List[Tuple[Text, Text]] = []
+    if args.output or args.output_dir:
+        try:
+            pairs = output_paths(args.paths, args.output, args.output_dir)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+
+    print("🏥 Healthcare Chatbot NLU Corpus Tool")
+    start = time.perf_counter()
+    index = CorpusIndex(args.tmp_dir)
+    try:
+        total = index.load(args.paths, not args.no_near_duplicates)
+        loaded = time.perf_counter()
+        counts = index.intent_counts()
+        redundant, redundant_examples = index.duplicates_within_intents(args.limit)
+        conflicting, conflict_examples = index.conflicts(args.limit)
+        near_total, near_examples = (0, [])
+        if not args.no_near_duplicates:
+            near_total, near_examples = index.near_duplicates(args.threshold, args.limit)
+        imbalance = imbalance_report(counts)
+
+        report = {
+            "files": args.paths,
+            "examples": total,
+            "intents": dict(sorted(counts.items(), key=lambda item: -item[1])),
+            "entities": index.entity_counts(),
+            "duplicates_within_intents": {"redundant_copies": redundant, "top": redundant_examples},
+            "conflicts": {"count": conflicting, "examples": conflict_examples},
+            "near_duplicates": {"threshold": args.threshold, "count": near_total,
+                                "examples": near_examples},
+            "imbalance": imbalance,
+        }
+
+        for path in index.empty_files:
+            print(f"⚠️  {path}: has an nlu: section but no intent examples were read")
+        if not total:
+            print("❌ No intent examples found in the input files")
+            return 1
+
+        print_header("CORPUS")
+        print(f"Examples: {total} in {len(counts)} intents "
+              f"({total / max(loaded - start, 1e-9):,.0f} examples/s)")
+        print(f"Entity annotations: {sum(report['entities'].values())} "
+              f"({', '.join(f'{k}: {v}' for k, v in list(report['entities'].items())[:8])})")
+
+        print_header("DUPLICATES")
+        print(f"{'⚠️ ' if redundant else '✅'} {redundant} redundant copies within intents")
+        for item in redundant_examples[:5]:
+            print(f"   {item['copies']}x [{item['intent']}] {item['text']}")
+        print(f"{'❌' if conflicting else '✅'} {conflicting} examples labelled with several intents")
+        for item in conflict_examples[:5]:
+            print(f"   {item['text']} → {', '.join(item['intents'])}")
+        if not args.no_near_duplicates:
+            print(f"{'⚠️ ' if near_total else '✅'} {near_total} near-duplicate pairs across intents "
+                  f"(similarity ≥ {args.threshold})")
+            for item in near_examples[:5]:
+                print(f"   {item['similarity']:.2f} [{item['a']['intent']}] {item['a']['text']} | "
+                      f"[{item['b']['intent']}] {item['b']['text']}")
+
+        print_header("CLASS BALANCE")
+        for intent, count in report["intents"].items():
+            print(f"{intent:<32} {count:>8}  {count / total:>6.1%}")
+        if imbalance:
+            print(f"\nMax/min ratio: {imbalance['max_to_min_ratio']}")
+            for intent in imbalance["under_represented"]:
+                print(f"⚠️  Under-represented: {intent}")
+            for intent in imbalance["over_represented"]:
+                print(f"⚠️  Over-represented: {intent}")
+
+        if pairs:
+            dropped = write_deduplicated(pairs, index.ids_to_drop(args.drop_conflicts))
+            print(f"\n💾 Wrote {', '.join(output for _, output in pairs)} without {dropped} examples")
+    finally:
+        index.close()
+
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📊 Report written to {args.report}")
+
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
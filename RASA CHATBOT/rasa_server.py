@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Rasa Server
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Slim Action Server Requests
+
+Runs the ``rasa`` command line with slim action server requests installed
+(components/slim_action_calls.py): calls to custom actions carry only the
+slots and recent events each action declares in actions/actions.py, go over a
+pool of keep-alive connections (components/action_client.py), and large
+request bodies are deflate-compressed. Every argument is passed to ``rasa``
+unchanged; the options of the action endpoint in endpoints.yml configure the
+requests.
+
+Usage:
+    python rasa_server.py run --enable-api --cors "*"
+    python rasa_server.py shell
+"""
+
+import sys
+
+
+def main() -> int:
+    from components.slim_action_calls import install_slim_action_calls
+    from rasa.__main__ import main as rasa_main
+
+    install_slim_action_calls()
+    sys.argv = ["rasa", *sys.argv[1:]]
+    rasa_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
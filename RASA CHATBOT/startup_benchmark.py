@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Action Server Startup Benchmark
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Cold Start Measurements
+
+Measures how long a freshly started action server takes to become useful,
+which is what an autoscaled pod pays on every cold start:
+
+* Imports  - runs ``python -X importtime`` on the same registration the
+             action server does (``ActionExecutor().register_package``) and
+             reports the import time per library and per module of the
+             actions package, as the median of several fresh interpreters.
+* Requests - starts the action server, polls ``/health`` until it answers
+             and then calls each ``--action`` once through ``/webhook``,
+             recording time to ready, time to the first answered request and
+             the first (cold) against the second (warm) latency of each
+             action, so helpers loaded lazily on first use show up. The
+             server gets an endpoints file with an in-memory appointment
+             store, so benchmark bookings never reach the configured one.
+
+Usage:
+    python startup_benchmark.py                         # rasa_sdk server, 5 runs
+    python startup_benchmark.py --server prefork        # action_server.py, one worker
+    python startup_benchmark.py --skip-requests --top 30
+    python startup_benchmark.py --output results/startup.json
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+ACTIONS_PACKAGE = "actions"
+DEFAULT_ACTIONS = ["action_perform_triage", "action_provide_health_advice", "action_book_appointment"]
+
+# What the action server runs at startup before it can accept requests. The
+# package's modules are imported with __import__ first: rasa_sdk imports them
+# through importlib.import_module, which -X importtime does not report.
+REGISTRATION_CODE = f"""
+import pkgutil
+import {ACTIONS_PACKAGE}
+for module in pkgutil.iter_modules({ACTIONS_PACKAGE}.__path__, "{ACTIONS_PACKAGE}."):
+    __import__(module.name)
+from rasa_sdk.executor import ActionExecutor
+ActionExecutor().register_package("{ACTIONS_PACKAGE}")
+"""
+
+# Endpoints of the benchmarked server: bookings stay in its memory
+BENCHMARK_ENDPOINTS = "appointment_store:\n  type: in_memory\n"
+
+# "import time:       273 |      53078 |   actions"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60)
+    print(f"⏱️  {title}")
+    print("=" * 60)
+
+
+def parse_importtime(output: Text) -> List[Tuple[Text, int, int, int]]:
+    """(module, depth, self µs, cumulative µs) for each line of -X importtime output"""
+    modules = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, (len(indent) - 1) // 2, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure_imports(repeats: int) -> Dict[Text, Any]:
+    """Median import costs of registering the actions package in fresh interpreters"""
+    totals: List[float] = []
+    wall: List[float] = []
+    by_library: Dict[Text, List[float]] = {}
+    by_module: Dict[Text, List[float]] = {}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", REGISTRATION_CODE],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        wall.append(time.perf_counter() - start)
+        modules = parse_importtime(completed.stderr)
+        if completed.returncode != 0 or not modules:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1:] or "no import timings")
+
+        totals.append(sum(cumulative for _, depth, _, cumulative in modules if depth == 0) / 1000)
+        libraries: Dict[Text, int] = {}
+        for name, _, self_us, _ in modules:
+            # Self time charged to the library a module belongs to, whoever imported it
+            libraries[name.split(".")[0]] = libraries.get(name.split(".")[0], 0) + self_us
+            if name == ACTIONS_PACKAGE or name.startswith(ACTIONS_PACKAGE + "."):
+                by_module.setdefault(name, []).append(self_us / 1000)
+        for library, self_us in libraries.items():
+            by_library.setdefault(library, []).append(self_us / 1000)
+
+    return {
+        "repeats": repeats,
+        "import_ms": round(statistics.median(totals), 2),
+        "process_ms": round(statistics.median(wall) * 1000, 2),
+        "libraries_ms": {
+            name: round(statistics.median(values), 2)
+            for name, values in sorted(by_library.items(), key=lambda item: -statistics.median(item[1]))
+        },
+        "actions_modules_ms": {
+            name: round(statistics.median(values), 2)
+            for name, values in sorted(by_module.items(), key=lambda item: -statistics.median(item[1]))
+        },
+    }
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server: Text, port: int) -> List[Text]:
+    if server == "prefork":
+        return [sys.executable, "action_server.py", "--workers", "1", "--port", str(port),
+                "--host", "127.0.0.1", "--metrics-port", "0", "--log-level", "WARNING"]
+    # What `rasa run actions` runs, without importing rasa itself
+    return [sys.executable, "-m", "rasa_sdk", "--actions", ACTIONS_PACKAGE, "--port", str(port)]
+
+
+def action_payload(action: Text) -> Dict[Text, Any]:
+    """Webhook request for one action, as Rasa sends it"""
+    sender_id = f"startup-benchmark-{action}"
+    return {
+        "next_action": action,
+        "sender_id": sender_id,
+        "tracker": {
+            "sender_id": sender_id,
+            "slots": {"symptoms": "headache", "triage_priority": "medium"},
+            "latest_message": {
+                "text": "I have a headache",
+                "intent": {"name": "report_symptoms", "confidence": 1.0},
+                "entities": [{"entity": "symptom", "value": "headache"}],
+            },
+            "events": [],
+            "paused": False,
+            "followup_action": None,
+            "active_loop": {},
+            "latest_action_name": "action_listen",
+        },
+        "domain": {},
+        "version": "3.6.0",
+    }
+
+
+def http_ok(url: Text, payload: Optional[Dict[Text, Any]] = None, timeout: float = 10.0) -> bool:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def measure_startup(server: Text, actions: List[Text], timeout: float) -> Dict[Text, Any]:
+    """Start one server process and time it until every action has answered twice"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as scratch, tempfile.TemporaryFile() as log:
+        endpoints = os.path.join(scratch, "endpoints.yml")
+        with open(endpoints, "w", encoding="utf-8") as f:
+            f.write(BENCHMARK_ENDPOINTS)
+        env = dict(os.environ, ACTION_METRICS_PORT="0", ACTION_ENDPOINTS=endpoints)
+        start = time.perf_counter()
+        process = subprocess.Popen(server_command(server, port), stdout=log, stderr=subprocess.STDOUT,
+                                   env=env)
+        try:
+            deadline = start + timeout
+            while not http_ok(f"{base_url}/health", timeout=1.0):
+                if process.poll() is not None or time.perf_counter() > deadline:
+                    log.seek(0)
+                    tail = log.read().decode("utf-8", "replace").strip().splitlines()[-3:]
+                    raise RuntimeError(f"server not ready: {' | '.join(tail) or 'no output'}")
+                time.sleep(0.01)
+            ready = time.perf_counter() - start
+
+            first_request = None
+            latencies: Dict[Text, Dict[Text, Optional[float]]] = {}
+            for action in actions:
+                timings: Dict[Text, Optional[float]] = {}
+                for label in ("cold_ms", "warm_ms"):
+                    sent = time.perf_counter()
+                    ok = http_ok(f"{base_url}/webhook", action_payload(action))
+                    answered = time.perf_counter()
+                    timings[label] = round((answered - sent) * 1000, 2) if ok else None
+                    if ok and first_request is None:
+                        first_request = answered - start
+                latencies[action] = timings
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    return {
+        "ready_ms": round(ready * 1000, 2),
+        "first_request_ms": round(first_request * 1000, 2) if first_request is not None else None,
+        "actions": latencies,
+    }
+
+
+def summarize_runs(runs: List[Dict[Text, Any]]) -> Dict[Text, Any]:
+    """Median of each timing across server starts"""
+    def median(values: List[Optional[float]]) -> Optional[float]:
+        values = [value for value in values if value is not None]
+        return round(statistics.median(values), 2) if values else None
+
+    return {
+        "runs": len(runs),
+        "ready_ms": median([run["ready_ms"] for run in runs]),
+        "first_request_ms": median([run["first_request_ms"] for run in runs]),
+        "actions": {
+            action: {
+                label: median([run["actions"][action][label] for run in runs])
+                for label in ("cold_ms", "warm_ms")
+            }
+            for action in runs[0]["actions"]
+        },
+    }
+
+
+def print_import_report(imports: Dict[Text, Any], top: int) -> None:
+    print(f"Import time: {imports['import_ms']:.1f} ms "
+          f"(interpreter start to exit: {imports['process_ms']:.1f} ms, "
+          f"median of {imports['repeats']})")
+    print(f"\n{'Library':<32} {'Self ms':>10}")
+    for name, ms in list(imports["libraries_ms"].items())[:top]:
+        print(f"{name:<32} {ms:>10.2f}")
+    print(f"\n{'Actions module':<32} {'Self ms':>10}")
+    for name, ms in imports["actions_modules_ms"].items():
+        print(f"{name:<32} {ms:>10.2f}")
+
+
+def print_request_report(startup: Dict[Text, Any]) -> None:
+    def show(value: Optional[float]) -> Text:
+        return f"{value:.1f}" if value is not None else "failed"
+
+    print(f"Ready (/health answers): {show(startup['ready_ms'])} ms")
+    print(f"First answered request:  {show(startup['first_request_ms'])} ms")
+    print(f"\n{'Action':<32} {'Cold ms':>10} {'Warm ms':>10}")
+    for action, timings in startup["actions"].items():
+        print(f"{action:<32} {show(timings['cold_ms']):>10} {show(timings['warm_ms']):>10}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure action server import time and time to first request")
+    parser.add_argument("--server", choices=["sdk", "prefork"], default="sdk",
+                        help="sdk: python -m rasa_sdk (as rasa run actions); prefork: action_server.py")
+    parser.add_argument("--action", dest="actions", action="append",
+                        help=f"Action called after startup; repeatable (default: {', '.join(DEFAULT_ACTIONS)})")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters / server starts measured")
+    parser.add_argument("--top", type=int, default=15, help="Libraries listed in the import report")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for a server to start")
+    parser.add_argument("--skip-imports", action="store_true")
+    parser.add_argument("--skip-requests", action="store_true")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    print("🏥 Healthcare Chatbot Action Server Startup Benchmark")
+    results: Dict[Text, Any] = {"python": sys.version.split()[0], "server": args.server}
+    try:
+        if not args.skip_imports:
+            print_header("IMPORTS")
+            results["imports"] = measure_imports(args.repeats)
+            print_import_report(results["imports"], args.top)
+
+        if not args.skip_requests:
+            print_header(f"TIME TO FIRST REQUEST ({args.server})")
+            runs = [measure_startup(args.server, args.actions or DEFAULT_ACTIONS, args.timeout)
+                    for _ in range(args.repeats)]
+            results["startup"] = summarize_runs(runs)
+            print_request_report(results["startup"])
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📊 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Healthcare Chatbot Triage Audit
+GitHub Repository: https://github.com/user/healthcare-chatbot
+MSc AI Assignment - Offline Triage Review
+
+Re-scores historical symptom reports with the aggregate triage scorer
+(actions/triage_scoring.py) and compares the result with the first-match
+lexicon classification it replaced and with the priority the conversation
+actually recorded (the ``triage_priority`` slot set after the message).
+
+Input is read as a stream, so the size of the history does not matter:
+
+* a SQLite tracker store (``tracker_store: type: sql`` with ``dialect: sqlite``),
+  read from its ``events`` table, or
+* a JSON lines file of Rasa events (each with a ``sender_id``), of tracker
+  dumps (``{"sender_id": ..., "events": [...]}``) or of plain
+  ``{"text": ..., "entities": [...]}`` records.
+
+Turns are scored in batches of ``--batch-size`` with one matrix product each.
+
+Usage:
+    python triage_audit.py rasa.db
+    python triage_audit.py conversations.jsonl --rules triage_rules.yml --examples 20
+    python triage_audit.py rasa.db --output results/triage_audit.json
+    python triage_audit.py tests/triage_cases.jsonl --strict
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Text, Tuple
+
+from actions.triage_knowledge import DEFAULT_RULES_PATH, parse_triage_rules
+from actions.triage_lexicon import TIER_ORDER, TRIAGE_LEXICON, TriageLexicon
+from actions.triage_scoring import TriageCase, TriageScorer, case_from_message, rationale
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+class AuditTurn(NamedTuple):
+    sender_id: Text
+    case: TriageCase
+    # triage_priority set in the conversation after this message, if any
+    recorded: Optional[Text]
+
+
+def print_header(title: str):
+    """Print formatted section header"""
+    print("\n" + "=" * 60)
+    print(f"🩺 {title}")
+    print("=" * 60)
+
+
+def load_lexicon(path: Text) -> TriageLexicon:
+    """Compile the rules file, or fall back to the built-in lexicon"""
+    if not os.path.exists(path):
+        print(f"⚠️  {path} not found; using the built-in triage terms")
+        return TRIAGE_LEXICON
+    with open(path, "r", encoding="utf-8") as f:
+        return TriageLexicon(**parse_triage_rules(f.read(), path))
+
+
+def iter_tracker_store(path: Text) -> Iterator[Tuple[Text, Dict[Text, Any]]]:
+    """(sender_id, event) from the events table of a SQLite tracker store"""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            "SELECT sender_id, data FROM events WHERE type_name IN ('user', 'slot') ORDER BY id"
+        )
+        for sender_id, data in rows:
+            yield sender_id, json.loads(data)
+    finally:
+        connection.close()
+
+
+def iter_jsonl(path: Text) -> Iterator[Tuple[Text, Dict[Text, Any]]]:
+    """(sender_id, event) from a JSON lines file of events, trackers or plain records"""
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            sender_id = str(record.get("sender_id", f"line-{number}"))
+            if isinstance(record.get("events"), list):
+                for event in record["events"]:
+                    yield sender_id, event
+            elif "event" in record:
+                yield sender_id, record
+            else:
+                yield sender_id, {"event": "user", "text": record.get("text"),
+                                  "parse_data": {"entities": record.get("entities") or []},
+                                  "triage_priority": record.get("triage_priority")}
+
+
+def collect_turns(events: Iterator[Tuple[Text, Dict[Text, Any]]]) -> Iterator[AuditTurn]:
+    """Symptom reports, each paired with the triage priority recorded after it"""
+    pending: Dict[Text, TriageCase] = {}
+    for sender_id, event in events:
+        kind = event.get("event")
+        if kind == "user":
+            if sender_id in pending:
+                yield AuditTurn(sender_id, pending.pop(sender_id), None)
+            message = dict(event.get("parse_data") or {})
+            message["text"] = event.get("text") or ""
+            case = case_from_message(message)
+            if not case.symptoms:
+                continue
+            if event.get("triage_priority"):
+                yield AuditTurn(sender_id, case, event["triage_priority"])
+            else:
+                pending[sender_id] = case
+        elif kind == "slot" and event.get("name") == "triage_priority" and sender_id in pending:
+            yield AuditTurn(sender_id, pending.pop(sender_id), event.get("value"))
+    for sender_id, case in pending.items():
+        yield AuditTurn(sender_id, case, None)
+
+
+def batches(turns: Iterator[AuditTurn], size: int) -> Iterator[List[AuditTurn]]:
+    batch: List[AuditTurn] = []
+    for turn in turns:
+        batch.append(turn)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def print_confusion(confusion: Dict[Text, Dict[Text, int]], rows: Text, columns: Text) -> None:
+    corner = f"{rows} / {columns}"
+    print(f"{corner:<24}" + "".join(f"{tier:>11}" for tier in TIER_ORDER))
+    for tier in TIER_ORDER:
+        counts = confusion.get(tier, {})
+        print(f"{tier:<24}" + "".join(f"{counts.get(other, 0):>11}" for other in TIER_ORDER))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Re-score historical triage turns with the scoring engine")
+    parser.add_argument("source", help="SQLite tracker store (.db/.sqlite) or JSON lines file")
+    parser.add_argument("--rules", default=DEFAULT_RULES_PATH)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--limit", type=int, help="Stop after this many turns")
+    parser.add_argument("--examples", type=int, default=10,
+                        help="Turns shown whose priority differs from the first-match result")
+    parser.add_argument("--output", help="Write the audit report as JSON to this file")
+    parser.add_argument("--strict", action="store_true",
+                        help="Exit 1 if a scored priority differs from the recorded one")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"❌ {args.source} not found")
+        return 1
+
+    print("🏥 Healthcare Chatbot Triage Audit")
+    lexicon = load_lexicon(args.rules)
+    scorer = TriageScorer(lexicon)
+    if args.source.endswith((".db", ".sqlite", ".sqlite3")):
+        events = iter_tracker_store(args.source)
+    else:
+        events = iter_jsonl(args.source)
+    turns: Iterator[AuditTurn] = collect_turns(events)
+
+    total = 0
+    new_counts = {tier: 0 for tier in TIER_ORDER}
+    old_counts = {tier: 0 for tier in TIER_ORDER}
+    versus_first_match: Dict[Text, Dict[Text, int]] = {}
+    versus_recorded: Dict[Text, Dict[Text, int]] = {}
+    feature_counts: Dict[Text, int] = {}
+    examples: List[Dict[Text, Any]] = []
+    start = time.perf_counter()
+    try:
+        for batch in batches(turns, args.batch_size):
+            if args.limit is not None:
+                batch = batch[:max(0, args.limit - total)]
+                if not batch:
+                    break
+            results = scorer.score_cases([turn.case for turn in batch])
+            for turn, result in zip(batch, results):
+                old = lexicon.classify(turn.case.symptoms)
+                new_counts[result.priority] += 1
+                old_counts[old] += 1
+                row = versus_first_match.setdefault(result.priority, {})
+                row[old] = row.get(old, 0) + 1
+                if turn.recorded in TIER_ORDER:
+                    row = versus_recorded.setdefault(result.priority, {})
+                    row[turn.recorded] = row.get(turn.recorded, 0) + 1
+                for feature, _ in result.contributions:
+                    feature_counts[feature] = feature_counts.get(feature, 0) + 1
+                differs = old != result.priority or (args.strict and turn.recorded not in (None, result.priority))
+                if differs and len(examples) < args.examples:
+                    examples.append({
+                        "sender_id": turn.sender_id,
+                        "text": turn.case.text,
+                        "symptoms": list(turn.case.symptoms),
+                        "first_match": old,
+                        "scored": result.priority,
+                        "recorded": turn.recorded,
+                        "rationale": rationale(result),
+                    })
+            total += len(batch)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"❌ Could not read {args.source}: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    if not total:
+        print("No symptom reports found")
+        return 0
+
+    changed = sum(count for tier, row in versus_first_match.items()
+                  for other, count in row.items() if other != tier)
+    recorded = sum(sum(row.values()) for row in versus_recorded.values())
+    agreeing = sum(row.get(tier, 0) for tier, row in versus_recorded.items())
+
+    print_header("PRIORITIES")
+    print(f"Turns scored: {total} in {elapsed:.2f}s ({total / elapsed:,.0f} turns/s)")
+    print(f"{'Tier':<12} {'Scored':>10} {'First match':>12}")
+    for tier in TIER_ORDER:
+        print(f"{tier:<12} {new_counts[tier]:>10} {old_counts[tier]:>12}")
+    print(f"\nChanged by aggregate scoring: {changed} ({changed / total:.1%})")
+    print_confusion(versus_first_match, "scored", "first match")
+    if recorded:
+        print(f"\nAgreement with recorded priority: {agreeing}/{recorded} ({agreeing / recorded:.1%})")
+        print_confusion(versus_recorded, "scored", "recorded")
+
+    print_header("MOST FREQUENT FACTORS")
+    for feature, count in sorted(feature_counts.items(), key=lambda item: -item[1])[:10]:
+        print(f"{feature:<32} {count:>8}")
+
+    if examples:
+        print_header("CHANGED TURNS")
+        for example in examples:
+            noted = f", recorded {example['recorded']}" if example["recorded"] else ""
+            print(f"{example['first_match']} -> {example['scored']}{noted}: "
+                  f"{example['text'] or ', '.join(example['symptoms'])!r} ({example['rationale']})")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "source": args.source,
+                "turns": total,
+                "seconds": round(elapsed, 2),
+                "scored": new_counts,
+                "first_match": old_counts,
+                "changed": changed,
+                "scored_vs_first_match": versus_first_match,
+                "scored_vs_recorded": versus_recorded,
+                "agreement_with_recorded": round(agreeing / recorded, 4) if recorded else None,
+                "factors": dict(sorted(feature_counts.items(), key=lambda item: -item[1])),
+                "examples": examples,
+            }, f, indent=2)
+        print(f"\n📊 Report written to {args.output}")
+    if args.strict and agreeing < recorded:
+        print(f"\n❌ {recorded - agreeing} turns scored differently from their recorded priority")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,40 +6,237 @@ MSc AI Assignment - Comprehensive Project Validation
 
 This script validates the healthcare chatbot project structure and content
 without requiring a full Rasa installation.
+
+Every YAML file is parsed exactly once (with the libyaml C loader when
+available) and reduced to an in-memory project model of intents, entities,
+slots, actions and stories; all checks then run against that model, and
+cross-references such as "every story action is declared in domain.yml" are
+set lookups. Large projects are parsed in parallel, one file per process.
+The exit code is non-zero when an error is found, so the script can be used
+as a pre-commit hook (``--quiet`` prints only problems).
 """
 
+import argparse
+import ast
+import glob
 import os
-import yaml
-import json
+import re
 import sys
-from pathlib import Path
-from typing import Dict, List, Any
+import time
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Set
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+# Parse in a process pool only when there is enough YAML to pay for the workers
+PARALLEL_THRESHOLD_BYTES = 1 << 20
+
+# [text](entity), [text](entity:value) and [text]{"entity": "name", ...}
+ENTITY_ANNOTATION = re.compile(r'\[([^\]]+)\](?:\((\w+)(?::[^)]*)?\)|\{[^}]*"entity"\s*:\s*"([^"]+)")')
+
+# Actions every Rasa assistant has without declaring them
+DEFAULT_ACTIONS = {
+    "action_listen", "action_restart", "action_session_start", "action_default_fallback",
+    "action_deactivate_loop", "action_revert_fallback_events", "action_default_ask_affirmation",
+    "action_default_ask_rephrase", "action_two_stage_fallback", "action_unlikely_intent",
+    "action_back", "action_extract_slots",
+}
+
+# Intents Rasa provides without declaring them
+DEFAULT_INTENTS = {"nlu_fallback", "restart", "back", "out_of_scope", "session_start"}
+
+VERBOSE = True
+PROBLEMS = {"errors": 0, "warnings": 0}
+
 
 def print_header(title: str):
     """Print formatted section header"""
-    print("\n" + "="*60)
-    print(f"🔍 {title}")
-    print("="*60)
+    if VERBOSE:
+        print("\n" + "="*60)
+        print(f"🔍 {title}")
+        print("="*60)
 
 def print_success(message: str):
     """Print success message"""
-    print(f"✅ {message}")
+    if VERBOSE:
+        print(f"✅ {message}")
 
 def print_error(message: str):
     """Print error message"""
+    PROBLEMS["errors"] += 1
     print(f"❌ {message}")
 
 def print_warning(message: str):
     """Print warning message"""
+    PROBLEMS["warnings"] += 1
     print(f"⚠️  {message}")
 
+# ====== SINGLE-PASS PARSING ======
+
+def _names(items: Any) -> List[str]:
+    """Names from a domain list that may mix strings and {name: {...}} mappings"""
+    if isinstance(items, dict):
+        return list(items)
+    names = []
+    for item in items or []:
+        names.extend(item.keys() if isinstance(item, dict) else [item])
+    return [str(name) for name in names]
+
+def _example_lines(block: Dict[str, Any]) -> List[str]:
+    examples = block.get("examples")
+    if not isinstance(examples, str):
+        return []
+    lines = []
+    for line in examples.split('\n'):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            lines.append(line[2:].strip() if line.startswith('- ') else line)
+    return lines
+
+def _summarize_nlu(blocks: List[Any], summary: Dict[str, Any]) -> None:
+    intent_counts: Dict[str, int] = {}
+    entity_counts: Dict[str, int] = {}
+    entities: Set[str] = set()
+    owner: Dict[str, str] = {}
+    conflicts: List[str] = []
+
+    for item in blocks or []:
+        if not isinstance(item, dict) or "intent" not in item:
+            continue
+        intent = item["intent"]
+        examples = _example_lines(item)
+        intent_counts[intent] = intent_counts.get(intent, 0) + len(examples)
+        for example in examples:
+            for match in ENTITY_ANNOTATION.finditer(example):
+                entities.add(match.group(2) or match.group(3))
+                entity_counts[intent] = entity_counts.get(intent, 0) + 1
+            # Compare the surface text: "[fever](symptom)" reads as "fever"
+            text = ENTITY_ANNOTATION.sub(r"\1", example).lower()
+            previous = owner.setdefault(text, intent)
+            if previous != intent and len(conflicts) < 20:
+                conflicts.append(f"'{example}' is an example of both '{previous}' and '{intent}'")
+
+    summary["intent_counts"] = intent_counts
+    summary["entity_counts"] = entity_counts
+    summary["entities"] = entities
+    summary["conflicts"] = conflicts
+
+def _summarize_steps(steps: List[Any], references: Dict[str, Set[str]]) -> None:
+    for step in steps or []:
+        if not isinstance(step, dict):
+            continue
+        if "intent" in step:
+            references["intents"].add(step["intent"])
+        if "action" in step:
+            references["actions"].add(step["action"])
+        if "active_loop" in step and step["active_loop"]:
+            references["actions"].add(step["active_loop"])
+        if isinstance(step.get("user"), str):
+            for match in ENTITY_ANNOTATION.finditer(step["user"]):
+                references["entities"].add(match.group(2) or match.group(3))
+        step_entities = step.get("entities")
+        references["entities"].update(_names(step_entities))
+        references["slots"].update(_names(step.get("slot_was_set")))
+        for alternative in step.get("or") or []:
+            _summarize_steps([alternative], references)
+
+def summarize_file(path: str) -> Dict[str, Any]:
+    """Parse one YAML file and keep only what the checks need"""
+    summary: Dict[str, Any] = {"path": path, "error": None, "keys": []}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            document = yaml.load(f, Loader=YamlLoader)
+    except yaml.YAMLError as e:
+        summary["error"] = f"Invalid YAML syntax in {path}: {e}"
+        return summary
+    except Exception as e:
+        summary["error"] = f"Error reading {path}: {e}"
+        return summary
+
+    if not isinstance(document, dict):
+        return summary
+    summary["keys"] = list(document)
+
+    if "intents" in document or "responses" in document:
+        summary["domain"] = {
+            "sections": {key: len(value) if isinstance(value, (list, dict)) else 1
+                         for key, value in document.items()},
+            "intents": _names(document.get("intents")),
+            "entities": _names(document.get("entities")),
+            "slots": _names(document.get("slots")),
+            "responses": _names(document.get("responses")),
+            "actions": _names(document.get("actions")),
+            "forms": _names(document.get("forms")),
+        }
+    if "nlu" in document:
+        summary["nlu_blocks"] = len(document["nlu"] or [])
+        _summarize_nlu(document["nlu"], summary)
+
+    references: Dict[str, Set[str]] = {"intents": set(), "actions": set(),
+                                       "entities": set(), "slots": set()}
+    for key in ("stories", "rules", "test_cases"):
+        items = document.get(key) or []
+        if items:
+            summary[f"{key}_count"] = len(items)
+            for item in items:
+                if isinstance(item, dict):
+                    _summarize_steps(item.get("steps"), references)
+    summary["references"] = references
+    return summary
+
+class ProjectModel:
+    """Everything the checks need, built from one parse of each file"""
+
+    def __init__(self, summaries: Dict[str, Dict[str, Any]], data_files: List[str]):
+        self.files = summaries
+        self.data_files = data_files
+        domain = (summaries.get("domain.yml") or {}).get("domain")
+        self.domain = domain
+        self.intents = set(domain["intents"]) if domain else set()
+        self.entities = set(domain["entities"]) if domain else set()
+        self.slots = set(domain["slots"]) if domain else set()
+        self.responses = set(domain["responses"]) if domain else set()
+        self.actions = set(domain["actions"]) | set(domain["forms"]) if domain else set()
+
+        self.nlu_intent_counts: Dict[str, int] = {}
+        self.nlu_entity_counts: Dict[str, int] = {}
+        self.nlu_entities: Dict[str, Set[str]] = {}
+        self.nlu_conflicts: List[str] = []
+        for path in data_files:
+            summary = summaries.get(path) or {}
+            for intent, count in (summary.get("intent_counts") or {}).items():
+                self.nlu_intent_counts[intent] = self.nlu_intent_counts.get(intent, 0) + count
+            for intent, count in (summary.get("entity_counts") or {}).items():
+                self.nlu_entity_counts[intent] = self.nlu_entity_counts.get(intent, 0) + count
+            for entity in summary.get("entities") or ():
+                self.nlu_entities.setdefault(entity, set()).add(path)
+            self.nlu_conflicts += summary.get("conflicts") or []
+
+def load_project(paths: List[str], data_files: List[str], jobs: Optional[int] = None) -> ProjectModel:
+    """Parse every file once, in parallel when the project is large"""
+    existing = sorted({path for path in paths + data_files if os.path.exists(path)})
+    total_bytes = sum(os.path.getsize(path) for path in existing)
+
+    if jobs != 1 and len(existing) > 1 and total_bytes >= PARALLEL_THRESHOLD_BYTES:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            summaries = list(pool.map(summarize_file, existing))
+    else:
+        summaries = [summarize_file(path) for path in existing]
+    return ProjectModel({summary["path"]: summary for summary in summaries}, data_files)
+
+# ====== CHECKS ======
+
 def validate_file_structure():
     """Validate project file structure"""
     print_header("PROJECT STRUCTURE VALIDATION")
-    
+
     required_files = [
         "domain.yml",
-        "config.yml", 
+        "config.yml",
         "data/nlu.yml",
         "data/stories.yml",
         "data/rules.yml",
@@ -54,20 +251,20 @@ def validate_file_structure():
         "endpoints.yml",
         "credentials.yml"
     ]
-    
+
     required_dirs = [
         "actions",
-        "data", 
+        "data",
         "tests"
     ]
-    
+
     # Check directories
     for directory in required_dirs:
         if os.path.exists(directory):
             print_success(f"Directory exists: {directory}/")
         else:
             print_error(f"Missing directory: {directory}/")
-    
+
     # Check files
     for file_path in required_files:
         if os.path.exists(file_path):
@@ -75,225 +272,257 @@ def validate_file_structure():
         else:
             print_error(f"Missing file: {file_path}")
 
-def validate_yaml_files():
+YAML_FILES = [
+    "domain.yml",
+    "config.yml",
+    "data/nlu.yml",
+    "data/stories.yml",
+    "data/rules.yml",
+    "tests/test_nlu.yml",
+    "tests/test_stories.yml",
+    "endpoints.yml",
+    "credentials.yml"
+]
+
+def validate_yaml_files(project: ProjectModel):
     """Validate YAML file syntax"""
     print_header("YAML SYNTAX VALIDATION")
-    
-    yaml_files = [
-        "domain.yml",
-        "config.yml",
-        "data/nlu.yml", 
-        "data/stories.yml",
-        "data/rules.yml",
-        "tests/test_nlu.yml",
-        "tests/test_stories.yml",
-        "endpoints.yml",
-        "credentials.yml"
-    ]
-    
-    for yaml_file in yaml_files:
-        if os.path.exists(yaml_file):
-            try:
-                with open(yaml_file, 'r', encoding='utf-8') as f:
-                    yaml.safe_load(f)
-                print_success(f"Valid YAML syntax: {yaml_file}")
-            except yaml.YAMLError as e:
-                print_error(f"Invalid YAML syntax in {yaml_file}: {e}")
-            except Exception as e:
-                print_error(f"Error reading {yaml_file}: {e}")
-        else:
+
+    for yaml_file in sorted(set(YAML_FILES) | set(project.data_files)):
+        summary = project.files.get(yaml_file)
+        if summary is None:
             print_warning(f"File not found: {yaml_file}")
+        elif summary["error"]:
+            print_error(summary["error"])
+        else:
+            print_success(f"Valid YAML syntax: {yaml_file}")
 
-def validate_domain_content():
+def validate_domain_content(project: ProjectModel):
     """Validate domain.yml content"""
     print_header("DOMAIN CONTENT VALIDATION")
-    
-    if not os.path.exists("domain.yml"):
+
+    if project.domain is None:
         print_error("domain.yml not found")
         return
-    
-    try:
-        with open("domain.yml", 'r', encoding='utf-8') as f:
-            domain = yaml.safe_load(f)
-        
-        # Check required sections
-        required_sections = ["intents", "entities", "slots", "responses", "actions"]
-        for section in required_sections:
-            if section in domain:
-                count = len(domain[section]) if isinstance(domain[section], (list, dict)) else 1
-                print_success(f"Domain has {section}: {count} items")
-            else:
-                print_error(f"Missing domain section: {section}")
-        
-        # Check specific healthcare intents
-        healthcare_intents = [
-            "greet", "report_symptom", "book_appointment", "emergency_help",
-            "ask_health_advice", "request_human_handover"
-        ]
-        
-        if "intents" in domain:
-            existing_intents = domain["intents"]
-            for intent in healthcare_intents:
-                if intent in existing_intents:
-                    print_success(f"Healthcare intent found: {intent}")
-                else:
-                    print_warning(f"Missing healthcare intent: {intent}")
-    
-    except Exception as e:
-        print_error(f"Error validating domain.yml: {e}")
 
-def validate_nlu_content():
+    # Check required sections
+    required_sections = ["intents", "entities", "slots", "responses", "actions"]
+    for section in required_sections:
+        if section in project.domain["sections"]:
+            print_success(f"Domain has {section}: {project.domain['sections'][section]} items")
+        else:
+            print_error(f"Missing domain section: {section}")
+
+    # Check specific healthcare intents
+    healthcare_intents = [
+        "greet", "report_symptom", "book_appointment", "emergency_help",
+        "ask_health_advice", "request_human_handover"
+    ]
+
+    for intent in healthcare_intents:
+        if intent in project.intents:
+            print_success(f"Healthcare intent found: {intent}")
+        else:
+            print_warning(f"Missing healthcare intent: {intent}")
+
+def validate_nlu_content(project: ProjectModel):
     """Validate NLU training data"""
     print_header("NLU TRAINING DATA VALIDATION")
-    
-    if not os.path.exists("data/nlu.yml"):
-        print_error("data/nlu.yml not found")
+
+    if not project.nlu_intent_counts:
+        print_error("No 'nlu' training examples found in data/")
         return
-    
-    try:
-        with open("data/nlu.yml", 'r', encoding='utf-8') as f:
-            nlu_data = yaml.safe_load(f)
-        
-        if "nlu" not in nlu_data:
-            print_error("No 'nlu' section found in nlu.yml")
-            return
-        
-        # Count training examples by intent
-        intent_counts = {}
-        entity_counts = {}
-        
-        for item in nlu_data["nlu"]:
-            if "intent" in item and "examples" in item:
-                intent = item["intent"]
-                examples = item["examples"].split('\n') if isinstance(item["examples"], str) else []
-                examples = [ex.strip() for ex in examples if ex.strip() and not ex.strip().startswith('#')]
-                
-                intent_counts[intent] = len(examples)
-                
-                # Count entities in examples
-                for example in examples:
-                    if '[' in example and '](' in example:
-                        # Simple entity counting
-                        entity_count = example.count('[')
-                        entity_counts[intent] = entity_counts.get(intent, 0) + entity_count
-        
-        # Report results
-        total_examples = sum(intent_counts.values())
-        print_success(f"Total training examples: {total_examples}")
-        
-        if total_examples >= 100:
-            print_success("✨ Exceeds 100+ training examples requirement!")
+
+    # Report results
+    total_examples = sum(project.nlu_intent_counts.values())
+    print_success(f"Total training examples: {total_examples}")
+
+    if total_examples >= 100:
+        print_success("✨ Exceeds 100+ training examples requirement!")
+    else:
+        print_warning(f"Only {total_examples} examples (target: 100+)")
+
+    # Show intent breakdown
+    for intent, count in project.nlu_intent_counts.items():
+        if count >= 5:
+            print_success(f"Intent '{intent}': {count} examples")
         else:
-            print_warning(f"Only {total_examples} examples (target: 100+)")
-        
-        # Show intent breakdown
-        for intent, count in intent_counts.items():
-            if count >= 5:
-                print_success(f"Intent '{intent}': {count} examples")
-            else:
-                print_warning(f"Intent '{intent}': {count} examples (low)")
-        
-        # Entity statistics
-        total_entities = sum(entity_counts.values())
-        print_success(f"Total entity annotations: {total_entities}")
-    
-    except Exception as e:
-        print_error(f"Error validating NLU data: {e}")
+            print_warning(f"Intent '{intent}': {count} examples (low)")
+
+    # Entity statistics
+    total_entities = sum(project.nlu_entity_counts.values())
+    print_success(f"Total entity annotations: {total_entities}")
+
+    for conflict in project.nlu_conflicts:
+        print_warning(f"Conflicting example: {conflict}")
+
+def validate_cross_references(project: ProjectModel):
+    """Check that data, tests and actions only use names declared in the domain"""
+    print_header("CROSS-REFERENCE VALIDATION")
+
+    if project.domain is None:
+        print_error("domain.yml not found - cross-references not checked")
+        return
+
+    known_actions = project.actions | project.responses | DEFAULT_ACTIONS
+    problems_before = PROBLEMS["errors"]
 
-def validate_actions_code():
+    for intent in sorted(project.nlu_intent_counts):
+        if intent not in project.intents:
+            print_error(f"NLU intent '{intent}' is not declared in domain.yml")
+    for intent in sorted(project.intents - set(project.nlu_intent_counts)):
+        print_warning(f"Domain intent '{intent}' has no NLU training examples")
+    for entity, paths in sorted(project.nlu_entities.items()):
+        if entity not in project.entities:
+            print_error(f"NLU entity '{entity}' ({', '.join(sorted(paths))}) is not declared in domain.yml")
+
+    known_intents = project.intents | DEFAULT_INTENTS
+    for path, summary in sorted(project.files.items()):
+        references = summary.get("references")
+        if not references:
+            continue
+        # Undeclared names break training; in test files they only break the test
+        report = print_error if path in project.data_files else print_warning
+        for action in sorted(references["actions"] - known_actions):
+            report(f"{path}: action '{action}' is not declared in domain.yml")
+        for intent in sorted(references["intents"] - known_intents):
+            report(f"{path}: intent '{intent}' is not declared in domain.yml")
+        for entity in sorted(references["entities"] - project.entities):
+            report(f"{path}: entity '{entity}' is not declared in domain.yml")
+        for slot in sorted(references["slots"] - project.slots):
+            report(f"{path}: slot '{slot}' is not declared in domain.yml")
+
+    if PROBLEMS["errors"] == problems_before:
+        print_success("All intents, entities, slots and actions are declared in domain.yml")
+
+def find_custom_actions(directory: str = "actions") -> Dict[str, str]:
+    """{action name: class} for every Action subclass under the actions package"""
+    found: Dict[str, str] = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            bases = {base.id if isinstance(base, ast.Name) else getattr(base, "attr", "")
+                     for base in node.bases}
+            if not any(base.endswith("Action") for base in bases):
+                continue
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name == "name":
+                    for statement in ast.walk(item):
+                        if (isinstance(statement, ast.Return)
+                                and isinstance(statement.value, ast.Constant)
+                                and isinstance(statement.value.value, str)):
+                            found[statement.value.value] = node.name
+    return found
+
+def validate_actions_code(project: ProjectModel):
     """Validate custom actions code"""
     print_header("CUSTOM ACTIONS VALIDATION")
-    
+
     if not os.path.exists("actions/actions.py"):
         print_error("actions/actions.py not found")
         return
-    
+
     try:
         with open("actions/actions.py", 'r', encoding='utf-8') as f:
             actions_code = f.read()
-        
+        tree = ast.parse(actions_code)
+        imported = {(node.module, alias.name) for node in ast.walk(tree)
+                    if isinstance(node, ast.ImportFrom) for alias in node.names}
+
         # Check for required imports
         required_imports = [
-            "from rasa_sdk import Action",
-            "from rasa_sdk.executor import CollectingDispatcher", 
-            "from rasa_sdk.events import SlotSet"
+            ("rasa_sdk", "Action"),
+            ("rasa_sdk.executor", "CollectingDispatcher"),
+            ("rasa_sdk.events", "SlotSet")
         ]
-        
-        for import_stmt in required_imports:
-            if import_stmt in actions_code:
-                print_success(f"Found required import: {import_stmt.split()[-1]}")
+
+        for module, name in required_imports:
+            if (module, name) in imported:
+                print_success(f"Found required import: {name}")
             else:
-                print_warning(f"Missing import: {import_stmt}")
-        
+                print_warning(f"Missing import: from {module} import {name}")
+
         # Check for custom action classes
         healthcare_actions = [
             "ActionPerformTriage",
-            "ActionBookAppointment", 
+            "ActionBookAppointment",
             "ActionProvideHealthAdvice",
             "ActionInitiateHandover",
             "ActionEmergencyProtocol"
         ]
-        
+
+        implemented = find_custom_actions()
+        classes = set(implemented.values())
         for action in healthcare_actions:
-            if f"class {action}" in actions_code:
+            if action in classes:
                 print_success(f"Found healthcare action: {action}")
             else:
                 print_warning(f"Missing action class: {action}")
-        
+
+        # Every custom action in the domain needs an implementation and vice versa
+        if project.domain is not None:
+            declared = {action for action in project.domain["actions"]
+                        if action.startswith("action_") and action not in DEFAULT_ACTIONS}
+            for action in sorted(declared - set(implemented)):
+                print_error(f"Domain action '{action}' has no implementation in actions/")
+            for action in sorted(set(implemented) - declared - set(project.domain["forms"])):
+                print_warning(f"Action '{action}' ({implemented[action]}) is not declared in domain.yml")
+
         # Check for advanced features
         advanced_features = [
-            "explainable", "triage", "GDPR", "HIPAA", 
+            "explainable", "triage", "GDPR", "HIPAA",
             "emergency", "handover", "mock"
         ]
-        
-        found_features = []
-        for feature in advanced_features:
-            if feature.lower() in actions_code.lower():
-                found_features.append(feature)
-        
+
+        lowered = actions_code.lower()
+        found_features = [feature for feature in advanced_features if feature.lower() in lowered]
+
         if found_features:
             print_success(f"Advanced features found: {', '.join(found_features)}")
         else:
             print_warning("No advanced healthcare features detected")
-    
+
     except Exception as e:
         print_error(f"Error validating actions code: {e}")
 
 def validate_frontend_code():
     """Validate React frontend code"""
     print_header("FRONTEND CODE VALIDATION")
-    
+
     if not os.path.exists("ChatInterface.js"):
         print_error("ChatInterface.js not found")
         return
-    
+
     try:
         with open("ChatInterface.js", 'r', encoding='utf-8') as f:
             frontend_code = f.read()
-        
+
         # Check for React components and features
         react_features = [
             "import React",
             "useState",
-            "useEffect", 
+            "useEffect",
             "ChatInterface",
             "sendMessage",
             "triage",
             "emergency",
             "handover"
         ]
-        
+
         for feature in react_features:
             if feature in frontend_code:
                 print_success(f"React feature found: {feature}")
             else:
                 print_warning(f"Missing React feature: {feature}")
-        
+
         # Check CSS file
         if os.path.exists("ChatInterface.css"):
             with open("ChatInterface.css", 'r', encoding='utf-8') as f:
                 css_code = f.read()
-            
+
             css_features = [
                 ".chat-interface",
                 ".message",
@@ -302,61 +531,54 @@ def validate_frontend_code():
                 "responsive",
                 "@media"
             ]
-            
+
             for feature in css_features:
                 if feature in css_code:
                     print_success(f"CSS feature found: {feature}")
                 else:
                     print_warning(f"Missing CSS feature: {feature}")
-    
+
     except Exception as e:
         print_error(f"Error validating frontend code: {e}")
 
-def validate_test_coverage():
+def validate_test_coverage(project: ProjectModel):
     """Validate test file coverage"""
     print_header("TEST COVERAGE VALIDATION")
-    
+
     test_files = ["tests/test_nlu.yml", "tests/test_stories.yml"]
-    
+
     for test_file in test_files:
-        if os.path.exists(test_file):
-            try:
-                with open(test_file, 'r', encoding='utf-8') as f:
-                    test_data = yaml.safe_load(f)
-                
-                if "test_cases" in test_data:
-                    test_count = len(test_data["test_cases"])
-                    print_success(f"{test_file}: {test_count} test cases")
-                elif "nlu" in test_data:
-                    test_count = len(test_data["nlu"])
-                    print_success(f"{test_file}: {test_count} NLU tests")
-                else:
-                    print_warning(f"{test_file}: Unknown test format")
-            
-            except Exception as e:
-                print_error(f"Error reading {test_file}: {e}")
-        else:
+        summary = project.files.get(test_file)
+        if summary is None:
             print_error(f"Test file not found: {test_file}")
+        elif summary["error"]:
+            print_error(summary["error"])
+        elif "test_cases_count" in summary:
+            print_success(f"{test_file}: {summary['test_cases_count']} test cases")
+        elif "nlu_blocks" in summary:
+            print_success(f"{test_file}: {summary['nlu_blocks']} NLU tests")
+        else:
+            print_warning(f"{test_file}: Unknown test format")
 
 def validate_documentation():
     """Validate documentation quality"""
     print_header("DOCUMENTATION VALIDATION")
-    
+
     if os.path.exists("README.md"):
         with open("README.md", 'r', encoding='utf-8') as f:
             readme_content = f.read()
-        
+
         doc_sections = [
             "Installation", "Usage", "Testing", "Features",
             "Healthcare", "Triage", "GDPR", "HIPAA"
         ]
-        
+
         for section in doc_sections:
             if section.lower() in readme_content.lower():
                 print_success(f"Documentation section found: {section}")
             else:
                 print_warning(f"Missing documentation section: {section}")
-        
+
         # Check length
         word_count = len(readme_content.split())
         if word_count > 1000:
@@ -369,27 +591,27 @@ def validate_documentation():
 def generate_test_report():
     """Generate final test report"""
     print_header("PROJECT VALIDATION SUMMARY")
-    
+
     # Count files
     total_files = 0
     existing_files = 0
-    
+
     all_files = [
-        "domain.yml", "config.yml", "data/nlu.yml", "data/stories.yml", 
+        "domain.yml", "config.yml", "data/nlu.yml", "data/stories.yml",
         "data/rules.yml", "actions/actions.py", "tests/test_nlu.yml",
         "tests/test_stories.yml", "ChatInterface.js", "ChatInterface.css",
         "README.md", "requirements.txt"
     ]
-    
+
     for file_path in all_files:
         total_files += 1
         if os.path.exists(file_path):
             existing_files += 1
-    
+
     completion_rate = (existing_files / total_files) * 100
-    
+
     print(f"📊 Project Completion: {existing_files}/{total_files} files ({completion_rate:.1f}%)")
-    
+
     if completion_rate >= 90:
         print_success("🎉 Excellent! Project is nearly complete")
     elif completion_rate >= 70:
@@ -398,33 +620,50 @@ def generate_test_report():
         print_warning("⚠️  Moderate progress. Several files need attention")
     else:
         print_error("❌ Significant work needed")
-    
+
     print("\n📋 NEXT STEPS:")
     print("1. Fix any validation errors shown above")
-    print("2. Install Rasa when ready: pip install rasa[full]==3.6.0")  
+    print("2. Install Rasa when ready: pip install rasa[full]==3.6.0")
     print("3. Train model: rasa train")
     print("4. Run tests: rasa test")
     print("5. Start services: rasa run actions & rasa run")
 
 if __name__ == "__main__":
-    print("🏥 Healthcare Chatbot Project Validator")
-    print("MSc AI Assignment - Comprehensive Validation")
-    print("="*60)
-    
+    parser = argparse.ArgumentParser(description="Validate the healthcare chatbot project")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only print errors and warnings (for pre-commit hooks)")
+    parser.add_argument("--jobs", type=int, help="Parser processes for large projects")
+    args = parser.parse_args()
+    VERBOSE = not args.quiet
+
+    if VERBOSE:
+        print("🏥 Healthcare Chatbot Project Validator")
+        print("MSc AI Assignment - Comprehensive Validation")
+        print("="*60)
+
     try:
+        start = time.perf_counter()
+        data_files = sorted(glob.glob("data/**/*.yml", recursive=True))
+        project = load_project(YAML_FILES, data_files, args.jobs)
+
         validate_file_structure()
-        validate_yaml_files()
-        validate_domain_content()
-        validate_nlu_content()
-        validate_actions_code()
+        validate_yaml_files(project)
+        validate_domain_content(project)
+        validate_nlu_content(project)
+        validate_cross_references(project)
+        validate_actions_code(project)
         validate_frontend_code()
-        validate_test_coverage()
+        validate_test_coverage(project)
         validate_documentation()
-        generate_test_report()
-        
-        print("\n✅ Validation complete! Check results above.")
-        
+        if VERBOSE:
+            generate_test_report()
+
+        elapsed = time.perf_counter() - start
+        print(f"\n{'✅' if not PROBLEMS['errors'] else '❌'} Validation complete in {elapsed:.2f}s: "
+              f"{PROBLEMS['errors']} errors, {PROBLEMS['warnings']} warnings")
+
     except Exception as e:
         print_error(f"Validation failed: {e}")
         sys.exit(1)
 
+    sys.exit(1 if PROBLEMS["errors"] else 0)